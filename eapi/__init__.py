@@ -7,8 +7,54 @@ __version__ = "0.6.4"
 # from eapi.constants import ENCODING, INCLUDE_TIMESTAMPS, SSL_VERIFY, \
 #                          SSL_WARNINGS, TIMEOUT
 
-import eapi.environments
-import eapi.types
+import importlib
 
-from eapi.sessions import Session, AsyncSession
-from eapi.api import aexecute, awatch, configure, enable, execute, watch
\ No newline at end of file
+from typing import TYPE_CHECKING
+
+# Top-level names are imported on first use (PEP 562), so that 'import eapi'
+# does not pull in httpx, asyncio and friends until they are needed.
+_EXPORTS = {
+    "PreparedRequest": "eapi.messages",
+    "Session": "eapi.sessions",
+    "AsyncSession": "eapi.sessions",
+    "aconfigure": "eapi.api",
+    "aenable": "eapi.api",
+    "aexecute": "eapi.api",
+    "awatch": "eapi.api",
+    "configure": "eapi.api",
+    "enable": "eapi.api",
+    "execute": "eapi.api",
+    "watch": "eapi.api",
+    "Poller": "eapi.poller",
+    "Fleet": "eapi.fleet",
+}
+
+__all__ = list(_EXPORTS)
+
+if TYPE_CHECKING:
+    from eapi.messages import PreparedRequest
+    from eapi.sessions import Session, AsyncSession
+    from eapi.api import aconfigure, aenable, aexecute, awatch, configure, \
+        enable, execute, watch
+    from eapi.poller import Poller
+    from eapi.fleet import Fleet
+
+
+def __getattr__(name: str):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name]), name)
+        globals()[name] = value
+        return value
+
+    # allow 'import eapi; eapi.sessions...' without importing submodules
+    try:
+        return importlib.import_module("eapi." + name)
+    except ModuleNotFoundError as exc:
+        if exc.name != "eapi." + name:
+            raise
+
+    raise AttributeError("module 'eapi' has no attribute %r" % name)
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
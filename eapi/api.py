@@ -3,24 +3,32 @@
 # Arista Networks, Inc. Confidential and Proprietary.
 
 import math
-import re
 import time
 
-from typing import Callable, Iterator, List, Optional
+from typing import Callable, List, Optional, Tuple
 
 from eapi.types import Auth, Certificate, Command
+from eapi.conditions import ConditionLike, compile_condition
 from eapi.messages import Response
-from eapi import Session, AsyncSession
+from eapi.util import Ticker
+from eapi.sessions import Session, AsyncSession
 
 NEVER_RE = r'(?!x)x'
 
 
+async def _sleep(delay: float) -> None:
+    # imported here to keep asyncio off the import path of sync callers
+    import asyncio
+    await asyncio.sleep(delay)
+
+
 def execute(target: str,
             commands: List[Command],
             encoding: Optional[str] = None,
             auth: Optional[Auth] = None,
             cert: Optional[Certificate] = None,
             verify: Optional[bool] = None,
+            session: Optional[Session] = None,
             **kwargs) -> Response:
     """Send an eAPI request
 
@@ -30,12 +38,17 @@ def execute(target: str,
     :param type: list
     :param encoding: json or text (default: json)
     :param type: str
+    :param session: use an existing session instead of creating one
+    :param type: Session
     :param \*\*kwargs: pass through ``httpx`` options
 
     :return: :class:`Response <Response>` object
     :rtype: eapi.messages.Response
     """
 
+    if session:
+        return session.call(target, commands, encoding=encoding, **kwargs)
+
     with Session(auth=auth, cert=cert, verify=verify) as sess:
         return sess.call(target, commands, encoding=encoding, **kwargs)
 
@@ -55,7 +68,7 @@ def enable(target: str, commands: List[Command], secret: str = "",
     :rtype: eapi.messages.Response
     """
 
-    commands.insert(0, {"cmd": "enable", "input": secret})
+    commands = [{"cmd": "enable", "input": secret}] + list(commands)
     return execute(target, commands, encoding, **kwargs)
 
 
@@ -75,11 +88,52 @@ def configure(target: str, commands: List[Command],
     :rtype: eapi.messages.Response
     """
 
-    commands.insert(0, "configure")
-    commands.append("end")
+    commands = ["configure"] + list(commands) + ["end"]
     return execute(target, commands, encoding, **kwargs)
 
 
+class _WatchState(object):
+    """Condition and change tracking shared by ``watch`` and ``awatch``"""
+
+    def __init__(self, condition: Optional[ConditionLike], exclude: bool,
+                 changes_only: bool, heartbeat: Optional[float]):
+
+        if not condition:
+            condition = NEVER_RE
+
+        self._check = compile_condition(condition)
+        self._exclude = bool(exclude)
+        self._changes_only = changes_only
+        self._heartbeat = heartbeat
+
+        self._digest: Optional[bytes] = None
+        self._matched = False
+        self._delivered = 0.0
+
+    def update(self, response: Response) -> Tuple[bool, bool]:
+        """returns whether the condition matched and whether to deliver"""
+
+        if not self._changes_only:
+            return self._check(response) != self._exclude, True
+
+        now = time.monotonic()
+        digest = response.digest
+
+        if digest != self._digest:
+            # only re-evaluate the condition when the content changed
+            self._digest = digest
+            self._matched = self._check(response) != self._exclude
+            deliver = True
+        else:
+            deliver = self._heartbeat is not None and \
+                now - self._delivered >= self._heartbeat
+
+        if deliver:
+            self._delivered = now
+
+        return self._matched, deliver
+
+
 def watch(target: str,
           command: Command,
           callback: Callable = None,
@@ -87,10 +141,20 @@ def watch(target: str,
           interval: Optional[int] = None,
           deadline: Optional[float] = None,
           exclude: bool = False,
-          condition: Optional[str] = None,
-          **kwargs) -> Optional[Iterator[Response]]:
+          condition: Optional[ConditionLike] = None,
+          auth: Optional[Auth] = None,
+          cert: Optional[Certificate] = None,
+          verify: Optional[bool] = None,
+          session: Optional[Session] = None,
+          changes_only: bool = False,
+          heartbeat: Optional[float] = None,
+          **kwargs) -> Ticker:
     """Watch a command until deadline or condition matches
 
+    One session is held for the whole watch and the command is sent on a fixed
+    cadence.  When a request overruns the interval the missed ticks are skipped
+    rather than sent back-to-back.
+
     :param target: eAPI target 
     :param type: Target
     :param commmand: A single command to send
@@ -105,18 +169,30 @@ def watch(target: str,
     :param type: float
     :param exclude: return if condition patter is NOT matched
     :param type: bool
-    :param condition: search for pattern in output, return if matched
-    :param type: str
+    :param condition: return when matched: a regex searched for in the
+        output, a callable taking each ``JsonResult`` or a condition from
+        ``eapi.conditions`` (e.g. ``where('peers.*.state == "Established"')``)
+    :param type: ConditionLike
+    :param session: use an existing session instead of creating one
+    :param type: Session
+    :param changes_only: only call back when the output changed
+    :param type: bool
+    :param heartbeat: with ``changes_only``, also call back when nothing has
+        been delivered for this many seconds
+    :param type: float
 
     :param \*\*kwargs: Optional arguments that ``execute`` takes.
 
-    :return: :class:`Response <Response>` object
-    :rtype: eapi.messages.Response
+    :return: :class:`Ticker <Ticker>` with tick and missed tick counts
+    :rtype: eapi.util.Ticker
     """
 
-    matched: bool = False
-
-    exclude = bool(exclude)
+    if not session:
+        with Session(auth=auth, cert=cert, verify=verify) as sess:
+            return watch(target, command, callback, encoding, interval,
+                         deadline, exclude, condition, session=sess,
+                         changes_only=changes_only, heartbeat=heartbeat,
+                         **kwargs)
 
     if not interval:
         interval = 2
@@ -124,28 +200,25 @@ def watch(target: str,
     if not deadline:
         deadline = math.inf
 
-    if not condition:
-        condition = NEVER_RE
-
-    start = time.time()
-    check = start
+    state = _WatchState(condition, exclude, changes_only, heartbeat)
+    ticker = Ticker(interval)
 
-    while (check - deadline) < start:
-        response = execute(target, [command], encoding, **kwargs)
-        match = re.search(condition, str(response))
+    while True:
+        ticker.tick()
 
-        if exclude and not match:
-            matched = True
-        elif match:
-            matched = True
+        response = session.call(target, [command], encoding=encoding,
+                                **kwargs)
+        matched, deliver = state.update(response)
 
-        callback(response, matched)
+        if callback and deliver:
+            callback(response, matched)
 
-        if matched:
+        if matched or ticker.next_offset >= deadline:
             break
 
-        time.sleep(interval)
-        check = time.time()
+        time.sleep(ticker.delay())
+
+    return ticker
 
 
 async def aexecute(target: str,
@@ -154,6 +227,7 @@ async def aexecute(target: str,
                    auth: Optional[Auth] = None,
                    cert: Optional[Certificate] = None,
                    verify: Optional[bool] = None,
+                   session: Optional[AsyncSession] = None,
                    **kwargs) -> Response:
     """Send command(s) to an eAPI target (async version)
 
@@ -163,12 +237,18 @@ async def aexecute(target: str,
     :param type: list
     :param encoding: json or text (default: json)
     :param type: str
+    :param session: use an existing session instead of creating one
+    :param type: AsyncSession
     :param \*\*kwargs: pass through ``httpx`` options
 
     :return: :class:`Response <Response>` object
     :rtype: eapi.messages.Response
     """
 
+    if session:
+        return await session.call(target, commands, encoding=encoding,
+                                  **kwargs)
+
     async with AsyncSession(auth=auth, cert=cert, verify=verify) as sess:
         return await sess.call(target, commands, encoding=encoding, **kwargs)
 
@@ -188,7 +268,7 @@ async def aenable(target: str, commands: List[Command], secret: str = "",
     :rtype: eapi.messages.Response
     """
 
-    commands.insert(0, {"cmd": "enable", "input": secret})
+    commands = [{"cmd": "enable", "input": secret}] + list(commands)
     return await aexecute(target, commands, encoding, **kwargs)
 
 
@@ -208,8 +288,7 @@ async def aconfigure(target: str, commands: List[Command],
     :rtype: eapi.messages.Response
     """
 
-    commands.insert(0, "configure")
-    commands.append("end")
+    commands = ["configure"] + list(commands) + ["end"]
     return await aexecute(target, commands, encoding, **kwargs)
 
 
@@ -220,12 +299,20 @@ async def awatch(target: str,
                  interval: Optional[int] = None,
                  deadline: Optional[float] = None,
                  exclude: bool = False,
-                 condition: Optional[str] = None,
-
-                 **kwargs) -> None:
+                 condition: Optional[ConditionLike] = None,
+                 auth: Optional[Auth] = None,
+                 cert: Optional[Certificate] = None,
+                 verify: Optional[bool] = None,
+                 session: Optional[AsyncSession] = None,
+                 changes_only: bool = False,
+                 heartbeat: Optional[float] = None,
+                 **kwargs) -> Ticker:
 
     """Watch a command until deadline or condition matches (async version)
 
+    Sleeps do not block the event loop, so many watches can share one loop
+    (and one ``session``).
+
     :param target: eAPI target 
     :param type: Target
     :param commmand: A single command to send
@@ -240,17 +327,29 @@ async def awatch(target: str,
     :param type: float
     :param exclude: return if condition patter is NOT matched
     :param type: bool
-    :param condition: search for pattern in output, return if matched
-    :param type: str
+    :param condition: return when matched: a regex searched for in the
+        output, a callable taking each ``JsonResult`` or a condition from
+        ``eapi.conditions`` (e.g. ``where('peers.*.state == "Established"')``)
+    :param type: ConditionLike
+    :param session: use an existing session instead of creating one
+    :param type: AsyncSession
+    :param changes_only: only call back when the output changed
+    :param type: bool
+    :param heartbeat: with ``changes_only``, also call back when nothing has
+        been delivered for this many seconds
+    :param type: float
     :param \*\*kwargs: Optional arguments that ``execute`` takes.
 
-    :return: :class:`Response <Response>` object
-    :rtype: eapi.messages.Response
+    :return: :class:`Ticker <Ticker>` with tick and missed tick counts
+    :rtype: eapi.util.Ticker
     """
 
-    matched: bool = False
-
-    exclude = bool(exclude)
+    if not session:
+        async with AsyncSession(auth=auth, cert=cert, verify=verify) as sess:
+            return await awatch(target, command, callback, encoding,
+                                interval, deadline, exclude, condition,
+                                session=sess, changes_only=changes_only,
+                                heartbeat=heartbeat, **kwargs)
 
     if not interval:
         interval = 2
@@ -258,26 +357,22 @@ async def awatch(target: str,
     if not deadline:
         deadline = math.inf
 
-    if not condition:
-        condition = NEVER_RE
-
-    start = time.time()
-    check = start
+    state = _WatchState(condition, exclude, changes_only, heartbeat)
+    ticker = Ticker(interval)
 
-    while (check - deadline) < start:
-        response = await aexecute(target, [command], encoding, **kwargs)
+    while True:
+        ticker.tick()
 
-        match = re.search(condition, str(response))
+        response = await session.call(target, [command], encoding=encoding,
+                                      **kwargs)
+        matched, deliver = state.update(response)
 
-        if exclude and not match:
-            matched = True
-        elif match:
-            matched = True
+        if callback and deliver:
+            await callback(response, matched)
 
-        await callback(response, matched)
-
-        if matched:
+        if matched or ticker.next_offset >= deadline:
             break
 
-        time.sleep(interval)
-        check = time.time()
+        await _sleep(ticker.delay())
+
+    return ticker
@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import itertools
+import math
+import threading
+import time
+
+from typing import Dict, List, Optional, Union
+
+from eapi.exceptions import EapiError
+from eapi.messages import PreparedRequest, Target
+from eapi.sessions import AsyncSession, Session
+from eapi.types import Auth, Certificate, Command
+
+# httpcore trace event emitted each time a new TCP connection is opened
+CONNECT_EVENT = "connection.connect_tcp.complete"
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of already sorted ``values``"""
+
+    if not values:
+        return 0.0
+
+    rank = max(1, math.ceil(pct / 100.0 * len(values)))
+    return values[min(rank, len(values)) - 1]
+
+
+class BenchResult(object):
+    """Outcome of a benchmark run
+
+    ``latencies`` holds the round-trip time (in seconds) of every request
+    that got a response, including responses with an error code.  Requests
+    that failed outright (connection refused, timeouts...) are only counted
+    in ``errors``, keyed by the error message.
+    """
+
+    def __init__(self, target: Target, mode: str, workers: int):
+        self.target = target
+        self.mode = mode
+        self.workers = workers
+        self.requests = 0
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self.connections = 0
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return "BenchResult(%s, %d requests, %.1f/s)" % (
+            self.target, self.requests, self.throughput)
+
+    def __str__(self):
+        latency = self.latency
+        lines = [
+            "target:      %s" % self.target,
+            "mode:        %s, %d workers" % (self.mode, self.workers),
+            "requests:    %d (%d errors)" % (self.requests,
+                                             self.error_count),
+            "connections: %d" % self.connections,
+            "elapsed:     %.2fs" % self.elapsed,
+            "throughput:  %.1f req/s" % self.throughput,
+            "latency:     " + "  ".join(
+                "%s %.1fms" % (name, latency[name])
+                for name in ("p50", "p90", "p99", "max"))
+        ]
+
+        for message, count in sorted(self.errors.items()):
+            lines.append("error:       %d x %s" % (count, message))
+
+        return "\n".join(lines)
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    @property
+    def throughput(self) -> float:
+        """requests per second"""
+        if not self.elapsed:
+            return 0.0
+        return self.requests / self.elapsed
+
+    @property
+    def latency(self) -> Dict[str, float]:
+        """latency summary in milliseconds"""
+
+        values = sorted(self.latencies)
+        summary = {"min": 0.0, "mean": 0.0, "max": 0.0}
+
+        if values:
+            summary["min"] = values[0] * 1000
+            summary["mean"] = sum(values) / len(values) * 1000
+            summary["max"] = values[-1] * 1000
+
+        for pct in PERCENTILES:
+            summary["p%d" % pct] = percentile(values, pct) * 1000
+
+        return summary
+
+    def error(self, message: str) -> None:
+        self.errors[message] = self.errors.get(message, 0) + 1
+
+    def to_dict(self) -> dict:
+        return {
+            "target": str(self.target),
+            "mode": self.mode,
+            "workers": self.workers,
+            "requests": self.requests,
+            "errors": self.error_count,
+            "error_messages": dict(self.errors),
+            "connections": self.connections,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "latency_ms": self.latency
+        }
+
+
+class _Plan(object):
+    """Hands out requests to workers until the count or duration is used up
+
+    Requests cycle through the command mix, one command per request.
+    """
+
+    def __init__(self, commands: List[Command], encoding: Optional[str],
+                 duration: Optional[float], requests: Optional[int]):
+
+        if not commands:
+            raise ValueError("at least one command is required")
+
+        if duration is None and requests is None:
+            raise ValueError("duration or requests is required")
+
+        self.requests = [PreparedRequest([c], encoding) for c in commands]
+        self.duration = duration
+        self.limit = requests
+        self.deadline: Optional[float] = None
+        self.stopped = False
+        self._counter = itertools.count()
+
+    def start(self) -> None:
+        if self.duration is not None:
+            self.deadline = time.monotonic() + self.duration
+
+    def stop(self) -> None:
+        """hand out no more requests, e.g. after a worker failed"""
+        self.stopped = True
+
+    def next(self) -> Optional[PreparedRequest]:
+        if self.stopped:
+            return None
+
+        index = next(self._counter)
+
+        if self.limit is not None and index >= self.limit:
+            return None
+
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            return None
+
+        return self.requests[index % len(self.requests)]
+
+
+def _record(result: BenchResult, response, start: float) -> None:
+    result.latencies.append(time.perf_counter() - start)
+    if response.code != 0:
+        result.error("%d %s" % (response.code, response.message))
+
+
+def _options(kwargs: dict, trace) -> dict:
+    extensions = dict(kwargs.pop("extensions", None) or {})
+    extensions["trace"] = trace
+    return dict(kwargs, extensions=extensions)
+
+
+def bench(target: Union[str, Target],
+          commands: List[Command],
+          workers: int = 1,
+          duration: Optional[float] = None,
+          requests: Optional[int] = None,
+          encoding: Optional[str] = None,
+          auth: Optional[Auth] = None,
+          cert: Optional[Certificate] = None,
+          verify: Optional[bool] = None,
+          session: Optional[Session] = None,
+          **kwargs) -> BenchResult:
+    """Load a target with requests from worker threads sharing a Session
+
+    Each worker sends one command per request, cycling through
+    ``commands``, until ``requests`` have been sent or ``duration`` seconds
+    have passed (whichever comes first).  Errors from eAPI are counted in
+    the result; any other exception stops the run and is raised once the
+    workers have finished.
+
+    :param target: eAPI target
+    :param type: Target
+    :param commands: command mix
+    :param type: list
+    :param workers: number of concurrent workers
+    :param type: int
+    :param duration: seconds to run for
+    :param type: float
+    :param requests: total number of requests to send
+    :param type: int
+    :param session: use an existing session instead of creating one
+    :param type: Session
+    :param \\*\\*kwargs: pass through ``httpx`` options
+
+    :return: :class:`BenchResult` object
+    :rtype: eapi.bench.BenchResult
+    """
+
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+
+    plan = _Plan(commands, encoding, duration, requests)
+
+    if not session:
+        with Session(auth=auth, cert=cert, verify=verify) as sess:
+            if auth:
+                sess.login(target, auth)
+            return bench(target, commands, workers, duration, requests,
+                         encoding, session=sess, **kwargs)
+
+    target_ = Target.from_string(target)
+    result = BenchResult(target_, "sync", workers)
+    lock = threading.Lock()
+
+    def _trace(name, info):
+        if name == CONNECT_EVENT:
+            with lock:
+                result.connections += 1
+
+    options = _options(kwargs, _trace)
+    failures: List[BaseException] = []
+
+    def _send():
+        while True:
+            request = plan.next()
+            if request is None:
+                return
+
+            start = time.perf_counter()
+            try:
+                response = session.call(target_, request, **options)
+            except EapiError as exc:
+                with lock:
+                    result.requests += 1
+                    result.error(str(exc) or exc.__class__.__name__)
+                continue
+
+            with lock:
+                result.requests += 1
+                _record(result, response, start)
+
+    def _work():
+        try:
+            _send()
+        except BaseException as exc:
+            # a thread would otherwise end silently, raised after join
+            plan.stop()
+            with lock:
+                failures.append(exc)
+
+    threads = [threading.Thread(target=_work, daemon=True)
+               for _ in range(workers)]
+
+    start = time.monotonic()
+    plan.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    result.elapsed = time.monotonic() - start
+
+    if failures:
+        raise failures[0]
+
+    return result
+
+
+async def abench(target: Union[str, Target],
+                 commands: List[Command],
+                 workers: int = 1,
+                 duration: Optional[float] = None,
+                 requests: Optional[int] = None,
+                 encoding: Optional[str] = None,
+                 auth: Optional[Auth] = None,
+                 cert: Optional[Certificate] = None,
+                 verify: Optional[bool] = None,
+                 session: Optional[AsyncSession] = None,
+                 **kwargs) -> BenchResult:
+    """Load a target with requests from tasks sharing an AsyncSession
+
+    See :func:`bench` for the parameters.
+    """
+
+    import asyncio
+
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+
+    plan = _Plan(commands, encoding, duration, requests)
+
+    if not session:
+        async with AsyncSession(auth=auth, cert=cert, verify=verify) as sess:
+            if auth:
+                await sess.login(target, auth)
+            return await abench(target, commands, workers, duration,
+                                requests, encoding, session=sess, **kwargs)
+
+    target_ = Target.from_string(target)
+    result = BenchResult(target_, "async", workers)
+
+    async def _trace(name, info):
+        if name == CONNECT_EVENT:
+            result.connections += 1
+
+    options = _options(kwargs, _trace)
+
+    async def _work():
+        while True:
+            request = plan.next()
+            if request is None:
+                return
+
+            start = time.perf_counter()
+            try:
+                response = await session.call(target_, request, **options)
+            except EapiError as exc:
+                result.requests += 1
+                result.error(str(exc) or exc.__class__.__name__)
+                continue
+            except BaseException:
+                # raised by gather, the other workers stop too
+                plan.stop()
+                raise
+
+            result.requests += 1
+            _record(result, response, start)
+
+    start = time.monotonic()
+    plan.start()
+    await asyncio.gather(*[_work() for _ in range(workers)])
+    result.elapsed = time.monotonic() - start
+
+    return result
@@ -0,0 +1,340 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import time
+
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+from eapi.exceptions import EapiError, EapiResponseError
+from eapi.messages import Response, Target
+from eapi.sessions import AsyncSession, Session
+from eapi.types import Auth, Certificate, Command
+from eapi.util import bounded_as_completed
+
+DEFAULT_CHUNK_SIZE = 1000
+
+ProgressCallback = Callable[[Target, int, int], None]
+
+
+class PushResult(object):
+    """Outcome of pushing a command list to one target
+
+    :param target: the target
+    :param total: number of configuration commands to push
+    """
+
+    def __init__(self, target: Target, total: int):
+        self.target = target
+        self.total = total
+        self.pushed = 0
+        self.chunks = 0
+        self.responses: List[Response] = []
+        self.error: Optional[Exception] = None
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        status = "error=%r" % self.error if self.error else "ok"
+        return "PushResult(%s, %d/%d, %s)" % (self.target, self.pushed,
+                                              self.total, status)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def throughput(self) -> float:
+        """commands pushed per second"""
+        if not self.elapsed:
+            return 0.0
+        return self.pushed / self.elapsed
+
+    def to_dict(self) -> dict:
+        return {
+            "target": str(self.target),
+            "total": self.total,
+            "pushed": self.pushed,
+            "chunks": self.chunks,
+            "elapsed": self.elapsed,
+            "throughput": self.throughput,
+            "error": str(self.error) if self.error else None
+        }
+
+
+def _text(command: Command) -> str:
+    return command if isinstance(command, str) else command["cmd"]
+
+
+def _indent(command: Command) -> int:
+    text = _text(command)
+    return len(text) - len(text.lstrip())
+
+
+def _chunks(commands: List[Command],
+            size: int) -> List[Tuple[List[Command], int]]:
+    """chunks paired with the number of commands new to each chunk"""
+
+    if size < 1:
+        raise ValueError("size must be >= 1")
+
+    chunks: List[Tuple[List[Command], int]] = []
+    chunk: List[Command] = []
+    replayed = 0
+
+    # (indent, command) for each open block leading to the current line
+    parents: List[Tuple[int, Command]] = []
+
+    for command in commands:
+        indent = _indent(command)
+
+        while parents and parents[-1][0] >= indent:
+            parents.pop()
+
+        if len(chunk) >= size:
+            chunks.append((chunk, len(chunk) - replayed))
+            chunk = [parent for _, parent in parents]
+            replayed = len(chunk)
+
+            if len(chunk) >= size:
+                raise ValueError("size is too small for nesting depth %d" %
+                                 len(parents))
+
+        chunk.append(command)
+        parents.append((indent, command))
+
+    if chunk:
+        chunks.append((chunk, len(chunk) - replayed))
+
+    return chunks
+
+
+def chunk_commands(commands: List[Command],
+                   size: int = DEFAULT_CHUNK_SIZE) -> List[List[Command]]:
+    """Split configuration commands into chunks of at most ``size``
+
+    Sub-mode context is taken from indentation (as in ``show
+    running-config``): when a chunk boundary falls inside a block, the
+    block's parent commands are repeated at the start of the next chunk, so
+    e.g. a 20k line ACL is split into several ``ip access-list`` blocks.
+
+    :param commands: configuration commands
+    :param type: list
+    :param size: max commands per chunk, including repeated parents
+    :param type: int
+
+    :return: list of chunks
+    :rtype: list
+    """
+
+    return [chunk for chunk, _ in _chunks(commands, size)]
+
+
+def _wrap(chunk: List[Command], session_name: Optional[str]) -> List[Command]:
+    if session_name:
+        return ["configure session %s" % session_name] + chunk + ["end"]
+    return ["configure"] + chunk + ["end"]
+
+
+def _check(response: Response) -> None:
+    if response.code != 0:
+        raise EapiResponseError("%d %s" % (response.code, response.message))
+
+
+def _validate(session_name: Optional[str]) -> None:
+    if session_name is not None and (not session_name or
+                                     len(session_name.split()) != 1):
+        raise ValueError("invalid session name: %r" % session_name)
+
+
+def push(target: Union[str, Target],
+         commands: List[Command],
+         chunk_size: int = DEFAULT_CHUNK_SIZE,
+         session_name: Optional[str] = None,
+         progress: Optional[ProgressCallback] = None,
+         auth: Optional[Auth] = None,
+         cert: Optional[Certificate] = None,
+         verify: Optional[bool] = None,
+         session: Optional[Session] = None,
+         **kwargs) -> PushResult:
+    """Push a large configuration to a target in chunks
+
+    Chunks are sent one after the other over a single session.  With
+    ``session_name`` the chunks are staged in a ``configure session`` that is
+    committed once at the end, or aborted if any chunk fails.
+
+    :param target: eAPI target
+    :param type: Target
+    :param commands: configuration commands (without 'configure'/'end')
+    :param type: list
+    :param chunk_size: max commands per request
+    :param type: int
+    :param session_name: stage the push in this configure session
+    :param type: str
+    :param progress: called with (target, pushed, total) after each chunk
+    :param type: Callable
+    :param session: use an existing session instead of creating one
+    :param type: Session
+    :param \\*\\*kwargs: pass through ``httpx`` options
+
+    :return: :class:`PushResult` object
+    :rtype: eapi.bulk.PushResult
+    """
+
+    _validate(session_name)
+
+    if not session:
+        with Session(auth=auth, cert=cert, verify=verify) as sess:
+            return push(target, commands, chunk_size, session_name, progress,
+                        session=sess, **kwargs)
+
+    target_ = Target.from_string(target)
+    result = PushResult(target_, len(commands))
+    start = time.monotonic()
+
+    try:
+        for chunk, new in _chunks(commands, chunk_size):
+            response = session.call(target_, _wrap(chunk, session_name),
+                                    **kwargs)
+            result.responses.append(response)
+            _check(response)
+
+            result.chunks += 1
+            result.pushed += new
+            if progress:
+                progress(target_, result.pushed, result.total)
+
+        if session_name:
+            response = session.call(
+                target_, ["configure session %s" % session_name, "commit"],
+                **kwargs)
+            result.responses.append(response)
+            _check(response)
+    except EapiError as exc:
+        result.error = exc
+        if session_name:
+            try:
+                session.call(target_, ["configure session %s" % session_name,
+                                       "abort"], **kwargs)
+            except EapiError:
+                pass
+    finally:
+        result.elapsed = time.monotonic() - start
+
+    return result
+
+
+async def apush(target: Union[str, Target],
+                commands: List[Command],
+                chunk_size: int = DEFAULT_CHUNK_SIZE,
+                session_name: Optional[str] = None,
+                progress: Optional[ProgressCallback] = None,
+                auth: Optional[Auth] = None,
+                cert: Optional[Certificate] = None,
+                verify: Optional[bool] = None,
+                session: Optional[AsyncSession] = None,
+                **kwargs) -> PushResult:
+    """Push a large configuration to a target in chunks (async version)
+
+    See :func:`push` for the parameters.
+    """
+
+    _validate(session_name)
+
+    if not session:
+        async with AsyncSession(auth=auth, cert=cert, verify=verify) as sess:
+            return await apush(target, commands, chunk_size, session_name,
+                               progress, session=sess, **kwargs)
+
+    target_ = Target.from_string(target)
+    result = PushResult(target_, len(commands))
+    start = time.monotonic()
+
+    try:
+        for chunk, new in _chunks(commands, chunk_size):
+            response = await session.call(target_,
+                                          _wrap(chunk, session_name),
+                                          **kwargs)
+            result.responses.append(response)
+            _check(response)
+
+            result.chunks += 1
+            result.pushed += new
+            if progress:
+                progress(target_, result.pushed, result.total)
+
+        if session_name:
+            response = await session.call(
+                target_, ["configure session %s" % session_name, "commit"],
+                **kwargs)
+            result.responses.append(response)
+            _check(response)
+    except EapiError as exc:
+        result.error = exc
+        if session_name:
+            try:
+                await session.call(target_,
+                                   ["configure session %s" % session_name,
+                                    "abort"], **kwargs)
+            except EapiError:
+                pass
+    finally:
+        result.elapsed = time.monotonic() - start
+
+    return result
+
+
+async def apush_many(targets: List[Union[str, Target]],
+                     commands: List[Command],
+                     concurrency: int = 50,
+                     chunk_size: int = DEFAULT_CHUNK_SIZE,
+                     session_name: Optional[str] = None,
+                     progress: Optional[ProgressCallback] = None,
+                     auth: Optional[Auth] = None,
+                     cert: Optional[Certificate] = None,
+                     verify: Optional[bool] = None,
+                     session: Optional[AsyncSession] = None,
+                     **kwargs) -> Dict[str, PushResult]:
+    """Push the same configuration to many targets concurrently
+
+    :param targets: eAPI targets
+    :param type: list
+    :param concurrency: max targets pushed to at once
+    :param type: int
+
+    See :func:`push` for the other parameters.
+
+    :return: results keyed by target URL
+    :rtype: dict
+    """
+
+    if not session:
+        async with AsyncSession(auth=auth, cert=cert, verify=verify) as sess:
+            return await apush_many(targets, commands, concurrency,
+                                    chunk_size, session_name, progress,
+                                    session=sess, **kwargs)
+
+    async def _push(target):
+        return await apush(target, commands, chunk_size, session_name,
+                           progress, session=session, **kwargs)
+
+    results: Dict[str, PushResult] = {}
+    async for target, result, error in bounded_as_completed(
+            _push, targets, concurrency):
+        if error:
+            raise error
+        results[str(result.target)] = result
+
+    return results
+
+
+def push_many(targets: List[Union[str, Target]],
+              commands: List[Command],
+              concurrency: int = 50,
+              **kwargs) -> Dict[str, PushResult]:
+    """Push the same configuration to many targets concurrently
+
+    Runs :func:`apush_many` in a new event loop.
+    """
+
+    return asyncio.run(apush_many(targets, commands, concurrency, **kwargs))
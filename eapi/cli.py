@@ -2,16 +2,55 @@
 # Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+import json
+import shutil
+import sys
+
+from typing import Iterable, Iterator, List
+
 import click
 
 import eapi
 import eapi.environments
 
-from eapi import util
+from eapi import screen, util
+
+
+def _read_targets(lines: Iterable[str]) -> Iterator[str]:
+    """one target per line, '#' starts a comment"""
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            yield line
+
+
+def load_targets(spec: str) -> List[str]:
+    """Expand a TARGET argument into a list of targets
+
+    ``spec`` is a comma separated list where each item is a target,
+    ``@path`` to read targets from an inventory file or ``-`` to read them
+    from stdin.
+    """
+
+    targets: List[str] = []
+
+    for item in spec.split(","):
+        item = item.strip()
+        if item == "-":
+            targets.extend(_read_targets(sys.stdin))
+        elif item.startswith("@"):
+            with open(item[1:]) as fh:
+                targets.extend(_read_targets(fh))
+        elif item:
+            targets.append(item)
+
+    return targets
 
 
 @click.group()
 @click.argument("target")
+@click.option("--concurrency", "-C", type=int, default=50,
+              help="Max targets to talk to at once (default: 50)")
 @click.option("--encoding", "-e", default="text")
 @click.option("--username", "-u", default="admin", help="Username (default: admin")
 @click.option("--password", "-p", default="", help="Username (default: <blank>")
@@ -19,7 +58,13 @@ from eapi import util
 @click.option("--key", help="Private key file name")
 @click.option("--verify", is_flag=True, help="verify SSL cert")
 @click.pass_context
-def main(ctx, target, encoding, username, password, cert, key, verify):
+def main(ctx, target, concurrency, encoding, username, password, cert, key,
+         verify):
+    """Run commands on TARGET
+
+    TARGET is a host, a comma separated list of hosts, @FILE to read hosts
+    from an inventory file (one per line) or - to read them from stdin.
+    """
     pair = None
     auth = None
 
@@ -29,26 +74,65 @@ def main(ctx, target, encoding, username, password, cert, key, verify):
     if not key:
         auth = (username, password)
 
+    targets = load_targets(target)
+    if not targets:
+        raise click.BadParameter("no targets given", param_hint="TARGET")
+
     ctx.obj = {
         'encoding': encoding,
-        'target': target,
+        'target': targets[0],
+        'targets': targets,
+        'concurrency': concurrency,
         'auth': auth,
         'cert': pair,
         'verify': verify,
     }
 
 
+async def _stream(targets, commands, encoding, concurrency, **options):
+    """print one JSON record per target as each one completes"""
+
+    from eapi.messages import Target
+
+    async with eapi.AsyncSession(**options) as sess:
+
+        async def _call(target):
+            return await sess.call(target, commands, encoding=encoding)
+
+        async for target, resp, error in util.bounded_as_completed(
+                _call, targets, concurrency):
+            if error:
+                # keyed by URL, like the records of successful calls
+                record = {"target": Target.from_string(target).url,
+                          "error": str(error) or error.__class__.__name__}
+            else:
+                record = resp.to_dict()
+
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+
+
 @main.command()
 @click.argument("commands", nargs=-1, required=True)
+@click.option("--ndjson", is_flag=True, default=False,
+              help="One JSON record per target (default for many targets)")
 @click.pass_context
-def execute(ctx, commands):
+def execute(ctx, commands, ndjson):
 
     target = ctx.obj["target"]
+    targets = ctx.obj["targets"]
     encoding = ctx.obj["encoding"]
     auth = ctx.obj["auth"]
     cert = ctx.obj["cert"]
     verify = ctx.obj["verify"]
 
+    if ndjson or len(targets) > 1:
+        import asyncio
+        asyncio.run(_stream(targets, list(commands), encoding,
+                            ctx.obj["concurrency"],
+                            auth=auth, cert=cert, verify=verify))
+        return
+
     resp = eapi.execute(target, commands,
                         encoding=encoding,
                         auth=auth,
@@ -61,14 +145,122 @@ def execute(ctx, commands):
         print(resp.pretty)
 
 
+def _watch_frame(command, keys, latest, matched, layout, width):
+    """lines of the multi-target watch view"""
+
+    lines = ["Watching '%s' on %d targets" % (command, len(keys)), ""]
+    rows = []
+
+    for key in keys:
+        result = latest.get(key)
+
+        if result is None:
+            status, body = "waiting", []
+        elif result.error:
+            status = "error"
+            body = ["%% %s" % (str(result.error) or
+                               result.error.__class__.__name__)]
+        else:
+            status = "%.0fms" % (result.elapsed * 1000)
+            body = str(result.response[0]).splitlines()
+            if result.response.code != 0:
+                body.append("%% %s" % result.response.message)
+
+        if key in matched:
+            status += ", matched"
+
+        rows.append((key, status, body))
+
+    if layout == "table":
+        lines += screen.table(["TARGET", "STATUS", "OUTPUT"],
+                              [(k, s, "\n".join(b)) for k, s, b in rows],
+                              width)
+    else:
+        lines += screen.panes([("%s (%s)" % (k, s), b) for k, s, b in rows],
+                              width)
+
+    return lines
+
+
+async def _watch_many(view, targets, command, encoding, interval, deadline,
+                      condition, exclude, layout, changes_only=False,
+                      **options):
+    """poll every target concurrently and redraw the view on each result
+
+    With ``changes_only`` a result is only shown when the output (or error)
+    of its target changed since the previous one.
+    """
+
+    from eapi.conditions import compile_condition
+    from eapi.messages import Target
+    from eapi.poller import Poller
+
+    check = compile_condition(condition) if condition else None
+    keys = [str(Target.from_string(t)) for t in targets]
+    latest = {}
+    matched = set()
+    digests = {}
+
+    def _cb(result):
+        key = str(result.target)
+        latest[key] = result
+
+        if result.response is not None and check is not None:
+            if check(result.response) != exclude:
+                matched.add(key)
+            else:
+                matched.discard(key)
+
+        changed = True
+        if changes_only:
+            digest = result.response.digest if result.response is not None \
+                else str(result.error)
+            changed = digests.get(key) != digest
+            digests[key] = digest
+
+        if not changed:
+            pass
+        elif encoding == "json":
+            if result.error:
+                record = {"target": key, "error": str(result.error) or
+                          result.error.__class__.__name__}
+            else:
+                record = result.response.to_dict()
+            sys.stdout.write(json.dumps(record) + "\n")
+            sys.stdout.flush()
+        else:
+            width = shutil.get_terminal_size().columns
+            view.draw(_watch_frame(command, keys, latest, matched, layout,
+                                   width))
+
+        if check is not None and len(matched) == len(set(keys)):
+            poller.stop()
+
+    poller = Poller(callback=_cb, jitter=0, **options)
+    poller.add(targets, [command], interval or 2, encoding=encoding)
+    await poller.run(duration=deadline)
+
+
 @main.command()
 @click.argument("command", nargs=1, required=True)
 @click.option("--interval", "-i", type=int, default=None, help="Time between sends")
 @click.option("--deadline", "-d", type=float, default=None, help="Limit how long to watch")
 @click.option("--exclude / --no-exclude", default=False, help="Match if condition is FALSE")
 @click.option("--condition", "-c", default=None, help="Pattern to search for, watch ends when matched")
+@click.option("--where", "-w", default=None,
+              help="JSON path condition, e.g. 'peers.*.state == \"Established\"'")
+@click.option("--changes-only", is_flag=True, default=False,
+              help="Only redraw when the output changes")
+@click.option("--layout", type=click.Choice(["panes", "table"]),
+              default="panes", help="How to show many targets (default: panes)")
 @click.pass_context
-def watch(ctx, command, interval, deadline, exclude, condition):
+def watch(ctx, command, interval, deadline, exclude, condition, where,
+          changes_only, layout):
+    """Watch COMMAND on one or more targets
+
+    With many targets all of them are polled concurrently and shown side by
+    side, the watch ends when the condition matches on every target.
+    """
 
     target = ctx.obj["target"]
     encoding = ctx.obj["encoding"]
@@ -76,22 +268,154 @@ def watch(ctx, command, interval, deadline, exclude, condition):
     cert = ctx.obj["cert"]
     verify = ctx.obj["verify"]
 
-    def _cb(response, matched):
-        if encoding == "json":
-            print(response.json)
+    if where:
+        condition = eapi.conditions.where(where)
+
+    if len(ctx.obj["targets"]) > 1:
+        import asyncio
+        with screen.Screen() as view:
+            asyncio.run(_watch_many(view, ctx.obj["targets"], command,
+                                    encoding, interval, deadline, condition,
+                                    exclude, layout, changes_only,
+                                    auth=auth, cert=cert, verify=verify))
+        return
+
+    with screen.Screen() as view:
+
+        def _cb(response, matched):
+            if encoding == "json":
+                print(response.json)
+            else:
+                view.draw([f"Watching '{response[0].command}' in "
+                           f"{response.target}", ""] +
+                          str(response[0]).splitlines())
+
+        eapi.watch(target, command,
+                   callback=_cb,
+                   encoding=encoding,
+                   interval=interval,
+                   deadline=deadline,
+                   exclude=exclude,
+                   condition=condition,
+                   changes_only=changes_only,
+                   auth=auth,
+                   cert=cert,
+                   verify=verify)
+
+
+@main.command()
+@click.option("--no-timing", is_flag=True, default=False,
+              help="Do not print the round-trip time of each command")
+@click.pass_context
+def shell(ctx, no_timing):
+    """Interactive prompt, all commands share one session"""
+
+    from eapi.exceptions import EapiError
+    from eapi.shell import Shell
+
+    target = ctx.obj["target"]
+    auth = ctx.obj["auth"]
+
+    if len(ctx.obj["targets"]) > 1:
+        raise click.UsageError("shell takes a single target")
+
+    with eapi.Session(auth=auth, cert=ctx.obj["cert"],
+                      verify=ctx.obj["verify"]) as sess:
+        if auth:
+            try:
+                sess.login(target, auth)
+            except EapiError as exc:
+                raise click.ClickException(str(exc))
+
+        Shell(target, sess, encoding=ctx.obj["encoding"],
+              timing=not no_timing).cmdloop()
+
+
+@main.command()
+@click.argument("commands", nargs=-1)
+@click.option("--workers", "-n", type=int, default=1,
+              help="Concurrent workers (default: 1)")
+@click.option("--duration", "-d", type=float, default=None,
+              help="Seconds to run for (default: 10 unless --requests)")
+@click.option("--requests", "-r", type=int, default=None,
+              help="Total number of requests to send")
+@click.option("--async", "use_async", is_flag=True, default=False,
+              help="Use AsyncSession and tasks instead of threads")
+@click.option("--json", "as_json", is_flag=True, default=False,
+              help="Print the result as JSON")
+@click.pass_context
+def bench(ctx, commands, workers, duration, requests, use_async, as_json):
+    """Measure throughput and latency of COMMANDS (default: show version)
+
+    Each request sends one command, cycling through COMMANDS.
+    """
+
+    import eapi.bench
+    from eapi.exceptions import EapiError
+
+    if len(ctx.obj["targets"]) > 1:
+        raise click.UsageError("bench takes a single target")
+
+    if duration is None and requests is None:
+        duration = 10.0
+
+    options = dict(workers=workers, duration=duration, requests=requests,
+                   encoding=ctx.obj["encoding"], auth=ctx.obj["auth"],
+                   cert=ctx.obj["cert"], verify=ctx.obj["verify"])
+    commands = list(commands) or ["show version"]
+
+    try:
+        if use_async:
+            import asyncio
+            result = asyncio.run(eapi.bench.abench(ctx.obj["target"],
+                                                   commands, **options))
         else:
-            util.clear_screen()
-            print(f"Watching '{response[0].command}' in {response.target}")
-            print()
-            print(response[0])
-
-    eapi.watch(target, command,
-               callback=_cb,
-               encoding=encoding,
-               interval=interval,
-               deadline=deadline,
-               exclude=exclude,
-               condition=condition,
-               auth=auth,
-               cert=cert,
-               verify=verify)
+            result = eapi.bench.bench(ctx.obj["target"], commands, **options)
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+    except EapiError as exc:
+        raise click.ClickException(str(exc))
+
+    if as_json:
+        print(json.dumps(result.to_dict()))
+    else:
+        print(result)
+
+
+@main.command()
+@click.argument("commands", nargs=-1, required=True)
+@click.option("--output", "-o", required=True,
+              help="Archive to write (.tar.gz, or .tar.zst with zstandard)")
+@click.option("--compression", type=click.Choice(["gz", "zst"]),
+              default=None, help="Compression (default: from --output)")
+@click.pass_context
+def collect(ctx, commands, output, compression):
+    """Archive the output of COMMANDS from every target
+
+    A manifest.json in the archive lists each target's files, timings and
+    errors.
+    """
+
+    import eapi.collect
+
+    try:
+        results = eapi.collect.collect(
+            ctx.obj["targets"], list(commands), output,
+            encoding=ctx.obj["encoding"],
+            concurrency=ctx.obj["concurrency"], compression=compression,
+            auth=ctx.obj["auth"], cert=ctx.obj["cert"],
+            verify=ctx.obj["verify"])
+    except ValueError as exc:
+        raise click.UsageError(str(exc))
+
+    failed = [e for e in results.values() if not e.ok]
+    print("collected %d commands from %d targets into %s (%d with errors)" %
+          (len(commands), len(results), output, len(failed)))
+    for evidence in failed:
+        errors = [str(evidence.error)] if evidence.error else \
+            ["%s: %s" % (f["command"], f["error"])
+             for f in evidence.files if f["error"]]
+        print("error: %s: %s" % (evidence.target, "; ".join(errors)))
+
+    if failed:
+        ctx.exit(1)
@@ -0,0 +1,294 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import datetime
+import io
+import json
+import re
+import tarfile
+import time
+
+from typing import Dict, List, Optional, Union
+
+from eapi.exceptions import EapiError
+from eapi.messages import Response, Target
+from eapi.sessions import AsyncSession
+from eapi.types import Auth, Certificate, Command
+from eapi.util import bounded_as_completed
+
+COMPRESSIONS = ("gz", "zst")
+
+MANIFEST = "manifest.json"
+
+# outputs waiting for the archive writer, bounds memory when it falls behind
+DEFAULT_BUFFER = 64
+
+
+def _slug(text: str) -> str:
+    return re.sub(r"[^\w.\-]+", "-", text).strip("-") or "_"
+
+
+def _compression(path: str, compression: Optional[str]) -> str:
+    if compression is None:
+        compression = "zst" if path.endswith((".zst", ".tzst")) else "gz"
+
+    if compression not in COMPRESSIONS:
+        raise ValueError("compression must be one of %s" %
+                         ", ".join(COMPRESSIONS))
+
+    return compression
+
+
+class Archive(object):
+    """Tar archive written as a stream, compressed with gzip or zstd
+
+    zstd needs the ``zstandard`` package.
+
+    :param path: archive file
+    :param type: str
+    :param compression: 'gz' or 'zst' (default: from the file extension,
+        'gz' unless it ends in .zst or .tzst)
+    :param type: str
+    """
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        self.path = path
+        self.compression = _compression(path, compression)
+        self._writer = None
+
+        if self.compression == "zst":
+            try:
+                import zstandard
+            except ImportError:
+                raise ValueError("zstd compression requires the "
+                                 "'zstandard' package")
+
+            self._file = open(path, "wb")
+            self._writer = zstandard.ZstdCompressor().stream_writer(
+                self._file)
+            self._tar = tarfile.open(fileobj=self._writer, mode="w|")
+        else:
+            self._file = None
+            self._tar = tarfile.open(path, mode="w|gz")
+
+    def add(self, name: str, data: bytes) -> None:
+        info = tarfile.TarInfo(name)
+        info.size = len(data)
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        self._tar.addfile(info, io.BytesIO(data))
+
+    def close(self) -> None:
+        self._tar.close()
+        if self._writer is not None:
+            # also closes the file
+            self._writer.close()
+
+
+class DeviceEvidence(object):
+    """What was collected from one target
+
+    ``files`` describes each command's output in the archive: its member
+    name, size, time taken and the error, if any.  ``error`` is set when the
+    target could not be reached at all.
+    """
+
+    def __init__(self, target: Target):
+        self.target = target
+        self.files: List[dict] = []
+        self.error: Optional[Exception] = None
+        self.started = 0.0
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        status = "error=%r" % self.error if self.error else "ok"
+        return "DeviceEvidence(%s, %d files, %s)" % (
+            self.target, len(self.files), status)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and \
+            not any(f["error"] for f in self.files)
+
+    def to_dict(self) -> dict:
+        return {
+            "target": str(self.target),
+            "started": self.started,
+            "elapsed": self.elapsed,
+            "error": str(self.error) if self.error else None,
+            "files": self.files
+        }
+
+
+def _render(response: Response, encoding: str) -> bytes:
+    elem = response[0]
+    if encoding == "text":
+        return (str(elem) + "\n").encode("utf-8")
+    return json.dumps(dict(elem.result), indent=2).encode("utf-8")
+
+
+async def acollect(targets: List[Union[str, Target]],
+                   commands: List[Command],
+                   path: str,
+                   encoding: str = "text",
+                   concurrency: int = 50,
+                   compression: Optional[str] = None,
+                   buffer: int = DEFAULT_BUFFER,
+                   auth: Optional[Auth] = None,
+                   cert: Optional[Certificate] = None,
+                   verify: Optional[bool] = None,
+                   session: Optional[AsyncSession] = None,
+                   **kwargs) -> Dict[str, DeviceEvidence]:
+    """Collect command outputs from many targets into one archive
+
+    Each command is sent on its own, so one failing command does not lose
+    the others, and each output is written to the archive as
+    ``<host>/<command>.txt`` (or ``.json``) as soon as it arrives.  Outputs
+    wait in a queue of at most ``buffer`` entries for the writer, which
+    compresses in a worker thread; when it falls behind the collection
+    slows down rather than holding everything in memory.  The archive ends
+    with ``manifest.json``: the commands, and per-target timings, files and
+    errors.
+
+    :param targets: eAPI targets
+    :param type: list
+    :param commands: commands to collect from every target
+    :param type: list
+    :param path: archive file
+    :param type: str
+    :param encoding: 'text' (default) or 'json'
+    :param type: str
+    :param concurrency: max targets collected from at once
+    :param type: int
+    :param compression: 'gz' or 'zst' (default: from the extension of
+        ``path``)
+    :param type: str
+    :param buffer: max outputs waiting to be written
+    :param type: int
+    :param session: use an existing session instead of creating one
+    :param type: AsyncSession
+    :param \\*\\*kwargs: pass through ``httpx`` options
+
+    :return: evidence keyed by target URL
+    :rtype: dict
+    """
+
+    if buffer < 1:
+        raise ValueError("buffer must be >= 1")
+
+    if not session:
+        async with AsyncSession(auth=auth, cert=cert, verify=verify) as sess:
+            return await acollect(targets, commands, path, encoding,
+                                  concurrency, compression, buffer,
+                                  session=sess, **kwargs)
+
+    loop = asyncio.get_running_loop()
+    archive = await loop.run_in_executor(None, Archive, path, compression)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=buffer)
+    failures: List[BaseException] = []
+    discard = []
+    start = time.monotonic()
+
+    async def _write():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            if failures or discard:
+                # keep draining so collectors are never stuck on the queue
+                continue
+            try:
+                await loop.run_in_executor(None, archive.add, *item)
+            except Exception as exc:
+                failures.append(exc)
+
+    async def _collect(target) -> DeviceEvidence:
+        target_ = Target.from_string(target)
+        evidence = DeviceEvidence(target_)
+        evidence.started = time.monotonic() - start
+
+        host = _slug(target_.hostname if not target_.port else
+                     "%s_%d" % (target_.hostname, target_.port))
+        suffix = ".txt" if encoding == "text" else ".json"
+
+        for command in commands:
+            text = command if isinstance(command, str) else command["cmd"]
+            name = "%s/%s%s" % (host, _slug(text), suffix)
+            began = time.perf_counter()
+
+            try:
+                response = await session.call(target_, [command], encoding,
+                                              **kwargs)
+            except EapiError as exc:
+                evidence.error = exc
+                break
+
+            data = _render(response, encoding)
+            await queue.put((name, data))
+
+            evidence.files.append({
+                "command": text,
+                "file": name,
+                "bytes": len(data),
+                "elapsed": time.perf_counter() - began,
+                "error": response.message if response.code else None
+            })
+
+        evidence.elapsed = time.monotonic() - start - evidence.started
+        return evidence
+
+    writer = asyncio.ensure_future(_write())
+    results: Dict[str, DeviceEvidence] = {}
+
+    completed = bounded_as_completed(_collect, targets, concurrency)
+
+    try:
+        async for target, evidence, error in completed:
+            if error:
+                raise error
+            results[str(evidence.target)] = evidence
+
+        await queue.put(None)
+        await writer
+
+        if failures:
+            raise failures[0]
+
+        manifest = {
+            "created": datetime.datetime.now(
+                datetime.timezone.utc).isoformat(),
+            "commands": [c if isinstance(c, str) else c["cmd"]
+                         for c in commands],
+            "encoding": encoding,
+            "elapsed": time.monotonic() - start,
+            "errors": sum(1 for e in results.values() if not e.ok),
+            "devices": [results[key].to_dict() for key in sorted(results)]
+        }
+        await loop.run_in_executor(
+            None, archive.add, MANIFEST,
+            json.dumps(manifest, indent=2).encode("utf-8"))
+    finally:
+        # on error, stop the other collectors before the archive is closed
+        await completed.aclose()
+        if not writer.done():
+            # let a write in progress finish before closing the archive
+            discard.append(True)
+            await queue.put(None)
+            await writer
+        await loop.run_in_executor(None, archive.close)
+
+    return results
+
+
+def collect(targets: List[Union[str, Target]],
+            commands: List[Command],
+            path: str,
+            **kwargs) -> Dict[str, DeviceEvidence]:
+    """Collect command outputs from many targets into one archive
+
+    Runs :func:`acollect` in a new event loop.
+    """
+
+    return asyncio.run(acollect(targets, commands, path, **kwargs))
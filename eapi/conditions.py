@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import abc
+import json
+import operator
+import re
+
+from collections.abc import Mapping
+from typing import Any, Callable, List, Pattern as RePattern, Union
+
+from eapi.messages import JsonResult, Response
+
+WILDCARD = "*"
+
+_EXPRESSION_RE = re.compile(r"^\s*(?P<path>.+?)\s*"
+                            r"(?:(?P<op>==|!=|<=|>=|<|>|=~)\s*"
+                            r"(?P<value>.+?))?\s*$")
+_SEGMENT_RE = re.compile(r'"(?P<dquoted>[^"]*)"|'
+                         r"'(?P<squoted>[^']*)'|"
+                         r"(?P<bare>[^.]+)")
+
+
+def _search(value, pattern):
+    return pattern.search(str(value)) is not None
+
+
+_OPERATORS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge,
+    "=~": _search
+}
+
+
+class Condition(abc.ABC):
+    """Base class for watch conditions
+
+    Subclasses implement :meth:`matches`, conditions are called with a
+    ``Response``.
+    """
+
+    @abc.abstractmethod
+    def matches(self, response: Response) -> bool:
+        """whether ``response`` satisfies the condition"""
+
+    def __call__(self, response: Response) -> bool:
+        return self.matches(response)
+
+
+class Regex(Condition):
+    """Search the rendered response text for a (precompiled) pattern"""
+
+    def __init__(self, pattern: Union[str, RePattern]):
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        self.pattern = pattern
+
+    def __repr__(self):
+        return "Regex(%r)" % self.pattern.pattern
+
+    def matches(self, response: Response) -> bool:
+        return self.pattern.search(str(response)) is not None
+
+
+class Predicate(Condition):
+    """Call a function with each ``JsonResult`` in the response
+
+    Matches if the function returns true for any result.
+    """
+
+    def __init__(self, func: Callable[[JsonResult], bool]):
+        self.func = func
+
+    def __repr__(self):
+        return "Predicate(%r)" % self.func
+
+    def matches(self, response: Response) -> bool:
+        for elem in response:
+            if isinstance(elem.result, JsonResult) and self.func(elem.result):
+                return True
+        return False
+
+
+class Path(Condition):
+    """Compare the value(s) at a path in the JSON result
+
+    Path segments are separated by dots, ``*`` matches every key or list item
+    and segments containing dots can be quoted (``peers."10.0.0.1".state``).
+    With a wildcard, ``quantifier`` decides whether ``all`` (default) or
+    ``any`` of the values must satisfy the comparison.  Without an operator
+    the condition matches when the path exists.
+
+    >>> Path("vrfs.default.peers.*.peerState", "==", "Established")
+
+    :param path: dotted path
+    :param type: str
+    :param op: one of ==, !=, <, <=, >, >=, =~ (regex search)
+    :param type: str
+    :param value: value to compare against
+    :param type: Any
+    :param quantifier: 'all' or 'any'
+    :param type: str
+    """
+
+    def __init__(self, path: str, op: str = None, value: Any = None,
+                 quantifier: str = "all"):
+
+        if op is not None and op not in _OPERATORS:
+            raise ValueError("unsupported operator: %s" % op)
+
+        if quantifier not in ("all", "any"):
+            raise ValueError("quantifier must be 'all' or 'any'")
+
+        self.path = path
+        self.op = op
+        self.value = value
+        self.quantifier = quantifier
+
+        self._segments = split_path(path)
+        self._compare = _OPERATORS.get(op)
+
+        if op == "=~":
+            self.value = re.compile(str(value))
+
+    def __repr__(self):
+        return "Path(%r, %r, %r)" % (self.path, self.op, self.value)
+
+    def evaluate(self, data) -> bool:
+        """Evaluate against a single ``JsonResult`` or plain structure"""
+
+        values = resolve(data, self._segments)
+
+        if not values:
+            return False
+
+        if self._compare is None:
+            return True
+
+        test = (self._test(v) for v in values)
+
+        if self.quantifier == "any":
+            return any(test)
+
+        return all(test)
+
+    def matches(self, response: Response) -> bool:
+        for elem in response:
+            if isinstance(elem.result, JsonResult) and \
+                    self.evaluate(elem.result):
+                return True
+        return False
+
+    def _test(self, value) -> bool:
+        try:
+            return bool(self._compare(value, self.value))
+        except TypeError:
+            # e.g. comparing a string to a number with '<'
+            return False
+
+
+def split_path(path: str) -> List[str]:
+    """Split a dotted path, honoring quoted segments"""
+
+    segments = []
+    for match in _SEGMENT_RE.finditer(path):
+        segment = match.group("bare")
+        if segment is None:
+            segment = match.group("dquoted")
+            if segment is None:
+                segment = match.group("squoted")
+        segments.append(segment)
+
+    return segments
+
+
+def resolve(data, segments: List[str]) -> List[Any]:
+    """Returns all values found at ``segments`` in ``data``"""
+
+    values = [data]
+
+    for segment in segments:
+        found = []
+        for value in values:
+            if isinstance(value, Mapping):
+                if segment == WILDCARD:
+                    found.extend(value.values())
+                elif segment in value:
+                    found.append(value[segment])
+            elif isinstance(value, (list, tuple)):
+                if segment == WILDCARD:
+                    found.extend(value)
+                else:
+                    try:
+                        found.append(value[int(segment)])
+                    except (ValueError, IndexError):
+                        pass
+        values = found
+
+    return values
+
+
+def _parse_value(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except ValueError:
+        return text.strip("'")
+
+
+def where(expression: str, quantifier: str = "all") -> Path:
+    """Parse a path expression into a :class:`Path` condition
+
+    >>> where('vrfs.default.peers.*.peerState == "Established"')
+    >>> where('interfaces.Ethernet1.interfaceCounters.inputErrors > 0')
+    >>> where('interfaces.*.description =~ "^uplink"', quantifier="any")
+
+    :param expression: ``<path> [<op> <value>]``, values are parsed as JSON
+        and fall back to a plain string
+    :param type: str
+
+    :return: :class:`Path` object
+    :rtype: eapi.conditions.Path
+    """
+
+    match = _EXPRESSION_RE.match(expression)
+    if not match:
+        raise ValueError("invalid expression: %s" % expression)
+
+    path, op, value = match.group("path", "op", "value")
+
+    if op is not None:
+        value = _parse_value(value)
+
+    return Path(path, op, value, quantifier=quantifier)
+
+
+ConditionLike = Union[str, RePattern, Callable[[JsonResult], bool],
+                      Condition]
+
+
+def compile_condition(condition: ConditionLike) -> Condition:
+    """Build a :class:`Condition` once, before it is evaluated repeatedly
+
+    Strings and compiled patterns are treated as regular expressions (for
+    backwards compatibility), other callables as a :class:`Predicate`.
+
+    :param condition: condition to compile
+    :param type: ConditionLike
+
+    :return: :class:`Condition` object
+    :rtype: eapi.conditions.Condition
+    """
+
+    if isinstance(condition, Condition):
+        return condition
+    elif isinstance(condition, (str, re.Pattern)):
+        return Regex(condition)
+    elif callable(condition):
+        return Predicate(condition)
+
+    raise TypeError("invalid condition: %r" % condition)
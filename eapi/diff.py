@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import hashlib
+import json
+
+from collections.abc import Mapping
+from typing import Any, List, Optional, Tuple
+
+import eapi.messages
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+Path = Tuple[Any, ...]
+
+
+class Change(object):
+    """A single difference between two snapshots
+
+    :param kind: one of 'added', 'removed' or 'changed'
+    :param path: tuple of keys/indexes leading to the value
+    :param old: previous value (``None`` when added)
+    :param new: current value (``None`` when removed)
+    """
+
+    def __init__(self, kind: str, path: Path, old: Any = None,
+                 new: Any = None):
+        self.kind = kind
+        self.path = path
+        self.old = old
+        self.new = new
+
+    def __eq__(self, other):
+        if not isinstance(other, Change):
+            return NotImplemented
+        return (self.kind, self.path, self.old, self.new) == \
+            (other.kind, other.path, other.old, other.new)
+
+    def __repr__(self):
+        return "Change(%r, %r, %r, %r)" % (self.kind, self.path, self.old,
+                                           self.new)
+
+    def __str__(self):
+        path = ".".join(str(p) for p in self.path)
+        if self.kind == ADDED:
+            return "+ %s: %r" % (path, self.new)
+        elif self.kind == REMOVED:
+            return "- %s: %r" % (path, self.old)
+        return "~ %s: %r -> %r" % (path, self.old, self.new)
+
+    def to_dict(self) -> dict:
+        return {
+            "kind": self.kind,
+            "path": list(self.path),
+            "old": self.old,
+            "new": self.new
+        }
+
+
+class HashNode(object):
+    """Digest of a subtree plus the digests of its children
+
+    ``children`` is a dict for mappings, a list for sequences and ``None`` for
+    scalar values.
+    """
+
+    __slots__ = ("digest", "children")
+
+    def __init__(self, digest: bytes, children=None):
+        self.digest = digest
+        self.children = children
+
+
+def _unwrap(value):
+    """reduce messages to plain python structures"""
+
+    if isinstance(value, eapi.messages.Response):
+        return [_unwrap(elem.result) for elem in value.elements]
+    elif isinstance(value, eapi.messages.ResponseElem):
+        return _unwrap(value.result)
+    elif isinstance(value, eapi.messages.JsonResult):
+        return dict(value)
+    elif isinstance(value, eapi.messages.TextResult):
+        return str(value)
+
+    return value
+
+
+def _is_sequence(value) -> bool:
+    return isinstance(value, (list, tuple))
+
+
+def hash_tree(value) -> HashNode:
+    """Build a tree of digests mirroring ``value``
+
+    :param value: JSON-like structure, ``JsonResult`` or ``Response``
+    :param type: Any
+
+    :return: :class:`HashNode` for the root of ``value``
+    """
+
+    value = _unwrap(value)
+
+    if isinstance(value, Mapping):
+        children = {}
+        h = hashlib.blake2b(b"d", digest_size=16)
+        for key in sorted(value, key=str):
+            child = hash_tree(value[key])
+            children[key] = child
+            h.update(repr(key).encode())
+            h.update(child.digest)
+        return HashNode(h.digest(), children)
+    elif _is_sequence(value):
+        children = []
+        h = hashlib.blake2b(b"l", digest_size=16)
+        for item in value:
+            child = hash_tree(item)
+            children.append(child)
+            h.update(child.digest)
+        return HashNode(h.digest(), children)
+
+    digest = hashlib.blake2b(repr((type(value).__name__, value)).encode(),
+                             digest_size=16).digest()
+    return HashNode(digest)
+
+
+def digest(value) -> bytes:
+    """Returns a digest of the content of ``value``"""
+    return hash_tree(value).digest
+
+
+def _plain(value):
+    """json.dumps fallback for messages and other non-JSON values"""
+    unwrapped = _unwrap(value)
+    return repr(value) if unwrapped is value else unwrapped
+
+
+def fingerprint(value) -> bytes:
+    """Returns a flat digest of the content of ``value``
+
+    Hashes one canonical serialization instead of every node, so it is much
+    cheaper than :func:`digest` for plain change detection.  The two do not
+    produce comparable values.
+    """
+    data = json.dumps(value, sort_keys=True, default=_plain)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).digest()
+
+
+def _walk(path: Path, old, new, old_node: HashNode, new_node: HashNode,
+          changes: List[Change]) -> None:
+
+    if old_node.digest == new_node.digest:
+        return
+
+    if isinstance(old, Mapping) and isinstance(new, Mapping):
+        for key in old:
+            if key not in new:
+                changes.append(Change(REMOVED, path + (key,), old=old[key]))
+
+        for key in new:
+            if key not in old:
+                changes.append(Change(ADDED, path + (key,), new=new[key]))
+            else:
+                _walk(path + (key,), old[key], new[key],
+                      old_node.children[key], new_node.children[key],
+                      changes)
+    elif _is_sequence(old) and _is_sequence(new):
+        common = min(len(old), len(new))
+        for idx in range(common):
+            _walk(path + (idx,), old[idx], new[idx],
+                  old_node.children[idx], new_node.children[idx], changes)
+
+        for idx in range(common, len(old)):
+            changes.append(Change(REMOVED, path + (idx,), old=old[idx]))
+
+        for idx in range(common, len(new)):
+            changes.append(Change(ADDED, path + (idx,), new=new[idx]))
+    else:
+        changes.append(Change(CHANGED, path, old=old, new=new))
+
+
+def diff(old, new) -> List[Change]:
+    """Structural diff between two snapshots
+
+    Subtrees with identical digests are skipped without being walked.
+
+    :param old: previous snapshot (``JsonResult``, ``Response`` or plain data)
+    :param type: Any
+    :param new: current snapshot
+    :param type: Any
+
+    :return: list of :class:`Change` objects
+    :rtype: list
+    """
+
+    old = _unwrap(old)
+    new = _unwrap(new)
+
+    changes: List[Change] = []
+    _walk((), old, new, hash_tree(old), hash_tree(new), changes)
+    return changes
+
+
+class Differ(object):
+    """Incremental diff across a stream of snapshots
+
+    The digest tree of the previous snapshot is cached, so each update only
+    hashes the new snapshot once.
+
+    >>> differ = Differ()
+    >>> differ.update(first)    # first snapshot is the baseline
+    []
+    >>> differ.update(second)
+    [Change('changed', (0, 'peers', '10.0.0.1', 'state'), 'Idle', 'Established')]
+    """
+
+    def __init__(self, initial=None):
+        self._data = None
+        self._tree: Optional[HashNode] = None
+
+        if initial is not None:
+            self.update(initial)
+
+    @property
+    def digest(self) -> Optional[bytes]:
+        """digest of the most recent snapshot"""
+        return self._tree.digest if self._tree else None
+
+    def reset(self) -> None:
+        """forget the cached snapshot"""
+        self._data = None
+        self._tree = None
+
+    def update(self, new) -> List[Change]:
+        """Compare ``new`` to the previous snapshot and cache it
+
+        :param new: current snapshot
+        :param type: Any
+
+        :return: list of changes (empty for the first snapshot)
+        :rtype: list
+        """
+
+        new = _unwrap(new)
+        tree = hash_tree(new)
+
+        changes: List[Change] = []
+        if self._tree is not None:
+            _walk((), self._data, new, self._tree, tree, changes)
+
+        self._data = new
+        self._tree = tree
+
+        return changes
@@ -0,0 +1,541 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import fnmatch
+import json
+import threading
+import time
+
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, \
+    Optional, Sequence, Union
+
+from eapi.exceptions import EapiError
+from eapi.mapreduce import Mapper, Reducer, Reduction, areduce
+from eapi.messages import PreparedRequest, Response, Target
+from eapi.sessions import AsyncSession
+from eapi.types import Auth, Command
+from eapi.util import bounded_as_completed
+
+# every host is a member of this group
+ALL = "all"
+
+# host options an inventory may set, per host or as defaults
+_OPTIONS = ("transport", "port", "username", "password")
+
+
+class Host(object):
+    """A device in the inventory
+
+    :param name: hostname (or address)
+    :param type: str
+    :param groups: groups the host belongs to
+    :param type: list
+    :param transport: 'http' or 'https' (default: the eAPI default)
+    :param type: str
+    :param port: port, if not the default for the transport
+    :param type: int
+    :param username: username, if not the fleet's
+    :param type: str
+    :param password: password, if not the fleet's
+    :param type: str
+    """
+
+    def __init__(self, name: str, groups: Sequence[str] = (),
+                 transport: Optional[str] = None, port: Optional[int] = None,
+                 username: Optional[str] = None,
+                 password: Optional[str] = None):
+        self.name = name
+        self.groups = list(groups)
+        self.target = Target(name, transport, int(port) if port else None)
+        self.username = username
+        self.password = password
+
+    def __repr__(self):
+        return "Host(%s, groups=%s)" % (self.name, self.groups)
+
+    @property
+    def auth(self) -> Optional[Auth]:
+        """the host's own credentials, if it has any"""
+        if self.username is None:
+            return None
+        return (self.username, self.password or "")
+
+
+def _parse_options(words: List[str], path: str, lineno: int) -> dict:
+    options = {}
+    for word in words:
+        key, sep, value = word.partition("=")
+        if not sep or key not in _OPTIONS:
+            raise ValueError("%s:%d: expected one of %s=VALUE, got %r" %
+                             (path, lineno, "/".join(_OPTIONS), word))
+        options[key] = value
+    return options
+
+
+def _load_text(text: str, path: str) -> List[Host]:
+    """INI style: '[group]' lines start a group, then one host per line
+
+    A host line may set options, e.g. 'spine1 port=8443 username=ops'.
+    Hosts listed in several groups are one host in all of them.
+    """
+
+    options: Dict[str, dict] = {}
+    groups: Dict[str, List[str]] = {}
+    group: Optional[str] = None
+
+    for lineno, line in enumerate(text.splitlines(), 1):
+        line = line.split("#", 1)[0].strip()
+        if not line:
+            continue
+
+        if line.startswith("[") and line.endswith("]"):
+            group = line[1:-1].strip()
+            continue
+
+        name, *words = line.split()
+        options.setdefault(name, {}).update(
+            _parse_options(words, path, lineno))
+
+        member = groups.setdefault(name, [])
+        if group and group not in member:
+            member.append(group)
+
+    return [Host(name, groups[name], **options[name]) for name in options]
+
+
+def _load_json(data: dict) -> List[Host]:
+    """{"defaults": {...}, "groups": {"spines": [...]}, "hosts": {...}}
+
+    ``hosts`` maps names to their options, ``defaults`` apply to every host
+    that does not set them.
+    """
+
+    defaults = data.get("defaults", {})
+    options = data.get("hosts", {})
+    groups: Dict[str, List[str]] = {}
+
+    for group, names in data.get("groups", {}).items():
+        for name in names:
+            groups.setdefault(name, [])
+            if group not in groups[name]:
+                groups[name].append(group)
+
+    names = list(options)
+    names.extend(n for n in groups if n not in options)
+
+    hosts = []
+    for name in names:
+        config = dict(defaults, **(options.get(name) or {}))
+        unknown = set(config) - set(_OPTIONS)
+        if unknown:
+            raise ValueError("unknown options for %s: %s" %
+                             (name, ", ".join(sorted(unknown))))
+        hosts.append(Host(name, groups.get(name, []), **config))
+
+    return hosts
+
+
+class Result(object):
+    """Outcome of running commands on one host"""
+
+    def __init__(self, host: Host, response: Optional[Response] = None,
+                 error: Optional[BaseException] = None,
+                 elapsed: float = 0.0):
+        self.host = host
+        self.response = response
+        self.error = error
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        if self.error is not None:
+            status = "error=%r" % self.error
+        else:
+            status = "code=%d" % self.response.code
+        return "Result(%s, %s)" % (self.host.name, status)
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and self.response.code == 0
+
+    def to_dict(self) -> dict:
+        out = {"host": self.host.name, "elapsed": self.elapsed}
+        if self.error is not None:
+            out["error"] = str(self.error) or self.error.__class__.__name__
+        else:
+            out.update(self.response.to_dict())
+        return out
+
+
+class Results(object):
+    """Results of a fleet run, in the order they completed
+
+    Iterating yields :class:`Result` objects in completion order, indexing
+    takes a host name or target URL.
+    """
+
+    def __init__(self):
+        self._results: Dict[str, Result] = {}
+        self._urls: Dict[str, str] = {}
+
+    def _add(self, result: Result) -> None:
+        self._results[result.host.name] = result
+        self._urls[result.host.target.url] = result.host.name
+
+    def __iter__(self) -> Iterator[Result]:
+        return iter(list(self._results.values()))
+
+    def __len__(self):
+        return len(self._results)
+
+    def __contains__(self, key):
+        return key in self._results or key in self._urls
+
+    def __getitem__(self, key: Union[str, Target]) -> Result:
+        key = str(key)
+        if key in self._results:
+            return self._results[key]
+        return self._results[self._urls[key]]
+
+    def __repr__(self):
+        return "Results(%d hosts, %d failed)" % (len(self),
+                                                 len(self.failed))
+
+    @property
+    def ok(self) -> bool:
+        return not self.failed
+
+    @property
+    def failed(self) -> List[Result]:
+        return [r for r in self._results.values() if not r.ok]
+
+    def to_dict(self) -> dict:
+        return {name: r.to_dict() for name, r in self._results.items()}
+
+
+class _LoopThread(object):
+    """An event loop running forever in a daemon thread"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever,
+                                        name="eapi-fleet", daemon=True)
+        self._thread.start()
+
+    def run(self, coro) -> Any:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join()
+        self.loop.close()
+
+
+_DONE = object()
+
+
+class Fleet(object):
+    """Hosts organized in groups, sharing one AsyncSession
+
+    Hosts come from an inventory (see :meth:`load`) and are selected by
+    group, name or glob pattern.  Commands run on the selected hosts with
+    at most ``concurrency`` in flight.  Hosts with their own credentials
+    send them on each request, the others use ``auth``.
+
+    The coroutine methods (:meth:`arun`, :meth:`astream`) must all be used
+    from one event loop.  The plain methods (:meth:`run`, :meth:`stream`)
+    run the same coroutines on a loop in a background thread; a fleet is
+    driven through one or the other.
+
+    >>> with eapi.Fleet.load("inventory.txt", auth=auth) as fleet:
+    ...     results = fleet.run(["show version"], "spines")
+    ...     print(results["spine1"].response)
+    ...     for result in fleet.stream(["show clock"], "leaf*"):
+    ...         print(result.host.name, result.ok)
+
+    :param hosts: the inventory
+    :param type: list
+    :param auth: credentials of hosts that have none of their own
+    :param type: Auth
+    :param concurrency: max hosts talked to at once
+    :param type: int
+    :param \\*\\*kwargs: passed to the `AsyncSession`
+    """
+
+    def __init__(self, hosts: Sequence[Host], auth: Optional[Auth] = None,
+                 concurrency: int = 50, **kwargs):
+        self.hosts: Dict[str, Host] = {h.name: h for h in hosts}
+        self.auth = auth
+        self.concurrency = concurrency
+
+        self._options = dict(kwargs, auth=auth)
+        self._session: Optional[AsyncSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[_LoopThread] = None
+
+    def __repr__(self):
+        return "Fleet(%d hosts, groups=%s)" % (len(self.hosts),
+                                               sorted(self.groups))
+
+    def __len__(self):
+        return len(self.hosts)
+
+    def __enter__(self) -> "Fleet":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    async def __aenter__(self) -> "Fleet":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        await self.aclose()
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "Fleet":
+        """Create a fleet from an inventory file
+
+        JSON inventories (a ``.json`` file, or any file starting with '{')
+        hold ``defaults``, ``groups`` and ``hosts``:
+
+            {"defaults": {"transport": "https"},
+             "groups": {"spines": ["spine1", "spine2"]},
+             "hosts": {"spine2": {"port": 8443, "username": "ops"}}}
+
+        Text inventories list hosts by group, with optional host options:
+
+            [spines]
+            spine1
+            spine2 port=8443 username=ops password=secret
+
+        :param path: inventory file
+        :param type: str
+        :param \\*\\*kwargs: see :class:`Fleet`
+        """
+
+        with open(path) as fh:
+            text = fh.read()
+
+        if path.endswith(".json") or text.lstrip().startswith("{"):
+            hosts = _load_json(json.loads(text))
+        else:
+            hosts = _load_text(text, path)
+
+        return cls(hosts, **kwargs)
+
+    @property
+    def groups(self) -> Dict[str, List[str]]:
+        """host names by group, including the 'all' group"""
+        groups: Dict[str, List[str]] = {ALL: list(self.hosts)}
+        for host in self.hosts.values():
+            for group in host.groups:
+                groups.setdefault(group, []).append(host.name)
+        return groups
+
+    def select(self, *names: str,
+               where: Optional[Callable[[Host], bool]] = None) -> List[Host]:
+        """Hosts matching any of ``names`` and the ``where`` filter
+
+        A name is a group, a host name or a glob pattern of host names.
+        With no names every host is selected.
+        """
+
+        groups = self.groups
+        selected: Dict[str, Host] = {}
+
+        for name in names or (ALL,):
+            if name in groups:
+                matched = groups[name]
+            elif name in self.hosts:
+                matched = [name]
+            else:
+                matched = fnmatch.filter(self.hosts, name)
+                if not matched:
+                    raise KeyError("no group or host matches %r" % name)
+            for host in matched:
+                selected[host] = self.hosts[host]
+
+        hosts = list(selected.values())
+        if where is not None:
+            hosts = [h for h in hosts if where(h)]
+        return hosts
+
+    @property
+    def session(self) -> AsyncSession:
+        """the shared session, created on first use"""
+        if self._session is None:
+            self._session = AsyncSession(**self._options)
+        return self._session
+
+    def _check_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if self._loop is None:
+            self._loop = loop
+        elif self._loop is not loop:
+            raise RuntimeError("a Fleet is bound to the event loop it was "
+                               "first used in")
+
+    async def astream(self, commands: Union[List[Command], PreparedRequest],
+                      *names: str,
+                      where: Optional[Callable[[Host], bool]] = None,
+                      encoding: Optional[str] = None,
+                      concurrency: Optional[int] = None,
+                      **kwargs) -> AsyncIterator[Result]:
+        """Run commands on the selected hosts, yield results as they complete
+
+        :param commands: commands (or a `PreparedRequest`) to run
+        :param type: list
+        :param names: groups, hosts or patterns (default: all hosts)
+        :param type: str
+        :param where: only hosts for which this returns True
+        :param type: Callable
+        :param encoding: response encoding 'json' or 'text' (default: json)
+        :param type: str
+        :param concurrency: max hosts at once (default: the fleet's)
+        :param type: int
+        :param \\*\\*kwargs: pass through ``httpx`` options
+        """
+
+        self._check_loop()
+
+        hosts = self.select(*names, where=where)
+        session = self.session
+
+        async def _run(host: Host) -> Result:
+            options = dict(kwargs)
+            if host.auth is not None:
+                options.setdefault("auth", host.auth)
+
+            start = time.perf_counter()
+            try:
+                response = await session.call(host.target, commands,
+                                              encoding, **options)
+            except EapiError as exc:
+                return Result(host, error=exc,
+                              elapsed=time.perf_counter() - start)
+            return Result(host, response,
+                          elapsed=time.perf_counter() - start)
+
+        async for host, result, error in bounded_as_completed(
+                _run, hosts, concurrency or self.concurrency):
+            if error:
+                raise error
+            yield result
+
+    async def arun(self, commands: Union[List[Command], PreparedRequest],
+                   *names: str, **kwargs) -> Results:
+        """Run commands on the selected hosts and wait for all of them
+
+        See :meth:`astream` for the parameters.
+        """
+
+        results = Results()
+        async for result in self.astream(commands, *names, **kwargs):
+            results._add(result)
+        return results
+
+    async def amapreduce(self,
+                         commands: Union[List[Command], PreparedRequest],
+                         mapper: Mapper, reducer: Reducer, *names: str,
+                         **kwargs) -> Reduction:
+        """Run commands on the selected hosts, folding responses as they
+        complete, see :func:`eapi.mapreduce.amapreduce`
+
+        See :meth:`astream` for the other parameters.
+        """
+        return await areduce(self.astream(commands, *names, **kwargs),
+                             mapper, reducer)
+
+    async def aclose(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _background(self) -> _LoopThread:
+        if self._thread is None:
+            self._thread = _LoopThread()
+        return self._thread
+
+    def run(self, commands: Union[List[Command], PreparedRequest],
+            *names: str, **kwargs) -> Results:
+        """:meth:`arun` on the background loop"""
+        return self._background().run(self.arun(commands, *names, **kwargs))
+
+    def stream(self, commands: Union[List[Command], PreparedRequest],
+               *names: str, buffer: Optional[int] = None,
+               **kwargs) -> Iterator[Result]:
+        """:meth:`astream` on the background loop
+
+        Results wait in a queue of at most ``buffer`` entries (default: the
+        concurrency) until the caller takes them; when it falls behind no
+        more hosts are started.  Stopping the iteration early cancels the
+        hosts still in flight.
+        """
+
+        if buffer is None:
+            buffer = kwargs.get("concurrency") or self.concurrency
+        if buffer < 1:
+            raise ValueError("buffer must be >= 1")
+
+        background = self._background()
+
+        async def _queue() -> asyncio.Queue:
+            # created on the background loop, which it is bound to
+            return asyncio.Queue(maxsize=buffer)
+
+        results = background.run(_queue())
+
+        async def _pump():
+            completed = self.astream(commands, *names, **kwargs)
+            cancelled = False
+            try:
+                async for result in completed:
+                    await results.put(result)
+            except asyncio.CancelledError:
+                # the caller stopped, nobody is left to take _DONE
+                cancelled = True
+                raise
+            finally:
+                await completed.aclose()
+                if not cancelled:
+                    await results.put(_DONE)
+
+        future = background.submit(_pump())
+
+        finished = False
+        try:
+            while True:
+                result = background.run(results.get())
+                if result is _DONE:
+                    finished = True
+                    break
+                yield result
+        finally:
+            if not finished:
+                future.cancel()
+
+        # raises what went wrong, if anything
+        future.result()
+
+    def mapreduce(self, commands: Union[List[Command], PreparedRequest],
+                  mapper: Mapper, reducer: Reducer, *names: str,
+                  **kwargs) -> Reduction:
+        """:meth:`amapreduce` on the background loop"""
+        return self._background().run(
+            self.amapreduce(commands, mapper, reducer, *names, **kwargs))
+
+    def close(self) -> None:
+        """close the session and stop the background loop
+
+        Use :meth:`aclose` for a fleet driven from your own event loop.
+        """
+
+        if self._thread is not None:
+            self._thread.run(self.aclose())
+            self._thread.stop()
+            self._thread = None
@@ -0,0 +1,283 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import abc
+import asyncio
+import heapq
+import inspect
+import itertools
+
+from typing import Any, AsyncIterable, Callable, Dict, List, Optional, \
+    Tuple, Union
+
+from eapi.exceptions import EapiError
+from eapi.messages import PreparedRequest, Response, Target
+from eapi.sessions import AsyncSession
+from eapi.types import Auth, Certificate, Command
+from eapi.util import bounded_as_completed
+
+# map(response) returns a value for the reducer, None to skip the response,
+# or a generator of values
+Mapper = Callable[[Response], Any]
+
+
+class Reducer(abc.ABC):
+    """Folds values into a result, one value at a time"""
+
+    @abc.abstractmethod
+    def add(self, value: Any) -> None:
+        """fold in one value"""
+
+    @property
+    @abc.abstractmethod
+    def result(self) -> Any:
+        """the result of the values added so far"""
+
+
+class Count(Reducer):
+    """number of values"""
+
+    def __init__(self):
+        self.count = 0
+
+    def __repr__(self):
+        return "Count(%d)" % self.count
+
+    def add(self, value: Any) -> None:
+        self.count += 1
+
+    @property
+    def result(self) -> int:
+        return self.count
+
+
+class Sum(Reducer):
+    """sum of numeric values"""
+
+    def __init__(self):
+        self.total = 0
+
+    def __repr__(self):
+        return "Sum(%r)" % self.total
+
+    def add(self, value: Any) -> None:
+        self.total += value
+
+    @property
+    def result(self) -> Union[int, float]:
+        return self.total
+
+
+class GroupBy(Reducer):
+    """(key, value) pairs folded into one reducer per key
+
+    >>> GroupBy(Count)     # e.g. devices per EOS version
+    >>> GroupBy(Sum)       # e.g. errors per interface type
+
+    :param reducer: creates the reducer of a new key (default: Count)
+    :param type: Callable
+    """
+
+    def __init__(self, reducer: Callable[[], Reducer] = Count):
+        self._factory = reducer
+        self.groups: Dict[Any, Reducer] = {}
+
+    def __repr__(self):
+        return "GroupBy(%d groups)" % len(self.groups)
+
+    def add(self, value: Tuple[Any, Any]) -> None:
+        key, value = value
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = self._factory()
+        group.add(value)
+
+    @property
+    def result(self) -> Dict[Any, Any]:
+        return {key: group.result for key, group in self.groups.items()}
+
+
+class TopK(Reducer):
+    """the ``k`` largest values, largest first
+
+    :param k: number of values to keep
+    :param type: int
+    :param key: ranks values by ``key(value)`` (default: the value)
+    :param type: Callable
+    """
+
+    def __init__(self, k: int, key: Optional[Callable[[Any], Any]] = None):
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        self.k = k
+        self.key = key
+        self._heap: List[tuple] = []
+        # breaks ties without comparing the values themselves
+        self._counter = itertools.count()
+
+    def __repr__(self):
+        return "TopK(%d)" % self.k
+
+    def add(self, value: Any) -> None:
+        rank = self.key(value) if self.key else value
+        entry = (rank, next(self._counter), value)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif rank > self._heap[0][0]:
+            heapq.heapreplace(self._heap, entry)
+
+    @property
+    def result(self) -> List[Any]:
+        return [value for _, _, value in sorted(self._heap, reverse=True)]
+
+
+class Reduction(object):
+    """Outcome of a map-reduce run
+
+    ``errors`` counts the responses that were not mapped, keyed by error
+    message: calls that failed outright and responses with an error code.
+    """
+
+    def __init__(self, reducer: Reducer):
+        self.reducer = reducer
+        self.responses = 0
+        self.errors: Dict[str, int] = {}
+
+    def __repr__(self):
+        return "Reduction(%r, %d responses, %d errors)" % (
+            self.reducer, self.responses, self.error_count)
+
+    @property
+    def result(self) -> Any:
+        return self.reducer.result
+
+    @property
+    def error_count(self) -> int:
+        return sum(self.errors.values())
+
+    def error(self, message: str) -> None:
+        self.errors[message] = self.errors.get(message, 0) + 1
+
+    def feed(self, mapper: Mapper, response: Optional[Response],
+             error: Optional[BaseException] = None) -> None:
+        """map one response (or count its error) into the reducer"""
+
+        if response is None:
+            self.error(str(error) or error.__class__.__name__)
+            return
+
+        self.responses += 1
+        if response.code != 0:
+            self.error("%d %s" % (response.code, response.message))
+            return
+
+        value = mapper(response)
+        if value is None:
+            return
+        if inspect.isgenerator(value):
+            for item in value:
+                self.reducer.add(item)
+        else:
+            self.reducer.add(value)
+
+    def to_dict(self) -> dict:
+        return {
+            "result": self.result,
+            "responses": self.responses,
+            "errors": self.error_count,
+            "error_messages": dict(self.errors)
+        }
+
+
+async def areduce(results: AsyncIterable, mapper: Mapper,
+                  reducer: Reducer) -> Reduction:
+    """Fold a stream of results as they arrive
+
+    :param results: async iterable of objects with ``response`` and
+        ``error`` attributes, e.g. ``Fleet.astream(...)``
+    :param type: AsyncIterable
+    """
+
+    reduction = Reduction(reducer)
+    async for result in results:
+        reduction.feed(mapper, result.response, result.error)
+    return reduction
+
+
+async def amapreduce(targets: List[Union[str, Target]],
+                     commands: Union[List[Command], PreparedRequest],
+                     mapper: Mapper,
+                     reducer: Reducer,
+                     encoding: Optional[str] = None,
+                     concurrency: int = 50,
+                     auth: Optional[Auth] = None,
+                     cert: Optional[Certificate] = None,
+                     verify: Optional[bool] = None,
+                     session: Optional[AsyncSession] = None,
+                     **kwargs) -> Reduction:
+    """Run commands on many targets and fold the responses as they arrive
+
+    Each response is passed to ``mapper`` and then dropped, so memory does
+    not grow with the number of targets.  ``mapper`` returns the value to
+    add to ``reducer``, None to skip the response, or a generator of values.
+    Targets failing with an ``EapiError`` are counted as errors, any other
+    exception is raised.
+
+    >>> reduction = await amapreduce(
+    ...     targets, ["show version"],
+    ...     lambda r: (r[0].result["version"], 1), GroupBy(Count))
+    >>> reduction.result
+    {'4.23.2F': 112, '4.24.1F': 8}
+
+    :param targets: eAPI targets
+    :param type: list
+    :param commands: commands (or a `PreparedRequest`) to run on each target
+    :param type: list
+    :param mapper: maps a response to values
+    :param type: Callable
+    :param reducer: folds the values, e.g. :class:`Count`, :class:`Sum`,
+        :class:`GroupBy` or :class:`TopK`
+    :param type: Reducer
+    :param concurrency: max targets at once
+    :param type: int
+    :param session: use an existing session instead of creating one
+    :param type: AsyncSession
+    :param \\*\\*kwargs: pass through ``httpx`` options
+
+    :return: :class:`Reduction` object
+    :rtype: eapi.mapreduce.Reduction
+    """
+
+    if not session:
+        async with AsyncSession(auth=auth, cert=cert, verify=verify) as sess:
+            return await amapreduce(targets, commands, mapper, reducer,
+                                    encoding, concurrency, session=sess,
+                                    **kwargs)
+
+    async def _call(target):
+        return await session.call(target, commands, encoding, **kwargs)
+
+    reduction = Reduction(reducer)
+    async for _, response, error in bounded_as_completed(_call, targets,
+                                                         concurrency):
+        if error is not None and not isinstance(error, EapiError):
+            # a bug or a cancellation, not a device failing
+            raise error
+        reduction.feed(mapper, response, error)
+
+    return reduction
+
+
+def mapreduce(targets: List[Union[str, Target]],
+              commands: Union[List[Command], PreparedRequest],
+              mapper: Mapper,
+              reducer: Reducer,
+              **kwargs) -> Reduction:
+    """Run commands on many targets and fold the responses as they arrive
+
+    Runs :func:`amapreduce` in a new event loop.
+    """
+
+    return asyncio.run(amapreduce(targets, commands, mapper, reducer,
+                                  **kwargs))
@@ -2,19 +2,20 @@
 # Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+import itertools
 import json
 import re
+import uuid
 
 from collections.abc import Mapping
 from pprint import pformat
 from typing import List, Union, Optional
-from typing_extensions import TypedDict
 
-import eapi.sessions
+import eapi.diff
 
 from eapi.environments import EAPI_DEFAULT_TRANSPORT
-from eapi.types import Command
-from eapi.util import zpad, indent
+from eapi.types import Command, Request, TypedDict
+from eapi.util import prepare_request, zpad, indent
 
 _TRANSPORTS = {"http": 80, "https": 443}
 _TARGET_RE = re.compile(r"^(?:(?P<transport>\w+)\:\/\/)?"
@@ -47,6 +48,10 @@ class JsonResult(Mapping):
     def pretty(self):
         return pformat(self._data)
 
+    def diff(self, other: "JsonResult") -> List["eapi.diff.Change"]:
+        """Structural changes from ``other`` (older) to this result"""
+        return eapi.diff.diff(other, self)
+
 
 class TextResult(object):
     def __init__(self, result: str):
@@ -85,6 +90,11 @@ class ResponseElem(object):
             "result": result
         }
 
+    @property
+    def digest(self) -> bytes:
+        """digest of the result content, used to detect changes"""
+        return eapi.diff.fingerprint(self)
+
     def __str__(self):
         return str(self.result)
 
@@ -97,6 +107,9 @@ class Response(Mapping):
         self.elements = elements
         self.error = error
 
+        # eapi.metrics.Timings of the request, set by the session
+        self.timings = None
+
     def __contains__(self, name):
         return name in self.__str__()
 
@@ -125,10 +138,22 @@ class Response(Mapping):
     def json(self):
         return json.dumps(self.to_dict())
 
+    @property
+    def digest(self) -> bytes:
+        """digest over the status and each command's result"""
+        return eapi.diff.fingerprint([self.code, self.message, self])
+
     @property
     def pretty(self):
         return str(self)
 
+    def diff(self, other: "Response") -> List["eapi.diff.Change"]:
+        """Structural changes from ``other`` (older) to this response
+
+        Paths are prefixed with the index of the command in the request.
+        """
+        return eapi.diff.diff(other, self)
+
     def to_dict(self) -> dict:
         out = {}
         out["target"] = self._target.url
@@ -188,6 +213,63 @@ class Response(Mapping):
         return cls(target, elements, error)
 
 
+class PreparedRequest(object):
+    """A runCmds request that is normalized and serialized once
+
+    The body is stored as bytes with the request id left open, so each send
+    only appends a new id.  Instances can be passed in place of a command list
+    to ``Session.call``/``AsyncSession.call`` and shared between targets.
+
+    >>> prepared = PreparedRequest(["show version"], encoding="json")
+    >>> sess.call("veos1", prepared)
+    >>> sess.call("veos2", prepared)
+    """
+
+    def __init__(self, commands: Union[Command, List[Command]],
+                 encoding: Optional[str] = None, streaming: bool = False):
+
+        request = prepare_request(commands, encoding, streaming)
+        del request["id"]
+        self._request: Request = request
+
+        # everything but the closing brace, the id is appended per send
+        body = json.dumps(request).encode("utf-8")
+        self._head = body[:-1] + b', "id": '
+
+        self._id_prefix = uuid.uuid4().hex[:12]
+        self._counter = itertools.count(1)
+
+    @property
+    def request(self) -> Request:
+        """the request (without an id)"""
+        return self._request
+
+    @property
+    def commands(self) -> List[Command]:
+        return self._request["params"]["cmds"]
+
+    @property
+    def encoding(self) -> str:
+        return self._request["params"]["format"]
+
+    def next_id(self) -> str:
+        return "%s-%d" % (self._id_prefix, next(self._counter))
+
+    def body(self, request_id: Optional[str] = None) -> bytes:
+        """Serialized request with ``request_id`` patched in
+
+        :param request_id: JSON-RPC id (default: a new unique id)
+        :param type: str
+
+        :return: request body
+        :rtype: bytes
+        """
+        if request_id is None:
+            return self._head + b'"' + self.next_id().encode() + b'"}'
+
+        return self._head + json.dumps(request_id).encode("utf-8") + b"}"
+
+
 class Target(object):
 
     def __init__(self, hostname, transport: Optional[str],
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import inspect
+import threading
+import time
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# request phases in the order they happen
+#   queue: waiting for a pooled connection (and building the request)
+#   connect: DNS lookup and TCP connect, only when a connection is opened
+#   tls: TLS handshake, only when a connection is opened
+#   send: writing the request
+#   wait: waiting for the response headers, mostly the device running the
+#         commands
+#   receive: reading the response body
+#   decode: parsing the JSON body into a Response
+PHASES = ("queue", "connect", "tls", "send", "wait", "receive", "decode")
+
+# httpcore trace events (without the .started/.complete suffix) per phase
+_EVENT_PHASES = {
+    "connection.connect_tcp": "connect",
+    "connection.connect_unix_socket": "connect",
+    "connection.start_tls": "tls",
+    "http11.send_request_headers": "send",
+    "http11.send_request_body": "send",
+    "http11.receive_response_headers": "wait",
+    "http11.receive_response_body": "receive",
+    "http2.send_request_headers": "send",
+    "http2.send_request_body": "send",
+    "http2.receive_response_headers": "wait",
+    "http2.receive_response_body": "receive",
+}
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1.0, 2.5, 5.0, 10.0)
+
+
+class Timings(object):
+    """Phase timings of a single request, in seconds
+
+    Phases are measured with the httpx ``trace`` request extension, see
+    :data:`PHASES`.  Phases that did not happen (e.g. ``connect`` when a
+    pooled connection was reused) are missing from ``phases``.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+        self.total = 0.0
+        # a new connection was opened for this request
+        self.connected = False
+
+        self._first: Optional[float] = None
+        self._started: Dict[str, float] = {}
+
+    def __repr__(self):
+        return "Timings(%s, total=%.4f)" % (
+            ", ".join("%s=%.4f" % item for item in self.phases.items()),
+            self.total)
+
+    def __getitem__(self, phase: str) -> float:
+        return self.phases.get(phase, 0.0)
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+
+    def finish(self) -> None:
+        self.total = time.perf_counter() - self.start
+
+    def trace(self, name: str, info: dict) -> None:
+        """httpx trace callback"""
+
+        now = time.perf_counter()
+
+        if self._first is None:
+            # nothing is traced while the request waits for a connection
+            self._first = now
+            self.add("queue", now - self.start)
+
+        event, _, stage = name.rpartition(".")
+        phase = _EVENT_PHASES.get(event)
+        if phase is None:
+            return
+
+        if stage == "started":
+            self._started[event] = now
+        elif stage in ("complete", "failed"):
+            began = self._started.pop(event, None)
+            if began is not None:
+                self.add(phase, now - began)
+            if phase == "connect" and stage == "complete":
+                self.connected = True
+
+    async def atrace(self, name: str, info: dict) -> None:
+        """httpx trace callback for async clients"""
+        self.trace(name, info)
+
+    def extensions(self, extensions: Optional[dict] = None,
+                   asynchronous: bool = False) -> dict:
+        """Request extensions with this object's trace callback installed
+
+        A ``trace`` callback already in ``extensions`` is still called.
+        """
+
+        extensions = dict(extensions or {})
+        other = extensions.get("trace")
+        own = self.atrace if asynchronous else self.trace
+
+        if other is None:
+            extensions["trace"] = own
+        elif asynchronous:
+            async def _trace(name, info):
+                self.trace(name, info)
+                ret = other(name, info)
+                if inspect.isawaitable(ret):
+                    await ret
+            extensions["trace"] = _trace
+        else:
+            def _trace(name, info):
+                self.trace(name, info)
+                other(name, info)
+            extensions["trace"] = _trace
+
+        return extensions
+
+    def to_dict(self) -> dict:
+        out = {phase: self.phases[phase] for phase in PHASES
+               if phase in self.phases}
+        out["total"] = self.total
+        return out
+
+
+class Histogram(object):
+    """Cumulative histogram with fixed upper bounds, in seconds"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        """(upper bound, count of values <= bound), ending with +Inf"""
+        out = []
+        running = 0
+        for bound, count in zip(self.buckets, self.counts):
+            running += count
+            out.append((bound, running))
+        out.append((float("inf"), self.count))
+        return out
+
+
+def _labels(**labels) -> str:
+    return "{%s}" % ",".join(
+        '%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"'))
+        for k, v in labels.items())
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Registry(object):
+    """In-process per-target request counters and latency histograms
+
+    Pass a registry to a session (``Session(metrics=registry)``) to record
+    every call, and serve :meth:`export` to Prometheus.
+
+    >>> registry = eapi.metrics.REGISTRY
+    >>> with eapi.Session(auth=auth, metrics=registry) as sess:
+    ...     sess.call("veos1", ["show version"])
+    >>> print(registry.export())
+
+    :param buckets: histogram bucket upper bounds in seconds
+    :param type: list
+    :param prefix: metric name prefix
+    :param type: str
+    """
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS,
+                 prefix: str = "eapi"):
+        self.buckets = tuple(buckets)
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._requests: Dict[str, int] = {}
+            self._errors: Dict[str, int] = {}
+            self._connections: Dict[str, int] = {}
+            self._latency: Dict[str, Histogram] = {}
+            self._phases: Dict[Tuple[str, str], Histogram] = {}
+
+    def _histogram(self, store: dict, key) -> Histogram:
+        if key not in store:
+            store[key] = Histogram(self.buckets)
+        return store[key]
+
+    def observe(self, target, timings: Timings, error: bool = False) -> None:
+        """Record one request to ``target``"""
+
+        key = str(target)
+
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+            if error:
+                self._errors[key] = self._errors.get(key, 0) + 1
+            if timings.connected:
+                self._connections[key] = self._connections.get(key, 0) + 1
+
+            self._histogram(self._latency, key).observe(timings.total)
+            for phase, seconds in timings.phases.items():
+                self._histogram(self._phases, (key, phase)).observe(seconds)
+
+    def to_dict(self) -> dict:
+        """per-target counts and mean latencies"""
+
+        with self._lock:
+            out = {}
+            for key, count in self._requests.items():
+                latency = self._latency.get(key)
+                out[key] = {
+                    "requests": count,
+                    "errors": self._errors.get(key, 0),
+                    "connections": self._connections.get(key, 0),
+                    "mean": latency.sum / latency.count if latency and
+                    latency.count else 0.0,
+                    "phases": {
+                        phase: hist.sum / hist.count
+                        for (target, phase), hist in self._phases.items()
+                        if target == key and hist.count
+                    }
+                }
+            return out
+
+    def export(self) -> str:
+        """Metrics in the Prometheus text exposition format"""
+
+        name = self.prefix
+        lines: List[str] = []
+
+        def _counter(metric, help_, values):
+            lines.append("# HELP %s_%s %s" % (name, metric, help_))
+            lines.append("# TYPE %s_%s counter" % (name, metric))
+            for key, value in sorted(values.items()):
+                lines.append("%s_%s%s %d" % (name, metric,
+                                             _labels(target=key), value))
+
+        def _histogram(metric, help_, histograms):
+            lines.append("# HELP %s_%s %s" % (name, metric, help_))
+            lines.append("# TYPE %s_%s histogram" % (name, metric))
+            for labels, hist in histograms:
+                for bound, count in hist.cumulative():
+                    lines.append("%s_%s_bucket%s %d" % (
+                        name, metric, _labels(le=_number(bound), **labels),
+                        count))
+                lines.append("%s_%s_sum%s %s" % (name, metric,
+                                                 _labels(**labels),
+                                                 _number(hist.sum)))
+                lines.append("%s_%s_count%s %d" % (name, metric,
+                                                   _labels(**labels),
+                                                   hist.count))
+
+        with self._lock:
+            _counter("requests_total", "Requests sent", self._requests)
+            _counter("request_errors_total", "Requests that failed",
+                     self._errors)
+            _counter("connections_total", "Connections opened",
+                     self._connections)
+            _histogram("request_duration_seconds", "Request latency",
+                       [({"target": key}, hist) for key, hist in
+                        sorted(self._latency.items())])
+            _histogram("request_phase_duration_seconds",
+                       "Request latency by phase",
+                       [({"target": key, "phase": phase}, hist)
+                        for (key, phase), hist in
+                        sorted(self._phases.items())])
+
+        return "\n".join(lines) + "\n"
+
+
+# shared registry for applications that only need one
+REGISTRY = Registry()
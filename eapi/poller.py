@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import inspect
+import random
+import time
+
+from typing import Callable, Dict, List, Optional, Union
+
+from eapi.exceptions import EapiError
+from eapi.messages import PreparedRequest, Response, Target
+from eapi.sessions import AsyncSession
+from eapi.types import Command
+from eapi.util import Ticker
+
+
+class Job(object):
+    """A set of commands polled on a list of targets at a fixed interval
+
+    Jobs are created with :meth:`Poller.add` and collect scheduling stats
+    across all of their targets.
+    """
+
+    def __init__(self, targets: List[Union[str, Target]],
+                 commands: List[Command], interval: float,
+                 encoding: Optional[str] = None,
+                 name: Optional[str] = None):
+
+        self.targets = [Target.from_string(t) for t in targets]
+        self.request = PreparedRequest(commands, encoding)
+        self.interval = interval
+        self.name = name or ", ".join(c["cmd"] for c in self.request.commands)
+
+        self.runs = 0
+        self.errors = 0
+        # cycles skipped because a previous cycle (or the consumer) overran
+        self.skipped = 0
+        self.max_lateness = 0.0
+        self._total_lateness = 0.0
+
+    def __repr__(self):
+        return "Job(%r, interval=%r)" % (self.name, self.interval)
+
+    @property
+    def mean_lateness(self) -> float:
+        if not self.runs:
+            return 0.0
+        return self._total_lateness / self.runs
+
+    def stats(self) -> dict:
+        return {
+            "name": self.name,
+            "interval": self.interval,
+            "targets": len(self.targets),
+            "runs": self.runs,
+            "errors": self.errors,
+            "skipped": self.skipped,
+            "mean_lateness": self.mean_lateness,
+            "max_lateness": self.max_lateness
+        }
+
+    def _record(self, lateness: float, skipped: int) -> None:
+        self.runs += 1
+        self.skipped += skipped
+        self._total_lateness += lateness
+        self.max_lateness = max(self.max_lateness, lateness)
+
+
+class PollResult(object):
+    """Outcome of one poll of one target
+
+    :param job: the :class:`Job` that was polled
+    :param target: the target polled
+    :param response: the response, ``None`` if the call failed
+    :param error: the exception raised by the call, if any
+    :param lateness: seconds the poll started after its scheduled time
+    :param elapsed: seconds the call took (including per-target queueing)
+    """
+
+    def __init__(self, job: Job, target: Target,
+                 response: Optional[Response] = None,
+                 error: Optional[Exception] = None,
+                 lateness: float = 0.0, elapsed: float = 0.0):
+        self.job = job
+        self.target = target
+        self.response = response
+        self.error = error
+        self.lateness = lateness
+        self.elapsed = elapsed
+
+    def __repr__(self):
+        status = "error=%r" % self.error if self.error else "ok"
+        return "PollResult(%r, %s, %s)" % (self.job.name, self.target, status)
+
+
+class Poller(object):
+    """Polls many jobs across many targets from one ``AsyncSession``
+
+    Each (job, target) pair runs on its own fixed cadence, with its first poll
+    delayed by a random offset of up to ``jitter * interval`` so targets are
+    not all hit at once.  At most ``per_target`` requests are in flight to a
+    target at any time.
+
+    Results are delivered to ``callback`` when one is given, otherwise they
+    can be consumed with ``async for``.  Delivery waits for the consumer, so
+    a slow consumer holds back polling and the cycles that are missed are
+    recorded in ``Job.skipped``.
+
+    >>> poller = eapi.Poller(auth=("admin", ""))
+    >>> poller.add(["veos1", "veos2"], ["show clock"], interval=5)
+    >>> async with poller:
+    ...     async for result in poller:
+    ...         print(result.response)
+
+    :param session: use an existing session instead of creating one
+    :param type: AsyncSession
+    :param callback: function or coroutine called with each ``PollResult``
+    :param type: Callable
+    :param jitter: fraction of the interval to spread start times over
+    :param type: float
+    :param per_target: max concurrent requests per target
+    :param type: int
+    :param max_pending: max undelivered results before polling is held back
+    :param type: int
+    :param \\*\\*kwargs: ``AsyncSession`` options if no session is given
+    """
+
+    def __init__(self, session: Optional[AsyncSession] = None,
+                 callback: Optional[Callable] = None,
+                 jitter: float = 1.0,
+                 per_target: int = 1,
+                 max_pending: int = 1000,
+                 **kwargs):
+
+        if per_target < 1:
+            raise ValueError("per_target must be >= 1")
+
+        self.jobs: List[Job] = []
+
+        self._session = session
+        self._session_options = kwargs
+        self._callback = callback
+        self._jitter = jitter
+        self._per_target = per_target
+        self._max_pending = max_pending
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._limits: Dict[str, asyncio.Semaphore] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._runner: Optional[asyncio.Future] = None
+        self._running = False
+        # wakes run() up to watch the tasks of jobs added while running
+        self._added: Optional[asyncio.Event] = None
+
+    def add(self, targets: List[Union[str, Target]], commands: List[Command],
+            interval: float, encoding: Optional[str] = None,
+            name: Optional[str] = None) -> Job:
+        """Add a job, may be called while the poller is running
+
+        :param targets: targets to poll
+        :param type: list
+        :param commands: commands sent on every poll
+        :param type: list
+        :param interval: seconds between polls
+        :param type: float
+        :param encoding: json or text (default: json)
+        :param type: str
+
+        :return: :class:`Job` object
+        :rtype: eapi.poller.Job
+        """
+
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+
+        job = Job(targets, commands, interval, encoding=encoding, name=name)
+        self.jobs.append(job)
+
+        if self._running:
+            self._start(job)
+
+        return job
+
+    def stats(self) -> List[dict]:
+        return [job.stats() for job in self.jobs]
+
+    def stop(self) -> None:
+        """stop polling, results already queued can still be consumed"""
+        self._running = False
+        for task in self._tasks:
+            task.cancel()
+
+    async def run(self, duration: Optional[float] = None) -> None:
+        """Poll until :meth:`stop` is called or ``duration`` expires
+
+        :param duration: seconds to run for (default: forever)
+        :param type: float
+        """
+
+        if self._running:
+            raise RuntimeError("poller is already running")
+
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._max_pending)
+
+        owned = self._session is None
+        if owned:
+            self._session = AsyncSession(**self._session_options)
+
+        loop = asyncio.get_running_loop()
+        deadline = None if duration is None else loop.time() + duration
+
+        self._running = True
+        self._added = asyncio.Event()
+        try:
+            for job in self.jobs:
+                self._start(job)
+
+            # jobs can be added while running, so wait until all are done,
+            # stopping everything as soon as one fails
+            while True:
+                failed = [t for t in self._tasks if t.done() and
+                          not t.cancelled() and t.exception() is not None]
+                if failed:
+                    self.stop()
+                    await asyncio.gather(*self._tasks, return_exceptions=True)
+                    raise failed[0].exception()
+
+                timeout = None
+                if deadline is not None:
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        deadline = None
+                        self.stop()
+                        continue
+
+                pending = [t for t in self._tasks if not t.done()]
+                if not pending and timeout is None:
+                    break
+
+                self._added.clear()
+                added = asyncio.ensure_future(self._added.wait())
+                try:
+                    await asyncio.wait(pending + [added], timeout=timeout,
+                                       return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    added.cancel()
+        finally:
+            self.stop()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+            self._tasks = []
+            self._added = None
+            if owned:
+                await self._session.close()
+                self._session = None
+
+    async def __aenter__(self) -> "Poller":
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.stop()
+        if self._runner:
+            await asyncio.gather(self._runner, return_exceptions=True)
+            self._runner = None
+
+    def __aiter__(self):
+        return self._results()
+
+    async def _results(self):
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self._max_pending)
+
+        runner = None
+        if not self._running:
+            runner = self._runner = asyncio.ensure_future(self.run())
+
+        try:
+            while True:
+                getter = asyncio.ensure_future(self._queue.get())
+                waiting = {getter}
+                if runner:
+                    waiting.add(runner)
+
+                await asyncio.wait(waiting,
+                                   return_when=asyncio.FIRST_COMPLETED)
+
+                if getter.done():
+                    yield getter.result()
+                    continue
+
+                getter.cancel()
+                # runner finished, drain whatever is left
+                while not self._queue.empty():
+                    yield self._queue.get_nowait()
+                runner.result()
+                break
+        finally:
+            if runner and not runner.done():
+                self.stop()
+                await asyncio.gather(runner, return_exceptions=True)
+
+    def _start(self, job: Job) -> None:
+        for target in job.targets:
+            self._tasks.append(asyncio.ensure_future(self._poll(job, target)))
+        if self._added is not None:
+            self._added.set()
+
+    def _limit(self, target: Target) -> asyncio.Semaphore:
+        key = str(target)
+        if key not in self._limits:
+            self._limits[key] = asyncio.Semaphore(self._per_target)
+        return self._limits[key]
+
+    async def _deliver(self, result: PollResult) -> None:
+        if self._callback:
+            ret = self._callback(result)
+            if inspect.isawaitable(ret):
+                await ret
+        else:
+            await self._queue.put(result)
+
+    async def _poll(self, job: Job, target: Target) -> None:
+        await asyncio.sleep(random.uniform(0, job.interval * self._jitter))
+
+        ticker = Ticker(job.interval)
+        limit = self._limit(target)
+
+        while self._running:
+            missed = ticker.missed
+            ticker.tick()
+            job._record(ticker.lateness, ticker.missed - missed)
+
+            result = PollResult(job, target, lateness=ticker.lateness)
+            start = time.monotonic()
+
+            async with limit:
+                try:
+                    result.response = await self._session.call(target,
+                                                               job.request)
+                except EapiError as exc:
+                    job.errors += 1
+                    result.error = exc
+
+            result.elapsed = time.monotonic() - start
+
+            await self._deliver(result)
+
+            await asyncio.sleep(ticker.delay())
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import gzip
+import json
+import os
+import re
+import threading
+import time
+
+from typing import Dict, List, Optional, Tuple, Union
+
+import httpx
+
+from eapi.types import Command
+
+COMMAND_PATH = "/command-api"
+
+# (target, encoding, normalized commands)
+Key = Tuple[str, str, str]
+
+# the "id" value of a response that starts with its jsonrpc/id members, as
+# eAPI responses do
+_ID_RE = re.compile(r'\s*\{\s*(?:"jsonrpc"\s*:\s*"[^"]*"\s*,\s*)?"id"\s*:\s*'
+                    r'(null|-?\d+|"(?:[^"\\]|\\.)*")\s*[,}]')
+
+
+def normalize(commands: List[Command]) -> str:
+    """Commands as a stable string, insensitive to extra whitespace"""
+
+    out = []
+    for command in commands:
+        if isinstance(command, dict):
+            command = dict(command, cmd=" ".join(command["cmd"].split()))
+        else:
+            command = " ".join(command.split())
+        out.append(command)
+
+    return json.dumps(out, sort_keys=True)
+
+
+def _target(url: httpx.URL) -> str:
+    if url.port:
+        return "%s:%d" % (url.host, url.port)
+    return url.host
+
+
+def _key(request: httpx.Request) -> Tuple[Key, Union[str, int, None]]:
+    """the store key of a command-api request and its JSON-RPC id"""
+
+    rpc = json.loads(request.content)
+    params = rpc["params"]
+    key = (_target(request.url), params.get("format", "json"),
+           normalize(params["cmds"]))
+    return key, rpc.get("id")
+
+
+class Store(object):
+    """Recorded command-api exchanges, kept in a gzipped NDJSON file
+
+    Each line holds one exchange: the target (``host[:port]``), encoding,
+    normalized commands, JSON-RPC id, HTTP status, elapsed seconds and the
+    response body.  Several exchanges with the same key are replayed in the
+    order they were recorded, e.g. the samples of a ``watch``.
+
+    :param path: file to load from and append to
+    :param type: str
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path
+        self.entries: Dict[Key, List[dict]] = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return sum(len(entries) for entries in self.entries.values())
+
+    def load(self, path: str) -> None:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if line.strip():
+                    self._add(json.loads(line))
+
+    def _add(self, entry: dict) -> None:
+        key = (entry["target"], entry["format"], entry["commands"])
+        self.entries.setdefault(key, []).append(entry)
+
+    def add(self, entry: dict) -> None:
+        """Keep an exchange and append it to the file (if any)"""
+
+        line = json.dumps(entry) + "\n"
+
+        with self._lock:
+            self._add(entry)
+            if self.path:
+                if self._file is None:
+                    # gzip members can be concatenated, so appending to an
+                    # earlier recording is fine
+                    self._file = gzip.open(self.path, "at", encoding="utf-8")
+                self._file.write(line)
+
+    def get(self, key: Key, index: int) -> Optional[dict]:
+        entries = self.entries.get(key)
+        if not entries:
+            return None
+        return entries[index % len(entries)]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class NotRecorded(httpx.TransportError):
+    """The replayed store has no exchange for a request"""
+
+
+class RecordingTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Records command-api exchanges while passing requests through
+
+    Works with both ``Session`` and ``AsyncSession``.  Requests go to
+    ``transport``, by default a plain httpx transport created with
+    ``**kwargs`` (``verify``, ``cert``...; a session's own ``verify`` and
+    ``cert`` do not apply to an explicit transport).
+
+    >>> transport = RecordingTransport("sweep.ndjson.gz", verify=False)
+    >>> with eapi.Session(auth=auth, transport=transport) as sess:
+    ...     sess.call("veos1", ["show version"])
+
+    :param store: a :class:`Store` or the path of one
+    :param type: Store
+    :param transport: httpx transport to record
+    :param type: httpx.BaseTransport
+    """
+
+    def __init__(self, store: Union[str, Store], transport=None, **kwargs):
+        self.store = Store(store) if isinstance(store, str) else store
+        self._transport = transport
+        self._kwargs = kwargs
+
+    def _record(self, request: httpx.Request, response: httpx.Response,
+                elapsed: float) -> None:
+
+        if request.url.path != COMMAND_PATH:
+            return
+
+        (target, encoding, commands), request_id = _key(request)
+        self.store.add({
+            "target": target,
+            "format": encoding,
+            "commands": commands,
+            "id": request_id,
+            "status": response.status_code,
+            "elapsed": elapsed,
+            "body": response.text
+        })
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        if self._transport is None:
+            self._transport = httpx.HTTPTransport(**self._kwargs)
+
+        start = time.perf_counter()
+        response = self._transport.handle_request(request)
+        response.read()
+        self._record(request, response, time.perf_counter() - start)
+        return response
+
+    async def handle_async_request(self,
+                                   request: httpx.Request) -> httpx.Response:
+        if self._transport is None:
+            self._transport = httpx.AsyncHTTPTransport(**self._kwargs)
+
+        start = time.perf_counter()
+        response = await self._transport.handle_async_request(request)
+        await response.aread()
+        self._record(request, response, time.perf_counter() - start)
+        return response
+
+    def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+        self.store.close()
+
+    async def aclose(self) -> None:
+        if self._transport is not None:
+            await self._transport.aclose()
+        self.store.close()
+
+
+def _with_id(body: str, request_id) -> str:
+    """the recorded JSON-RPC response with its id replaced
+
+    The id is patched in place, only bodies in another layout are decoded.
+    """
+    match = _ID_RE.match(body)
+    if match is not None:
+        start, end = match.span(1)
+        return body[:start] + json.dumps(request_id) + body[end:]
+
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return body
+    if not isinstance(message, dict) or "id" not in message:
+        return body
+    message["id"] = request_id
+    return json.dumps(message)
+
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """Answers requests from a recorded :class:`Store`, without a network
+
+    The JSON-RPC id of each recorded response is swapped for the id of the
+    request.  ``/login`` and ``/logout`` always succeed, so code that logs
+    in replays unchanged.  A request with no recording raises
+    :class:`NotRecorded` (an ``EapiError`` from a session).
+
+    :param store: a :class:`Store` or the path of one
+    :param type: Store
+    :param speed: replay recorded latencies divided by ``speed`` (e.g. 1.0
+        for real time, 10.0 for ten times faster), or none at all when
+        ``speed`` is 0 (default)
+    :param type: float
+    """
+
+    def __init__(self, store: Union[str, Store], speed: float = 0.0):
+        self.store = Store(store) if isinstance(store, str) else store
+        self.speed = speed
+        self._lock = threading.Lock()
+        self._served: Dict[Key, int] = {}
+
+    def _delay(self, entry: Optional[dict]) -> float:
+        if entry is None or not self.speed:
+            return 0.0
+        return entry["elapsed"] / self.speed
+
+    def _lookup(self, request: httpx.Request) -> Tuple[Optional[dict],
+                                                       httpx.Response]:
+        path = request.url.path
+
+        if path == "/login":
+            return None, httpx.Response(
+                200, headers={"Set-Cookie": "Session=replay; Path=/"})
+
+        if path == "/logout":
+            return None, httpx.Response(200)
+
+        if path != COMMAND_PATH:
+            return None, httpx.Response(404)
+
+        key, request_id = _key(request)
+
+        with self._lock:
+            index = self._served.get(key, 0)
+            self._served[key] = index + 1
+
+        entry = self.store.get(key, index)
+        if entry is None:
+            raise NotRecorded("no recording of %s for %s" % (key[2], key[0]),
+                              request=request)
+
+        body = entry["body"]
+        if entry["id"] is not None and request_id is not None:
+            body = _with_id(body, request_id)
+
+        return entry, httpx.Response(
+            entry["status"], content=body.encode("utf-8"),
+            headers={"Content-Type": "application/json"})
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        entry, response = self._lookup(request)
+        delay = self._delay(entry)
+        if delay:
+            time.sleep(delay)
+        return response
+
+    async def handle_async_request(self,
+                                   request: httpx.Request) -> httpx.Response:
+        import asyncio
+
+        entry, response = self._lookup(request)
+        delay = self._delay(entry)
+        if delay:
+            await asyncio.sleep(delay)
+        return response
+
+    def close(self) -> None:
+        pass
+
+    async def aclose(self) -> None:
+        pass
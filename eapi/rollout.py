@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import inspect
+import math
+import time
+
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from eapi.api import aconfigure
+from eapi.conditions import ConditionLike, compile_condition
+from eapi.exceptions import EapiError
+from eapi.messages import Target
+from eapi.sessions import AsyncSession
+from eapi.types import Auth, Certificate, Command
+from eapi.util import bounded_as_completed
+
+# a single canary, then 10%, 50% and the rest of the fleet
+DEFAULT_WAVES = (1, 0.1, 0.5, 1.0)
+
+WaveSpec = Union[int, float]
+
+
+class WaveResult(object):
+    """Outcome of one rollout wave
+
+    ``failed`` lists each failed target with the reason it failed, either
+    the configuration was rejected or the verification did not pass.  A
+    target listed more than once in the rollout fails once per entry.
+    """
+
+    def __init__(self, index: int, targets: List[Target]):
+        self.index = index
+        self.targets = targets
+        self.succeeded: List[Target] = []
+        self.failed: List[Tuple[Target, str]] = []
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        return "WaveResult(%d, %d ok, %d failed)" % (
+            self.index, len(self.succeeded), len(self.failed))
+
+    @property
+    def throughput(self) -> float:
+        """devices completed per second"""
+        if not self.elapsed:
+            return 0.0
+        return len(self.targets) / self.elapsed
+
+    def to_dict(self) -> dict:
+        return {
+            "wave": self.index,
+            "targets": len(self.targets),
+            "succeeded": len(self.succeeded),
+            "failed": [{"target": str(target), "reason": reason}
+                       for target, reason in self.failed],
+            "elapsed": self.elapsed,
+            "throughput": self.throughput
+        }
+
+
+class RolloutResult(object):
+    def __init__(self):
+        self.waves: List[WaveResult] = []
+        self.halted = False
+        self.reason: Optional[str] = None
+        self.pending: List[Target] = []
+        self.elapsed = 0.0
+
+    def __repr__(self):
+        status = "halted: %s" % self.reason if self.halted else "complete"
+        return "RolloutResult(%d waves, %s)" % (len(self.waves), status)
+
+    @property
+    def ok(self) -> bool:
+        return not self.halted
+
+    def to_dict(self) -> dict:
+        return {
+            "halted": self.halted,
+            "reason": self.reason,
+            "pending": [str(t) for t in self.pending],
+            "elapsed": self.elapsed,
+            "waves": [w.to_dict() for w in self.waves]
+        }
+
+
+def plan_waves(targets: Sequence, waves: Sequence[WaveSpec] = DEFAULT_WAVES
+               ) -> List[list]:
+    """Split targets into waves
+
+    An ``int`` is the number of devices in that wave, a ``float`` is the
+    fraction of the whole fleet that has been deployed once the wave is done.
+    Devices left over after the last spec form a final wave.
+
+    >>> [len(w) for w in plan_waves(range(100), (1, 0.1, 0.5))]
+    [1, 9, 40, 50]
+    """
+
+    targets = list(targets)
+    total = len(targets)
+    planned: List[list] = []
+    done = 0
+
+    for spec in waves:
+        if isinstance(spec, float):
+            if not 0 < spec <= 1:
+                raise ValueError("wave fractions must be > 0 and <= 1")
+            end = math.ceil(total * spec)
+        elif isinstance(spec, int) and spec > 0:
+            end = done + spec
+        else:
+            raise ValueError("invalid wave: %r" % spec)
+
+        end = min(end, total)
+        if end > done:
+            planned.append(targets[done:end])
+            done = end
+
+    if done < total:
+        planned.append(targets[done:])
+
+    return planned
+
+
+class Rollout(object):
+    """Deploy configuration across a fleet in waves
+
+    Each wave is configured with ``aconfigure`` over one shared session, with
+    at most ``concurrency`` devices at a time.  After a device is configured
+    the optional ``verify_command`` is run and checked against ``condition``
+    (any condition accepted by ``watch``, by default the command must
+    succeed).  When a wave has more than ``max_failures`` failed devices (a
+    count, or a fraction of the wave when a float) the rollout halts before
+    the next wave.  ``on_wave`` is called with each ``WaveResult`` and may
+    return ``False`` to halt as well.
+
+    >>> rollout = Rollout(targets, ["ntp server 10.0.0.1"],
+    ...                   verify_command="show ntp status",
+    ...                   condition=where("status == 'synchronised'"),
+    ...                   auth=("admin", ""))
+    >>> result = await rollout.run()
+    """
+
+    def __init__(self, targets: Sequence[Union[str, Target]],
+                 commands: List[Command],
+                 waves: Sequence[WaveSpec] = DEFAULT_WAVES,
+                 concurrency: int = 50,
+                 verify_command: Optional[Command] = None,
+                 condition: Optional[ConditionLike] = None,
+                 max_failures: Union[int, float] = 0,
+                 on_wave: Optional[Callable] = None,
+                 auth: Optional[Auth] = None,
+                 cert: Optional[Certificate] = None,
+                 verify: Optional[bool] = None,
+                 session: Optional[AsyncSession] = None,
+                 **kwargs):
+
+        self.targets = [Target.from_string(t) for t in targets]
+        self.commands = list(commands)
+        self.waves = plan_waves(self.targets, waves)
+        self.concurrency = concurrency
+        self.verify_command = verify_command
+        self.max_failures = max_failures
+        self.on_wave = on_wave
+
+        self._check = compile_condition(condition) if condition else None
+        self._session = session
+        self._session_options = {"auth": auth, "cert": cert,
+                                 "verify": verify}
+        self._options = kwargs
+
+    async def run(self) -> RolloutResult:
+        """Run all waves, halting on failures"""
+
+        if not self._session:
+            async with AsyncSession(**self._session_options) as sess:
+                self._session = sess
+                try:
+                    return await self.run()
+                finally:
+                    self._session = None
+
+        result = RolloutResult()
+        start = time.monotonic()
+
+        for index, targets in enumerate(self.waves):
+            wave = await self._run_wave(index, targets)
+            result.waves.append(wave)
+
+            reason = self._halt_reason(wave)
+            if reason is None and self.on_wave:
+                proceed = self.on_wave(wave)
+                if inspect.isawaitable(proceed):
+                    proceed = await proceed
+                if proceed is False:
+                    reason = "halted by on_wave"
+
+            if reason is not None:
+                result.halted = True
+                result.reason = "wave %d: %s" % (index, reason)
+                for remaining in self.waves[index + 1:]:
+                    result.pending.extend(remaining)
+                break
+
+        result.elapsed = time.monotonic() - start
+        return result
+
+    def _halt_reason(self, wave: WaveResult) -> Optional[str]:
+        limit = self.max_failures
+        if isinstance(limit, float):
+            limit = math.floor(limit * len(wave.targets))
+
+        if len(wave.failed) > limit:
+            return "%d of %d devices failed" % (len(wave.failed),
+                                                len(wave.targets))
+        return None
+
+    async def _deploy(self, target: Target) -> Optional[str]:
+        """returns the reason the device failed or None"""
+
+        response = await aconfigure(target, self.commands,
+                                    session=self._session, **self._options)
+        if response.code != 0:
+            return "configure failed: %s" % response.message
+
+        if self.verify_command is None:
+            return None
+
+        response = await self._session.call(target, [self.verify_command],
+                                            **self._options)
+
+        if self._check is not None:
+            if not self._check(response):
+                return "verification failed"
+        elif response.code != 0:
+            return "verification failed: %s" % response.message
+
+        return None
+
+    async def _run_wave(self, index: int, targets: List[Target]) -> WaveResult:
+        wave = WaveResult(index, targets)
+        start = time.monotonic()
+
+        async for target, reason, error in bounded_as_completed(
+                self._deploy, targets, self.concurrency):
+            if isinstance(error, EapiError):
+                reason = str(error) or error.__class__.__name__
+            elif error:
+                raise error
+
+            if reason is None:
+                wave.succeeded.append(target)
+            else:
+                wave.failed.append((target, reason))
+
+        wave.elapsed = time.monotonic() - start
+        return wave
+
+
+def rollout(targets: Sequence[Union[str, Target]], commands: List[Command],
+            **kwargs) -> RolloutResult:
+    """Run a :class:`Rollout` in a new event loop
+
+    Takes the same arguments as :class:`Rollout`.
+    """
+
+    return asyncio.run(Rollout(targets, commands, **kwargs).run())
@@ -0,0 +1,222 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import collections
+import threading
+import time
+
+from typing import Any, Deque, Dict, Mapping, Optional
+
+# lower values are served first
+PRIORITIES = {"interactive": 0, "normal": 1, "bulk": 2}
+DEFAULT_PRIORITY = "normal"
+
+# httpx's default connection pool size
+DEFAULT_LIMIT = 100
+
+# seconds of waiting that make up for one priority level
+DEFAULT_AGING = 1.0
+
+
+class ClassStats(object):
+    """Queue wait times of one priority class, in seconds"""
+
+    def __init__(self):
+        self.requests = 0
+        self.queued = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def observe(self, wait: float, queued: bool) -> None:
+        self.requests += 1
+        self.queued += queued
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    @property
+    def mean_wait(self) -> float:
+        if not self.requests:
+            return 0.0
+        return self.total_wait / self.requests
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "queued": self.queued,
+            "mean_wait": self.mean_wait,
+            "max_wait": self.max_wait
+        }
+
+
+class _Waiter(object):
+    __slots__ = ("priority", "since", "handle")
+
+    def __init__(self, priority: str, handle: Any):
+        self.priority = priority
+        self.since = time.monotonic()
+        self.handle = handle
+
+
+class BaseScheduler(object):
+    """Admits at most ``limit`` requests at once, by priority class
+
+    Requests over the limit wait in one FIFO queue per class.  When a slot
+    frees up, the oldest request of the class with the best score goes
+    next, the score being the class level minus one level per ``aging``
+    seconds the request has waited, so bulk work waiting long enough is
+    served ahead of newer interactive requests and never starves.
+
+    :param limit: max requests in flight (default: httpx's pool size)
+    :param type: int
+    :param priorities: class name to level, lower is served first
+        (default: interactive 0, normal 1, bulk 2)
+    :param type: dict
+    :param aging: seconds of waiting worth one level (0 disables aging)
+    :param type: float
+    """
+
+    def __init__(self, limit: int = DEFAULT_LIMIT,
+                 priorities: Optional[Mapping[str, int]] = None,
+                 aging: float = DEFAULT_AGING):
+
+        if limit < 1:
+            raise ValueError("limit must be >= 1")
+
+        self.limit = limit
+        self.priorities = dict(priorities or PRIORITIES)
+        self.aging = aging
+        self.inflight = 0
+
+        self._queues: Dict[str, Deque[_Waiter]] = {
+            name: collections.deque() for name in self.priorities}
+        self._stats: Dict[str, ClassStats] = {
+            name: ClassStats() for name in self.priorities}
+
+    @property
+    def waiting(self) -> int:
+        return sum(len(q) for q in self._queues.values())
+
+    def _check(self, priority: Optional[str]) -> str:
+        if priority is None:
+            priority = DEFAULT_PRIORITY
+        if priority not in self.priorities:
+            raise ValueError("priority must be one of %s" %
+                             ", ".join(self.priorities))
+        return priority
+
+    def _next(self) -> Optional[_Waiter]:
+        """remove and return the waiter to serve next"""
+
+        now = time.monotonic()
+        best = None
+        best_score = None
+
+        for name, waiters in self._queues.items():
+            if not waiters:
+                continue
+            head = waiters[0]
+            score = self.priorities[name]
+            if self.aging:
+                score -= (now - head.since) / self.aging
+            if best_score is None or score < best_score:
+                best, best_score = head, score
+
+        if best is not None:
+            self._queues[best.priority].popleft()
+        return best
+
+    def stats(self) -> Dict[str, dict]:
+        """queue wait times per priority class"""
+        return {name: s.to_dict() for name, s in self._stats.items()}
+
+
+class Scheduler(BaseScheduler):
+    """:class:`BaseScheduler` for threads, see `Session`"""
+
+    def __init__(self, limit: int = DEFAULT_LIMIT,
+                 priorities: Optional[Mapping[str, int]] = None,
+                 aging: float = DEFAULT_AGING):
+        super().__init__(limit, priorities, aging)
+        self._lock = threading.Lock()
+
+    def acquire(self, priority: Optional[str] = None) -> float:
+        """Wait for a slot, returns the seconds waited"""
+
+        priority = self._check(priority)
+        start = time.monotonic()
+
+        with self._lock:
+            if self.inflight < self.limit and not self.waiting:
+                self.inflight += 1
+                self._stats[priority].observe(0.0, False)
+                return 0.0
+
+            waiter = _Waiter(priority, threading.Event())
+            self._queues[priority].append(waiter)
+
+        # the slot is handed over by release()
+        waiter.handle.wait()
+
+        wait = time.monotonic() - start
+        with self._lock:
+            self._stats[priority].observe(wait, True)
+        return wait
+
+    def release(self) -> None:
+        with self._lock:
+            waiter = self._next()
+            if waiter is None:
+                self.inflight -= 1
+            else:
+                waiter.handle.set()
+
+
+class AsyncScheduler(BaseScheduler):
+    """:class:`BaseScheduler` for asyncio, see `AsyncSession`
+
+    Must only be used from one event loop.
+    """
+
+    async def acquire(self, priority: Optional[str] = None) -> float:
+        """Wait for a slot, returns the seconds waited"""
+
+        import asyncio
+
+        priority = self._check(priority)
+
+        if self.inflight < self.limit and not self.waiting:
+            self.inflight += 1
+            self._stats[priority].observe(0.0, False)
+            return 0.0
+
+        start = time.monotonic()
+        waiter = _Waiter(priority,
+                         asyncio.get_running_loop().create_future())
+        self._queues[priority].append(waiter)
+
+        try:
+            # the slot is handed over by release()
+            await waiter.handle
+        except asyncio.CancelledError:
+            if not waiter.handle.cancelled():
+                # cancelled right after getting the slot, pass it on
+                self.release()
+            elif waiter in self._queues[priority]:
+                self._queues[priority].remove(waiter)
+            raise
+
+        wait = time.monotonic() - start
+        self._stats[priority].observe(wait, True)
+        return wait
+
+    def release(self) -> None:
+        waiter = self._next()
+        # skip waiters cancelled since they were queued
+        while waiter is not None and waiter.handle.cancelled():
+            waiter = self._next()
+
+        if waiter is None:
+            self.inflight -= 1
+        else:
+            waiter.handle.set_result(None)
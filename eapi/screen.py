@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import shutil
+import sys
+
+from typing import List, Optional, Sequence, Tuple
+
+CSI = "\x1b["
+HOME = CSI + "H"
+CLEAR = HOME + CSI + "2J"
+CLEAR_LINE = CSI + "K"
+CLEAR_BELOW = CSI + "J"
+HIDE_CURSOR = CSI + "?25l"
+SHOW_CURSOR = CSI + "?25h"
+
+# narrowest pane before panes are stacked into fewer columns
+MIN_PANE_WIDTH = 40
+PANE_SEPARATOR = " │ "
+COLUMN_SEPARATOR = "  "
+
+
+def fit(text: str, width: int, fill: str = " ") -> str:
+    """Truncate or pad a single line to exactly ``width`` characters"""
+    text = text.expandtabs()
+    if len(text) > width:
+        return text[:width]
+    return text + fill * (width - len(text))
+
+
+def _move(row: int) -> str:
+    return "%s%d;1H" % (CSI, row + 1)
+
+
+class Screen(object):
+    """Draws frames of lines in place using ANSI escape sequences
+
+    The first frame clears the screen, later frames only rewrite the lines
+    that differ from the previous frame.  Lines are cut to the terminal width
+    and frames to its height, so a line on the screen is always one row.
+
+    >>> with Screen() as screen:
+    ...     screen.draw(["Watching 'show clock'", "", str(response[0])])
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+        self._lines: Optional[List[str]] = None
+        self._size: Optional[Tuple[int, int]] = None
+
+    def __enter__(self) -> "Screen":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def draw(self, lines: Sequence[str]) -> int:
+        """Draw a frame, returns the number of rows rewritten"""
+
+        width, height = size = tuple(shutil.get_terminal_size())
+        lines = [fit(line, width).rstrip() for line in lines[:height - 1]]
+
+        out = []
+        previous: List[str] = self._lines or []
+
+        if self._lines is None or size != self._size:
+            out.append(HIDE_CURSOR + CLEAR)
+            previous = []
+
+        rewritten = 0
+        for row, line in enumerate(lines):
+            if row < len(previous) and previous[row] == line:
+                continue
+            out.append(_move(row) + line + CLEAR_LINE)
+            rewritten += 1
+
+        if len(lines) < len(previous):
+            out.append(_move(len(lines)) + CLEAR_BELOW)
+
+        # park the cursor below the frame
+        out.append(_move(len(lines)))
+
+        self.stream.write("".join(out))
+        self.stream.flush()
+
+        self._lines = lines
+        self._size = size
+
+        return rewritten
+
+    def close(self) -> None:
+        """Restore the cursor, the last frame is left on the screen"""
+        if self._lines is not None:
+            self.stream.write(SHOW_CURSOR)
+            self.stream.flush()
+            self._lines = None
+
+
+def panes(blocks: Sequence[Tuple[str, List[str]]], width: int,
+          columns: Optional[int] = None) -> List[str]:
+    """Lay out titled blocks of lines side by side
+
+    :param blocks: (title, lines) for each pane
+    :param type: list
+    :param width: total width available
+    :param type: int
+    :param columns: panes per row (default: as many as fit)
+    :param type: int
+
+    :return: the lines of the layout
+    :rtype: list
+    """
+
+    if not blocks:
+        return []
+
+    if not columns:
+        columns = max(1, (width + len(PANE_SEPARATOR)) //
+                      (MIN_PANE_WIDTH + len(PANE_SEPARATOR)))
+    columns = min(columns, len(blocks))
+
+    pane_width = (width - len(PANE_SEPARATOR) * (columns - 1)) // columns
+
+    lines: List[str] = []
+
+    for start in range(0, len(blocks), columns):
+        row = blocks[start:start + columns]
+        if lines:
+            lines.append("")
+
+        lines.append(PANE_SEPARATOR.join(
+            fit("── %s " % title, pane_width, "─") for title, _ in row))
+
+        height = max(len(body) for _, body in row)
+        for index in range(height):
+            cells = [body[index] if index < len(body) else ""
+                     for _, body in row]
+            # no separators after the last pane with something to show
+            while cells and not cells[-1]:
+                cells.pop()
+            lines.append(PANE_SEPARATOR.join(
+                fit(c, pane_width) for c in cells).rstrip())
+
+    return lines
+
+
+def table(headers: Sequence[str], rows: Sequence[Sequence[str]],
+          width: int) -> List[str]:
+    """Lay out rows in aligned columns, the last column takes what is left
+
+    Cells may contain several lines, the other cells of the row are left
+    blank on the extra lines.
+    """
+
+    widths = [len(h) for h in headers]
+    for row in rows:
+        for index, cell in enumerate(row[:-1]):
+            for line in cell.splitlines() or [""]:
+                widths[index] = max(widths[index], len(line))
+
+    fixed = sum(widths[:-1]) + len(COLUMN_SEPARATOR) * (len(headers) - 1)
+    widths[-1] = max(1, width - fixed)
+
+    def _line(cells):
+        return COLUMN_SEPARATOR.join(
+            fit(c, w) for c, w in zip(cells, widths)).rstrip()
+
+    lines = [_line(headers)]
+    for row in rows:
+        cells = [cell.splitlines() or [""] for cell in row]
+        height = max(len(c) for c in cells)
+        for index in range(height):
+            lines.append(_line(c[index] if index < len(c) else ""
+                               for c in cells))
+
+    return lines
@@ -3,9 +3,11 @@
 # Arista Networks, Inc. Confidential and Proprietary.
 
 import json
+import time
 import warnings
 
-from typing import Dict, List, Optional, Union
+from concurrent.futures import Executor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
 import httpx
 
@@ -14,17 +16,149 @@ import eapi.environments
 from eapi.util import prepare_request
 from eapi.exceptions import EapiAuthenticationFailure, EapiError, \
     EapiPathNotFoundError, EapiTimeoutError
-from eapi.types import Auth, Certificate, Command
+from eapi.types import Auth, Certificate, Command, Request
+
+from eapi.messages import PreparedRequest, Response, Target
+from eapi.metrics import Registry, Timings
+from eapi.scheduler import AsyncScheduler, BaseScheduler, Scheduler
+from eapi.spool import SpooledBody, SpooledResponse, Spooler
+
+# called with each decoded Response, returns the Response to hand back
+Postprocess = Callable[[Response], Response]
+
+
+def _serialize(data: Union[dict, bytes, None]) -> Union[str, bytes]:
+    if isinstance(data, bytes):
+        return data
+    return json.dumps(data)
+
+
+def _parse(target: Target, request: Request, content: bytes,
+           postprocess: Optional[Postprocess] = None) -> Response:
+    """build a Response from a raw body, may run in a worker process"""
+
+    resp = Response.from_rpc_response(target, request, json.loads(content))
+    if postprocess is not None:
+        resp = postprocess(resp)
+    return resp
+
+
+class Tracer(object):
+    """Receives a span around each session operation
+
+    Spans are named ``eapi.call`` (a whole ``call``), ``eapi.http`` (one HTTP
+    post), ``eapi.decode`` (parsing a response) and ``eapi.login``.  The
+    ``eapi.http`` and ``eapi.decode`` spans of a call start and end within
+    its ``eapi.call`` span.
+
+    ``start_span`` returns an opaque span object that is handed back to
+    ``end_span`` along with the attributes known once the operation is done
+    and the exception it raised, if any.  Attributes are:
+
+    - ``eapi.target``, ``eapi.command_count``, ``eapi.encoding``
+    - ``http.url``, ``http.request_content_length``
+    - ``http.status_code``, ``http.response_content_length`` (on end)
+    - ``eapi.error_code`` (on end)
+
+    Sessions without a tracer do not build spans or attributes at all.
+    """
+
+    def start_span(self, name: str, attributes: Dict[str, Any]) -> Any:
+        return None
+
+    def end_span(self, span: Any, attributes: Dict[str, Any],
+                 error: Optional[BaseException] = None) -> None:
+        pass
+
+
+class OpenTelemetryTracer(Tracer):
+    """Report spans to OpenTelemetry (requires ``opentelemetry-api``)
+
+    Spans are made current while they are open, so the HTTP and decode spans
+    are children of their call span and a call is a child of whatever span
+    the application has open.
+
+    :param tracer: OpenTelemetry tracer (default: ``get_tracer("eapi")``)
+    """
+
+    def __init__(self, tracer=None):
+        from opentelemetry import context, trace
+
+        self._context = context
+        self._trace = trace
+        self._tracer = tracer or trace.get_tracer("eapi")
+
+    def start_span(self, name: str, attributes: Dict[str, Any]) -> Any:
+        span = self._tracer.start_span(name, attributes=attributes)
+        token = self._context.attach(self._trace.set_span_in_context(span))
+        return span, token
+
+    def end_span(self, span: Any, attributes: Dict[str, Any],
+                 error: Optional[BaseException] = None) -> None:
+        span, token = span
+
+        span.set_attributes(attributes)
+        if error is not None:
+            span.record_exception(error)
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR,
+                                               str(error)))
+        span.end()
+        self._context.detach(token)
+
+
+def _call_attributes(target: Target, request: Request) -> Dict[str, Any]:
+    return {
+        "eapi.target": str(target),
+        "eapi.command_count": len(request["params"]["cmds"]),
+        "eapi.encoding": request["params"]["format"]
+    }
+
+
+def _http_attributes(url: str, content: Union[str, bytes]) -> Dict[str, Any]:
+    # json.dumps escapes non-ascii, so str length is the byte count
+    return {"http.url": url, "http.request_content_length": len(content)}
+
+
+def _http_result(response: httpx.Response, size: int) -> Dict[str, Any]:
+    return {
+        "http.status_code": response.status_code,
+        "http.response_content_length": size
+    }
 
-from eapi.messages import Response, Target
 
 class BaseSession(object):
+    """Shared state and plumbing of `Session` and `AsyncSession`
+
+    :param metrics: record per-target request timings
+    :param type: eapi.metrics.Registry
+    :param tracer: report spans around calls, logins and decodes
+    :param type: Tracer
+    :param spool_threshold: stream response bodies of at least this many
+        bytes to temporary files and return `SpooledResponse` objects
+        (default: keep bodies in memory)
+    :param type: int
+    :param spool_dir: directory for the temporary files
+    :param type: str
+    :param spool_mmap: memory-map spooled bodies, results are sliced from
+        the mapping instead of read from the file
+    :param type: bool
+    :param scheduler: admit command requests by priority class, a
+        `Scheduler` for `Session` or an `AsyncScheduler` for `AsyncSession`.
+        Time spent waiting counts in the 'queue' phase of the timings.
+    :param type: eapi.scheduler.BaseScheduler
+    """
 
     def __init__(self,
                  klass: type, #Union[httpx.Client, httpx.AsyncClient],
                  auth: Optional[Auth] = None,
                  cert: Optional[Certificate] = None,
                  verify: Optional[bool] = None,
+                 metrics: Optional[Registry] = None,
+                 tracer: Optional[Tracer] = None,
+                 spool_threshold: Optional[int] = None,
+                 spool_dir: Optional[str] = None,
+                 spool_mmap: bool = False,
+                 scheduler: Optional[BaseScheduler] = None,
                  **kwargs):
 
         if verify is None:
@@ -42,6 +176,135 @@ class BaseSession(object):
         # store parameters for future requests
         self._eapi_sessions: Dict[str, dict] = {}
 
+        # aggregate request timings per target
+        self.metrics = metrics
+
+        # report spans around calls, logins and decodes
+        self.tracer = tracer
+
+        # write response bodies of at least spool_threshold bytes to files
+        self.spool_threshold = spool_threshold
+        self.spool_dir = spool_dir
+        self.spool_mmap = spool_mmap
+
+        # admits command requests by priority class
+        self.scheduler = scheduler
+
+    def _prepare(self, commands: Union[List[Command], PreparedRequest],
+                 encoding: Optional[str] = None
+                 ) -> Tuple[Request, Union[Request, bytes]]:
+        """returns the request and the data to post"""
+
+        if isinstance(commands, PreparedRequest):
+            return commands.request, commands.body()
+
+        request = prepare_request(commands, encoding)
+
+        return request, request
+
+    def _decode_span(self, target: Target, size: int) -> Any:
+        if self.tracer is None:
+            return None
+        return self.tracer.start_span("eapi.decode", {
+            "eapi.target": str(target),
+            "http.response_content_length": size})
+
+    def _decode_failed(self, span: Any, exc: BaseException) -> None:
+        if self.tracer is not None:
+            self.tracer.end_span(span, {}, exc)
+
+    def _decoded(self, target: Target, resp: Response, timings: Timings,
+                 span: Any, start: float) -> Response:
+        timings.add("decode", time.perf_counter() - start)
+        timings.finish()
+
+        if self.tracer is not None:
+            self.tracer.end_span(span, {"eapi.error_code": resp.code})
+
+        resp.timings = timings
+        if self.metrics is not None:
+            self.metrics.observe(target, timings, error=resp.code != 0)
+
+        return resp
+
+    def _decode(self, target: Target, request: Request, content: bytes,
+                timings: Timings,
+                postprocess: Optional[Postprocess] = None) -> Response:
+        """parse the response body and finish the request timings"""
+
+        span = self._decode_span(target, len(content))
+
+        start = time.perf_counter()
+        try:
+            resp = _parse(target, request, content, postprocess)
+        except Exception as exc:
+            self._decode_failed(span, exc)
+            raise
+
+        return self._decoded(target, resp, timings, span, start)
+
+    def _decode_spooled(self, target: Target, request: Request,
+                        body: SpooledBody, timings: Timings,
+                        postprocess: Optional[Postprocess] = None
+                        ) -> Response:
+        """wrap a spooled body and finish the request timings"""
+
+        span = self._decode_span(target, body.size)
+
+        start = time.perf_counter()
+        try:
+            resp = SpooledResponse.from_spooled(target, request, body)
+            if postprocess is not None:
+                resp = postprocess(resp)
+        except Exception as exc:
+            body.close()
+            self._decode_failed(span, exc)
+            raise
+
+        return self._decoded(target, resp, timings, span, start)
+
+    def _spooling(self, spool: Optional[str]) -> bool:
+        return spool is not None or self.spool_threshold is not None
+
+    def _spooler(self, response: httpx.Response,
+                 spool: Optional[str]) -> Spooler:
+        length = response.headers.get("Content-Length")
+        return Spooler(self.spool_threshold, spool, self.spool_dir,
+                       self.spool_mmap, int(length) if length else None)
+
+    def _failed(self, target: Target, timings: Timings) -> None:
+        timings.finish()
+        if self.metrics is not None:
+            self.metrics.observe(target, timings, error=True)
+
+    def _http_start(self, url: str, data,
+                    options: Dict[str, Any]) -> Tuple[Union[str, bytes], Any]:
+        """serialize a request, default its timeout and open its span"""
+
+        if "timeout" not in options:
+            options["timeout"] = eapi.environments.EAPI_DEFAULT_TIMEOUT
+
+        content = _serialize(data)
+
+        span = None
+        if self.tracer is not None:
+            span = self.tracer.start_span("eapi.http",
+                                          _http_attributes(url, content))
+        return content, span
+
+    def _http_error(self, span: Any, exc: httpx.HTTPError) -> EapiError:
+        """close the span of a failed request, returns the error to raise"""
+        if self.tracer is not None:
+            self.tracer.end_span(span, {}, exc)
+        return EapiError(str(exc))
+
+    def _http_end(self, span: Any, response: httpx.Response,
+                  size: int) -> None:
+        """close the span of a request, then check its status"""
+        if self.tracer is not None:
+            self.tracer.end_span(span, _http_result(response, size))
+        self._handle_call_response(response)
+
     def _handle_call_response(self, response):
 
         if response.status_code == 401:
@@ -53,14 +316,13 @@ class BaseSession(object):
         response.raise_for_status()
 
     def _handle_login_response(self, target, auth, resp):
-        if resp.status_code == 404:
+        if resp is None:
             # Older versions do not have the login endpoint.
             # fall back to basic auth if /login is not found
             pass
         elif resp.status_code != 200:
             raise EapiError(f"{resp.status_code} {resp.reason_phrase}")
-
-        if "Session" not in resp.cookies:
+        elif "Session" not in resp.cookies:
             warnings.warn(("Got a good response, but no 'Session' found in "
                            "cookies. Using fallback auth."))
         elif resp.cookies["Session"] == "None":
@@ -92,6 +354,12 @@ class Session(BaseSession):
                  auth: Optional[Auth] = None,
                  cert: Optional[Certificate] = None,
                  verify: Optional[bool] = None,
+                 metrics: Optional[Registry] = None,
+                 tracer: Optional[Tracer] = None,
+                 spool_threshold: Optional[int] = None,
+                 spool_dir: Optional[str] = None,
+                 spool_mmap: bool = False,
+                 scheduler: Optional[Scheduler] = None,
                  **kwargs):
 
         super().__init__(
@@ -99,6 +367,12 @@ class Session(BaseSession):
             auth=auth,
             cert=cert,
             verify=verify,
+            metrics=metrics,
+            tracer=tracer,
+            spool_threshold=spool_threshold,
+            spool_dir=spool_dir,
+            spool_mmap=spool_mmap,
+            scheduler=scheduler,
             **kwargs
         )
 
@@ -111,21 +385,63 @@ class Session(BaseSession):
     def _call(self, url, data, **options) -> httpx.Response:
         """calls the request to EAPI"""
 
-        response = None
-
-        if "timeout" not in options:
-            options["timeout"] = eapi.environments.EAPI_DEFAULT_TIMEOUT
+        content, span = self._http_start(url, data, options)
 
         try:
-            response = self._session.post(url, data=json.dumps(data),
-                                            **options)
+            response = self._session.post(url, data=content, **options)
         except httpx.HTTPError as exc:
-            raise EapiError(str(exc))
+            raise self._http_error(span, exc)
 
-        self._handle_call_response(response)
+        self._http_end(span, response, len(response.content))
 
         return response
 
+    def _call_spooled(self, url, data, spool: Optional[str] = None,
+                      **options) -> Union[bytes, SpooledBody]:
+        """streams the response body to memory, or a file once it is large"""
+
+        content, span = self._http_start(url, data, options)
+
+        body: Union[bytes, SpooledBody] = b""
+        try:
+            with self._session.stream("POST", url, content=content,
+                                      **options) as response:
+                if response.is_success:
+                    spooler = self._spooler(response, spool)
+                    try:
+                        for chunk in response.iter_bytes():
+                            spooler.write(chunk)
+                    except BaseException:
+                        spooler.abort()
+                        raise
+                    body = spooler.finish()
+                else:
+                    body = response.read()
+        except httpx.HTTPError as exc:
+            raise self._http_error(span, exc)
+
+        size = body.size if isinstance(body, SpooledBody) else len(body)
+        self._http_end(span, response, size)
+
+        return body
+
+    def _post(self, url, data, spool: Optional[str] = None,
+              priority: Optional[str] = None,
+              **options) -> Union[bytes, SpooledBody]:
+        """post a command request once the scheduler admits it"""
+
+        scheduler = self.scheduler
+        if scheduler is not None:
+            scheduler.acquire(priority)
+
+        try:
+            if self._spooling(spool):
+                return self._call_spooled(url, data, spool, **options)
+            return self._call(url, data=data, **options).content
+        finally:
+            if scheduler is not None:
+                scheduler.release()
+
     def close(self):
         """shutdown the underlying httpx session"""
         self._session.close()
@@ -162,19 +478,50 @@ class Session(BaseSession):
         username, password = auth or self._session.auth
         payload = {"username": username, "password": password}
 
-        resp = self._call(target_.url + "/login", data=payload)
-
-        self._handle_login_response(target_, auth, resp)
+        tracer = self.tracer
+        span = None
+        if tracer is not None:
+            span = tracer.start_span("eapi.login",
+                                     {"eapi.target": str(target_)})
 
-    def call(self, target: Union[str, Target], commands: List[Command],
-             encoding: Optional[str] = None, **kwargs):
+        try:
+            try:
+                resp = self._call(target_.url + "/login", data=payload)
+            except EapiPathNotFoundError:
+                resp = None
+            self._handle_login_response(target_, auth, resp)
+        except Exception as exc:
+            if tracer is not None:
+                tracer.end_span(span, {}, exc)
+            raise
+
+        if tracer is not None:
+            status = 404 if resp is None else resp.status_code
+            tracer.end_span(span, {"http.status_code": status})
+
+    def call(self, target: Union[str, Target],
+             commands: Union[List[Command], PreparedRequest],
+             encoding: Optional[str] = None,
+             postprocess: Optional[Postprocess] = None,
+             spool: Optional[str] = None,
+             priority: Optional[str] = None, **kwargs):
         """call commands to an eAPI target
 
         :param target: eAPI target (host, port)
         :param type: Target
-        :param commands: List of `Command` objects
+        :param commands: List of `Command` objects or a `PreparedRequest`
         :param type: list
-        :param encoding: response encoding 'json' or 'text' (default: json)
+        :param encoding: response encoding 'json' or 'text' (default: json),
+            ignored for a `PreparedRequest`
+        :param postprocess: called with the decoded `Response`, returns the
+            `Response` to hand back
+        :param type: callable
+        :param spool: write the response body to this file and return a
+            `SpooledResponse` backed by it
+        :param type: str
+        :param priority: priority class for the session's scheduler, e.g.
+            'interactive', 'normal' (default) or 'bulk'
+        :param type: str
         :param \*\*kwargs: other pass through `httpx` options
         :param type: dict
 
@@ -183,22 +530,75 @@ class Session(BaseSession):
         target_: Target = Target.from_string(target)
 
         # get session defaults (set at login)
-        options = self._eapi_sessions.get(target_.domain) or {}
+        options = dict(self._eapi_sessions.get(target_.domain) or {})
         options.update(kwargs)
 
-        request = prepare_request(commands, encoding)
+        request, data = self._prepare(commands, encoding)
+
+        tracer = self.tracer
+        span = None
+        if tracer is not None:
+            span = tracer.start_span("eapi.call",
+                                     _call_attributes(target_, request))
 
-        response = self._call(target_.url + "/command-api",
-                              data=request, **options)
+        timings = Timings()
+        options["extensions"] = timings.extensions(options.get("extensions"))
 
-        return Response.from_rpc_response(target_, request, response.json())
+        try:
+            body = self._post(target_.url + "/command-api", data, spool,
+                              priority, **options)
+
+            if isinstance(body, SpooledBody):
+                resp = self._decode_spooled(target_, request, body, timings,
+                                            postprocess)
+            else:
+                resp = self._decode(target_, request, body, timings,
+                                    postprocess)
+        except Exception as exc:
+            self._failed(target_, timings)
+            if tracer is not None:
+                tracer.end_span(span, {}, exc)
+            raise
+
+        if tracer is not None:
+            tracer.end_span(span, {"eapi.error_code": resp.code})
+
+        return resp
 
 
 class AsyncSession(BaseSession):
+    """Session for asyncio applications
+
+    Decoding a response of tens of megabytes takes long enough to stall
+    every other request on the event loop.  With ``offload_threshold`` set,
+    bodies of at least that many bytes are decoded (and post-processed) in
+    ``executor`` instead, by default a ``ProcessPoolExecutor`` owned by the
+    session.  Processes decode in parallel, at the cost of pickling the body
+    and the `Response` (and the ``postprocess`` callable, which must then be
+    a module level function).  A thread pool does not keep the loop
+    responsive: ``json.loads`` holds the GIL for the whole decode.
+
+    :param offload_threshold: decode bodies of at least this many bytes in
+        ``executor`` (default: never)
+    :param type: int
+    :param executor: executor for offloaded decoding, not shut down by the
+        session (default: a process pool created on first use and shut down
+        on :meth:`close`)
+    :param type: concurrent.futures.Executor
+    """
+
     def __init__(self,
                  auth: Optional[Auth] = None,
                  cert: Optional[Certificate] = None,
                  verify: Optional[bool] = None,
+                 metrics: Optional[Registry] = None,
+                 tracer: Optional[Tracer] = None,
+                 spool_threshold: Optional[int] = None,
+                 spool_dir: Optional[str] = None,
+                 spool_mmap: bool = False,
+                 scheduler: Optional[AsyncScheduler] = None,
+                 offload_threshold: Optional[int] = None,
+                 executor: Optional[Executor] = None,
                  **kwargs):
 
         super().__init__(
@@ -206,9 +606,19 @@ class AsyncSession(BaseSession):
             auth=auth,
             cert=cert,
             verify=verify,
+            metrics=metrics,
+            tracer=tracer,
+            spool_threshold=spool_threshold,
+            spool_dir=spool_dir,
+            spool_mmap=spool_mmap,
+            scheduler=scheduler,
             **kwargs
         )
 
+        self.offload_threshold = offload_threshold
+        self.executor = executor
+        self._own_executor: Optional[Executor] = None
+
     async def __aenter__(self) -> "AsyncSession":
         return self
 
@@ -218,23 +628,101 @@ class AsyncSession(BaseSession):
     async def _call(self, url, data, **options) -> httpx.Response:
         """Post to eAPI endpoint"""
 
-        response = None
-
-        if "timeout" not in options:
-            options["timeout"] = eapi.environments.EAPI_DEFAULT_TIMEOUT
+        content, span = self._http_start(url, data, options)
 
         try:
-            response = await self._session.post(url, data=json.dumps(data),
-                                                **options)
+            response = await self._session.post(url, data=content, **options)
         except httpx.HTTPError as exc:
-            raise EapiError(str(exc))
+            raise self._http_error(span, exc)
 
-        self._handle_call_response(response)
+        self._http_end(span, response, len(response.content))
 
         return response
 
+    async def _post(self, url, data, spool: Optional[str] = None,
+                    priority: Optional[str] = None,
+                    **options) -> Union[bytes, SpooledBody]:
+        """post a command request once the scheduler admits it"""
+
+        scheduler = self.scheduler
+        if scheduler is not None:
+            await scheduler.acquire(priority)
+
+        try:
+            if self._spooling(spool):
+                return await self._call_spooled(url, data, spool, **options)
+            response = await self._call(url, data=data, **options)
+            return response.content
+        finally:
+            if scheduler is not None:
+                scheduler.release()
+
+    async def _adecode(self, target: Target, request: Request,
+                       content: bytes, timings: Timings,
+                       postprocess: Optional[Postprocess] = None
+                       ) -> Response:
+        """like `_decode`, large bodies are decoded in the executor"""
+
+        threshold = self.offload_threshold
+        if threshold is None or len(content) < threshold:
+            return self._decode(target, request, content, timings,
+                                postprocess)
+
+        import asyncio
+
+        span = self._decode_span(target, len(content))
+
+        executor = self.executor
+        if executor is None:
+            if self._own_executor is None:
+                from concurrent.futures import ProcessPoolExecutor
+                self._own_executor = ProcessPoolExecutor()
+            executor = self._own_executor
+
+        start = time.perf_counter()
+        try:
+            resp = await asyncio.get_running_loop().run_in_executor(
+                executor, _parse, target, request, content, postprocess)
+        except Exception as exc:
+            self._decode_failed(span, exc)
+            raise
+
+        return self._decoded(target, resp, timings, span, start)
+
+    async def _call_spooled(self, url, data, spool: Optional[str] = None,
+                            **options) -> Union[bytes, SpooledBody]:
+        """streams the response body to memory, or a file once it is large"""
+
+        content, span = self._http_start(url, data, options)
+
+        body: Union[bytes, SpooledBody] = b""
+        try:
+            async with self._session.stream("POST", url, content=content,
+                                            **options) as response:
+                if response.is_success:
+                    spooler = self._spooler(response, spool)
+                    try:
+                        async for chunk in response.aiter_bytes():
+                            spooler.write(chunk)
+                    except BaseException:
+                        spooler.abort()
+                        raise
+                    body = spooler.finish()
+                else:
+                    body = await response.aread()
+        except httpx.HTTPError as exc:
+            raise self._http_error(span, exc)
+
+        size = body.size if isinstance(body, SpooledBody) else len(body)
+        self._http_end(span, response, size)
+
+        return body
+
     async def close(self) -> None:
         await self._session.aclose()
+        if self._own_executor is not None:
+            self._own_executor.shutdown()
+            self._own_executor = None
 
     async def login(self, target: Union[str, Target], auth: Optional[Auth] = None) -> None:
         """Login to an eAPI session
@@ -255,9 +743,26 @@ class AsyncSession(BaseSession):
         username, password = auth or self._session.auth
         payload = {"username": username, "password": password}
 
-        resp = await self._call(target_.url + "/login", data=payload)
+        tracer = self.tracer
+        span = None
+        if tracer is not None:
+            span = tracer.start_span("eapi.login",
+                                     {"eapi.target": str(target_)})
 
-        self._handle_login_response(target_, auth, resp)
+        try:
+            try:
+                resp = await self._call(target_.url + "/login", data=payload)
+            except EapiPathNotFoundError:
+                resp = None
+            self._handle_login_response(target_, auth, resp)
+        except Exception as exc:
+            if tracer is not None:
+                tracer.end_span(span, {}, exc)
+            raise
+
+        if tracer is not None:
+            status = 404 if resp is None else resp.status_code
+            tracer.end_span(span, {"http.status_code": status})
 
     async def logout(self, target: Union[str, Target]) -> None:
         """Log out of an eAPI session
@@ -275,15 +780,29 @@ class AsyncSession(BaseSession):
         if self.logged_in(target):
             await self._call(target_.url + "/logout", data={})
 
-    async def call(self, target: Union[str, Target], commands: List[Command],
-                   encoding: Optional[str] = None, **kwargs):
+    async def call(self, target: Union[str, Target],
+                   commands: Union[List[Command], PreparedRequest],
+                   encoding: Optional[str] = None,
+                   postprocess: Optional[Postprocess] = None,
+                   spool: Optional[str] = None,
+                   priority: Optional[str] = None, **kwargs):
         """call commands to an eAPI target
 
         :param target: eAPI target (host, port)
         :param type: Target
-        :param commands: List of `Command` objects
+        :param commands: List of `Command` objects or a `PreparedRequest`
         :param type: list
-        :param encoding: response encoding 'json' or 'text' (default: json)
+        :param encoding: response encoding 'json' or 'text' (default: json),
+            ignored for a `PreparedRequest`
+        :param postprocess: called with the decoded `Response`, returns the
+            `Response` to hand back
+        :param type: callable
+        :param spool: write the response body to this file and return a
+            `SpooledResponse` backed by it
+        :param type: str
+        :param priority: priority class for the session's scheduler, e.g.
+            'interactive', 'normal' (default) or 'bulk'
+        :param type: str
         :param \*\*kwargs: other pass through `httpx` options
         :param type: dict
 
@@ -292,12 +811,38 @@ class AsyncSession(BaseSession):
         target_: Target = Target.from_string(target)
 
         # get session defaults (set at login)
-        options = self._eapi_sessions.get(target_.domain) or {}
+        options = dict(self._eapi_sessions.get(target_.domain) or {})
         options.update(kwargs)
 
-        request = prepare_request(commands, encoding)
+        request, data = self._prepare(commands, encoding)
+
+        tracer = self.tracer
+        span = None
+        if tracer is not None:
+            span = tracer.start_span("eapi.call",
+                                     _call_attributes(target_, request))
 
-        response = await self._call(target_.url + "/command-api",
-                                    data=request, **options)
+        timings = Timings()
+        options["extensions"] = timings.extensions(options.get("extensions"),
+                                                   asynchronous=True)
 
-        return Response.from_rpc_response(target_, request, response.json())
+        try:
+            body = await self._post(target_.url + "/command-api", data,
+                                    spool, priority, **options)
+
+            if isinstance(body, SpooledBody):
+                resp = self._decode_spooled(target_, request, body, timings,
+                                            postprocess)
+            else:
+                resp = await self._adecode(target_, request, body, timings,
+                                           postprocess)
+        except Exception as exc:
+            self._failed(target_, timings)
+            if tracer is not None:
+                tracer.end_span(span, {}, exc)
+            raise
+
+        if tracer is not None:
+            tracer.end_span(span, {"eapi.error_code": resp.code})
+
+        return resp
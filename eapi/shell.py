@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import cmd
+import json
+import os
+import re
+import time
+
+from typing import List, Optional, Union
+
+from eapi.exceptions import EapiError
+from eapi.messages import JsonResult, Response, Target
+from eapi.sessions import Session
+from eapi.types import Command
+
+try:
+    import readline
+except ImportError:  # e.g. Windows
+    readline = None
+
+DEFAULT_HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".eapi_history")
+HISTORY_LENGTH = 1000
+
+ENCODINGS = ("json", "text")
+
+# commands that enter configuration mode, the block is sent on 'end'
+_CONFIGURE_RE = re.compile(r"^conf(?:i(?:g(?:u(?:r(?:e)?)?)?)?)?"
+                           r"(?:\s+(?:t(?:erminal)?|session\s+\S+))?$")
+
+_META_HELP = """\
+.encoding [json|text]  show, set or toggle (no argument) the encoding
+.timing [on|off]       show or set per-command latency reporting
+.history               list the command history
+.help                  this message
+.quit                  exit the shell (also Ctrl-D)
+
+'configure' starts a block that is sent as one request on 'end',
+'.cancel' discards it."""
+
+
+class Shell(cmd.Cmd):
+    """Interactive prompt for one target
+
+    Every command is sent over the same :class:`Session`, so the connection
+    and the login cookie are reused between commands.  Lines starting with
+    a '.' are shell commands (see ``.help``).
+
+    >>> with Session(auth=("admin", "")) as sess:
+    ...     sess.login("veos1")
+    ...     Shell("veos1", sess).cmdloop()
+
+    :param target: eAPI target
+    :param type: Target
+    :param session: session to send commands over
+    :param type: Session
+    :param encoding: initial encoding 'json' or 'text'
+    :param type: str
+    :param timing: print the round-trip time of each request
+    :param type: bool
+    :param history_file: where to keep the history of interactive sessions
+    :param type: str
+    """
+
+    intro = 'Type ".help" for shell commands, Ctrl-D to exit'
+
+    def __init__(self, target: Union[str, Target], session: Session,
+                 encoding: str = "text", timing: bool = True,
+                 history_file: Optional[str] = DEFAULT_HISTORY_FILE,
+                 stdin=None, stdout=None):
+
+        super().__init__(stdin=stdin, stdout=stdout)
+
+        if stdin is not None:
+            self.use_rawinput = False
+
+        if encoding not in ENCODINGS:
+            raise ValueError("encoding must be 'json' or 'text'")
+
+        self.target = Target.from_string(target)
+        self.session = session
+        self.encoding = encoding
+        self.timing = timing
+        self.history_file = history_file
+
+        # configuration lines waiting for 'end'
+        self._block: Optional[List[str]] = None
+        self._update_prompt()
+
+    @property
+    def _interactive(self) -> bool:
+        return self.use_rawinput and readline is not None and \
+            self.stdin.isatty()
+
+    def _update_prompt(self) -> None:
+        mode = "(config)" if self._block is not None else ""
+        self.prompt = "%s%s# " % (self.target.hostname, mode)
+
+    def _write(self, text: str = "") -> None:
+        self.stdout.write(text + "\n")
+
+    def preloop(self) -> None:
+        if self._interactive and self.history_file:
+            try:
+                readline.read_history_file(self.history_file)
+            except OSError:
+                pass
+            readline.set_history_length(HISTORY_LENGTH)
+
+    def postloop(self) -> None:
+        if self._interactive and self.history_file:
+            try:
+                readline.write_history_file(self.history_file)
+            except OSError:
+                pass
+
+    def emptyline(self) -> bool:
+        # do not repeat the last command like cmd.Cmd does
+        return False
+
+    def onecmd(self, line: str) -> bool:
+        if line == "EOF":
+            if self._block is not None:
+                self._write("% configuration discarded")
+            self._write()
+            return True
+
+        stripped = line.strip()
+
+        if self._block is not None:
+            if stripped == "end":
+                commands, self._block = self._block, None
+                self._update_prompt()
+                self.run(commands + ["end"])
+            elif stripped == ".cancel":
+                self._block = None
+                self._update_prompt()
+            elif stripped:
+                self._block.append(line.rstrip())
+            return False
+
+        if not stripped:
+            return False
+
+        if stripped.startswith("."):
+            return self.meta(stripped[1:].split())
+
+        if _CONFIGURE_RE.match(stripped):
+            self._block = [stripped]
+            self._update_prompt()
+            return False
+
+        self.run([stripped])
+        return False
+
+    def meta(self, args: List[str]) -> bool:
+        """handle a shell command, returns True to exit the shell"""
+
+        name, args = (args[0], args[1:]) if args else ("help", [])
+
+        if name in ("quit", "exit"):
+            return True
+        elif name == "encoding":
+            if not args:
+                self.encoding = "json" if self.encoding == "text" else "text"
+            elif args[0] in ENCODINGS:
+                self.encoding = args[0]
+            else:
+                self._write("% encoding must be 'json' or 'text'")
+                return False
+            self._write("encoding: %s" % self.encoding)
+        elif name == "timing":
+            if args and args[0] in ("on", "off"):
+                self.timing = args[0] == "on"
+            elif args:
+                self._write("% timing must be 'on' or 'off'")
+                return False
+            self._write("timing: %s" % ("on" if self.timing else "off"))
+        elif name == "history":
+            if readline is not None:
+                for index in range(1, readline.get_current_history_length() + 1):
+                    self._write("%5d  %s" % (index,
+                                             readline.get_history_item(index)))
+        elif name == "help":
+            self._write(_META_HELP)
+        else:
+            self._write("%% unknown shell command: .%s" % name)
+
+        return False
+
+    def run(self, commands: List[Command]) -> Optional[Response]:
+        """send commands and print the results, returns the response"""
+
+        start = time.perf_counter()
+        try:
+            response = self.session.call(self.target, commands,
+                                         encoding=self.encoding)
+        except EapiError as exc:
+            self._write("%% %s" % (str(exc) or exc.__class__.__name__))
+            return None
+        elapsed = time.perf_counter() - start
+
+        self.render(response)
+
+        if self.timing:
+            self._write("[%.1f ms]" % (elapsed * 1000))
+
+        return response
+
+    def render(self, response: Response) -> None:
+        for elem in response:
+            result = elem.result
+            if isinstance(result, JsonResult):
+                if result:
+                    self._write(json.dumps(dict(result), indent=2))
+            elif str(result):
+                self._write(str(result))
+
+        if response.code != 0:
+            self._write("%% %s" % response.message)
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+import queue
+import re
+import sqlite3
+import threading
+import time
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from eapi.conditions import resolve, split_path
+from eapi.messages import JsonResult, Response
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_MAX_PENDING = 10000
+
+_COLUMNS = ("timestamp", "target", "command", "code", "message", "error",
+            "result")
+_NAME_RE = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*$")
+
+_STOP = object()
+# ends the batch being filled, see SqliteSink.flush
+_FLUSH = object()
+
+
+def _column(values: List[Any]) -> Any:
+    """one scalar as is, anything else as JSON"""
+    if len(values) == 1 and isinstance(values[0], (str, int, float, bool)):
+        return values[0]
+    if not values:
+        return None
+    return json.dumps(values)
+
+
+class SqliteSink(object):
+    """Writes responses to SQLite in batches from a background thread
+
+    Each command of a response becomes one row: ``timestamp``, ``target``,
+    ``command``, ``code``, ``message``, ``error`` (for calls that failed
+    outright, with a NULL command) and ``result`` (the JSON or text output,
+    unless ``store_result`` is off), plus one column per entry of
+    ``fields``, resolved from JSON results with the dotted paths of
+    :func:`eapi.conditions.where` (``*`` matches every key or item).
+
+    Responses wait in a queue of at most ``max_pending`` entries.  The
+    writer inserts them ``batch_size`` at a time, one transaction per
+    batch, waiting up to ``flush_interval`` for a batch to fill; when it
+    falls behind, :meth:`write` blocks (and :meth:`awrite` waits) until there is
+    room again.
+
+    >>> with SqliteSink("polls.db", fields={"version": "version"}) as sink:
+    ...     poller = eapi.Poller(auth=auth, callback=sink.awrite)
+
+    :param path: database file
+    :param type: str
+    :param table: table to create (if needed) and write to
+    :param type: str
+    :param fields: column name to path of the value to extract
+    :param type: dict
+    :param store_result: keep the whole result in the ``result`` column
+    :param type: bool
+    :param batch_size: max rows per transaction
+    :param type: int
+    :param max_pending: max responses waiting for the writer
+    :param type: int
+    :param flush_interval: max seconds a row waits for its batch to fill,
+        :meth:`flush` and :meth:`close` write a partial batch right away
+    :param type: float
+    """
+
+    def __init__(self, path: str, table: str = "responses",
+                 fields: Optional[Dict[str, str]] = None,
+                 store_result: bool = True,
+                 batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_pending: int = DEFAULT_MAX_PENDING,
+                 flush_interval: float = 1.0):
+
+        fields = dict(fields or {})
+        for name in [table] + list(fields):
+            if not _NAME_RE.match(name) or name in _COLUMNS:
+                raise ValueError("invalid table or column name: %r" % name)
+
+        if batch_size < 1:
+            raise ValueError("batch_size must be >= 1")
+
+        self.path = path
+        self.table = table
+        self.store_result = store_result
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.batches = 0
+        self.error: Optional[BaseException] = None
+
+        self._fields = [(name, split_path(path))
+                        for name, path in fields.items()]
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="eapi-sink",
+                                        daemon=True)
+        self._thread.start()
+
+        self._ready.wait()
+        if self.error is not None:
+            raise self.error
+
+    def __enter__(self) -> "SqliteSink":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def _item(self, result, timestamp: Optional[float]) -> tuple:
+        """(timestamp, target, response, error) from any kind of result"""
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        if isinstance(result, Response):
+            return timestamp, result.target, result, None
+
+        # PollResult, fleet Result...
+        target = getattr(result, "target", None)
+        if target is None:
+            target = result.host.target
+        return timestamp, target, result.response, result.error
+
+    def write(self, result, timestamp: Optional[float] = None) -> None:
+        """Queue a result, blocks while the queue is full
+
+        :param result: a `Response`, or a result holding one (and maybe an
+            error), such as a `PollResult` or a fleet `Result`
+        :param timestamp: seconds since the epoch (default: now)
+        :param type: float
+        """
+
+        if self.error is not None:
+            raise self.error
+        self._queue.put(self._item(result, timestamp))
+
+    async def awrite(self, result, timestamp: Optional[float] = None) -> None:
+        """:meth:`write` without blocking the event loop"""
+
+        if self.error is not None:
+            raise self.error
+
+        item = self._item(result, timestamp)
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            import asyncio
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._queue.put, item)
+
+    __call__ = write
+
+    def flush(self) -> None:
+        """wait until everything queued so far is written"""
+        if self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def close(self) -> None:
+        """write what is queued and stop the writer"""
+
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+        if self.error is not None:
+            raise self.error
+
+    def _rows(self, item: tuple) -> List[tuple]:
+        timestamp, target, response, error = item
+        blank = (None,) * len(self._fields)
+
+        if response is None:
+            return [(timestamp, str(target), None, None, None,
+                     str(error) or error.__class__.__name__, None) + blank]
+
+        rows = []
+        for elem in response:
+            result = elem.result
+            is_json = isinstance(result, JsonResult)
+
+            blob = None
+            if self.store_result:
+                blob = json.dumps(dict(result)) if is_json else str(result)
+
+            values = blank
+            if is_json and self._fields:
+                values = tuple(_column(resolve(result, segments))
+                               for _, segments in self._fields)
+
+            rows.append((timestamp, str(target), elem.command, response.code,
+                         response.message, None, blob) + values)
+        return rows
+
+    def _open(self) -> Tuple[sqlite3.Connection, str]:
+        columns = list(_COLUMNS) + [name for name, _ in self._fields]
+
+        conn = sqlite3.connect(self.path)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS %s (id INTEGER PRIMARY KEY, "
+            "timestamp REAL, target TEXT, command TEXT, code INTEGER, "
+            "message TEXT, error TEXT, result TEXT%s)" % (
+                self.table, "".join(", %s" % name
+                                    for name, _ in self._fields)))
+        conn.commit()
+
+        insert = "INSERT INTO %s (%s) VALUES (%s)" % (
+            self.table, ", ".join(columns), ", ".join("?" * len(columns)))
+        return conn, insert
+
+    def _run(self) -> None:
+        try:
+            conn, insert = self._open()
+        except Exception as exc:
+            self.error = exc
+            return
+        finally:
+            self._ready.set()
+
+        stopping = False
+        try:
+            while not stopping:
+                item = self._queue.get()
+
+                # fill the batch until it is full or its first row has
+                # waited flush_interval
+                items = []
+                markers = 0
+                deadline = time.monotonic() + self.flush_interval
+                while True:
+                    if item is _STOP or item is _FLUSH:
+                        stopping = item is _STOP
+                        markers = 1
+                        break
+                    items.append(item)
+                    if len(items) >= self.batch_size:
+                        break
+                    try:
+                        item = self._queue.get(
+                            timeout=max(0.0, deadline - time.monotonic()))
+                    except queue.Empty:
+                        break
+
+                if items and self.error is None:
+                    try:
+                        rows = [row for item in items
+                                for row in self._rows(item)]
+                        with conn:
+                            conn.executemany(insert, rows)
+                        self.written += len(rows)
+                        self.batches += 1
+                    except Exception as exc:
+                        # keep draining so writers are never stuck
+                        self.error = exc
+
+                for _ in range(len(items) + markers):
+                    self._queue.task_done()
+        finally:
+            conn.close()
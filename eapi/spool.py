@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+import mmap
+import os
+import re
+import tempfile
+import weakref
+
+from typing import Any, List, Optional, Tuple, Union
+
+from eapi.messages import Error, JsonResult, Response, ResponseElem, \
+    Target, TextResult
+from eapi.types import Request
+
+# the members EOS sends ahead of 'result' (or 'error')
+_HEAD_RE = re.compile(rb'\s*\{\s*(?:"(?:jsonrpc|id)"\s*:\s*'
+                      rb'(?:"[^"\\]*"|-?\d+|null)\s*,\s*)*'
+                      rb'"(result|error)"\s*:')
+_HEAD_SIZE = 4096
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+# inside an item only brackets matter, strings (which may hold brackets)
+# and everything else is skipped in one match
+_NESTED_RE = re.compile(rb'(?:[^"\[\]{}]+|' + _STRING + rb')*', re.S)
+# between items commas matter too
+_TOP_RE = re.compile(rb'(?:[^"\[\]{},]+|' + _STRING + rb')*', re.S)
+_SPACE_RE = re.compile(rb'\s*')
+
+
+def _result_spans(buf, pos: int) -> List[Tuple[int, int]]:
+    """Byte spans of the items of the 'result' array starting at ``pos``
+
+    Only brackets, commas and strings are looked at, nothing is decoded.
+    """
+
+    pos = _TOP_RE.match(buf, pos).end()
+    if buf[pos:pos + 1] != b"[":
+        raise ValueError("'result' is not an array")
+    pos += 1
+
+    spans = []
+    start = pos
+    depth = 0
+    size = len(buf)
+    while True:
+        pos = (_NESTED_RE if depth else _TOP_RE).match(buf, pos).end()
+        if pos >= size:
+            raise ValueError("truncated body")
+        token = buf[pos:pos + 1]
+        pos += 1
+
+        if token in b"[{":
+            depth += 1
+        elif token == b"," or depth:
+            if token != b",":
+                depth -= 1
+            elif not depth:
+                spans.append((start, pos - 1))
+                start = pos
+        elif _SPACE_RE.match(buf, start).end() < pos - 1:
+            # the closing bracket of 'result'
+            spans.append((start, pos - 1))
+            return spans
+        else:
+            return spans
+
+
+def _cleanup(path: Optional[str], fh, mapped) -> None:
+    if mapped is not None:
+        mapped.close()
+    if fh is not None:
+        fh.close()
+    if path is not None:
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+
+
+class SpooledBody(object):
+    """A response body kept in a file instead of memory
+
+    :param path: file holding the body
+    :param type: str
+    :param delete: remove the file on :meth:`close` (or garbage collection)
+    :param type: bool
+    :param use_mmap: keep the file memory-mapped, results are then sliced
+        from the mapping instead of read from the file
+    :param type: bool
+    """
+
+    def __init__(self, path: str, delete: bool = False,
+                 use_mmap: bool = False):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._spans: Optional[List[Tuple[int, int]]] = None
+
+        fh = mapped = None
+        if use_mmap and self.size:
+            fh = open(path, "rb")
+            mapped = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        self._map = mapped
+
+        self._finalizer = weakref.finalize(
+            self, _cleanup, path if delete else None, fh, mapped)
+
+    def __repr__(self):
+        return "SpooledBody(%r, %d bytes)" % (self.path, self.size)
+
+    @property
+    def closed(self) -> bool:
+        return not self._finalizer.alive
+
+    def view(self) -> Union[bytes, mmap.mmap]:
+        """the raw body, without a copy when memory-mapped"""
+        if self._map is not None:
+            return self._map
+        return self.read()
+
+    def read(self, size: int = -1) -> bytes:
+        if self._map is not None:
+            return self._map[:size if size >= 0 else self.size]
+        with open(self.path, "rb") as fh:
+            return fh.read(size)
+
+    def load(self) -> dict:
+        """the whole body, decoded"""
+        return json.loads(self.read())
+
+    def member(self) -> Optional[str]:
+        """'result' or 'error', without decoding the body
+
+        None when the body is not laid out as EOS lays it out.
+        """
+        match = _HEAD_RE.match(self.read(_HEAD_SIZE))
+        return match.group(1).decode() if match else None
+
+    def _slice(self, start: int, end: int) -> bytes:
+        if self._map is not None:
+            return self._map[start:end]
+        with open(self.path, "rb") as fh:
+            fh.seek(start)
+            return fh.read(end - start)
+
+    def spans(self) -> List[Tuple[int, int]]:
+        """byte offsets of each command's result in the body
+
+        Found by scanning the memory-mapped file once, without decoding it
+        or reading it into memory.
+        """
+        if self._spans is None:
+            with open(self.path, "rb") as fh, \
+                    mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                match = _HEAD_RE.match(buf)
+                if match is None or match.group(1) != b"result":
+                    raise ValueError("not a result body")
+                self._spans = _result_spans(buf, match.end())
+        return self._spans
+
+    def result(self, index: int) -> Any:
+        """one command's result, only its own bytes are read and decoded"""
+        start, end = self.spans()[index]
+        return json.loads(self._slice(start, end))
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+class SpooledTextResult(TextResult):
+    """Text output read from a :class:`SpooledBody` on first use"""
+
+    def __init__(self, body: SpooledBody, index: int):
+        self._body = body
+        self._index = index
+        self._cache: Optional[str] = None
+
+    @property
+    def _data(self) -> str:
+        if self._cache is None:
+            self._cache = self._body.result(self._index).get(
+                "output", "").strip()
+        return self._cache
+
+    def release(self) -> None:
+        """drop the loaded output, it is read again on next use"""
+        self._cache = None
+
+
+class SpooledJsonResult(JsonResult):
+    """JSON result read from a :class:`SpooledBody` on first use"""
+
+    def __init__(self, body: SpooledBody, index: int):
+        self._body = body
+        self._index = index
+        self._cache: Optional[dict] = None
+
+    @property
+    def _data(self) -> dict:
+        if self._cache is None:
+            self._cache = self._body.result(self._index)
+        return self._cache
+
+    def release(self) -> None:
+        """drop the loaded result, it is read again on next use"""
+        self._cache = None
+
+
+class SpooledResponse(Response):
+    """Response whose results stay in a :class:`SpooledBody` until used
+
+    Each result is read from the file and decoded on first use, on its
+    own, and kept until :meth:`release`.  Error responses are decoded in
+    memory right away.  Closing the response closes the body (and deletes
+    it if it was a temporary file).
+
+    >>> with sess.call(target, ["show tech-support"], encoding="text",
+    ...                spool="tech.json") as resp:
+    ...     print(resp.body.size)
+    """
+
+    def __init__(self, target, elements: List[ResponseElem],
+                 error: Error = None, body: Optional[SpooledBody] = None):
+        super().__init__(target, elements, error)
+        self.body = body
+
+    def __enter__(self) -> "SpooledResponse":
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def release(self) -> None:
+        """drop the decoded results, they are read again on next use"""
+        for elem in self.elements:
+            if isinstance(elem.result, (SpooledTextResult,
+                                        SpooledJsonResult)):
+                elem.result.release()
+
+    def close(self) -> None:
+        if self.body is not None:
+            self.body.close()
+
+    @classmethod
+    def from_spooled(cls, target: Target, request: Request,
+                     body: SpooledBody) -> "SpooledResponse":
+
+        if body.member() != "result":
+            resp = cls.from_rpc_response(target, request, body.load())
+            resp.body = body
+            return resp
+
+        lazy = SpooledTextResult \
+            if request["params"]["format"] == "text" else SpooledJsonResult
+
+        elements = [ResponseElem(cmd, lazy(body, index))
+                    for index, cmd in enumerate(request["params"]["cmds"])]
+
+        return cls(target, elements, {"code": 0, "message": ""}, body)
+
+
+class Spooler(object):
+    """Collects a body in memory, moving it to a file at ``threshold`` bytes
+
+    :param threshold: spool bodies of at least this many bytes (default:
+        only when ``path`` is given)
+    :param type: int
+    :param path: spool to this file, whatever the size (default: a
+        temporary file, deleted with the body)
+    :param type: str
+    :param directory: directory for temporary files
+    :param type: str
+    :param use_mmap: memory-map spooled bodies
+    :param type: bool
+    :param length: expected size (Content-Length), if known
+    :param type: int
+    """
+
+    def __init__(self, threshold: Optional[int] = None,
+                 path: Optional[str] = None, directory: Optional[str] = None,
+                 use_mmap: bool = False, length: Optional[int] = None):
+        self.threshold = threshold
+        self.path = path
+        self.directory = directory
+        self.use_mmap = use_mmap
+        self.size = 0
+
+        self._chunks: List[bytes] = []
+        self._file = None
+        self._delete = False
+
+        if path is not None or (threshold is not None and
+                                length is not None and length >= threshold):
+            self._open()
+
+    def _open(self) -> None:
+        if self.path is not None:
+            self._file = open(self.path, "wb")
+        else:
+            fd, self.path = tempfile.mkstemp(prefix="eapi-", suffix=".json",
+                                             dir=self.directory)
+            self._file = os.fdopen(fd, "wb")
+            self._delete = True
+
+        for chunk in self._chunks:
+            self._file.write(chunk)
+        self._chunks = []
+
+    def write(self, chunk: bytes) -> None:
+        self.size += len(chunk)
+
+        if self._file is not None:
+            self._file.write(chunk)
+            return
+
+        self._chunks.append(chunk)
+        if self.threshold is not None and self.size >= self.threshold:
+            self._open()
+
+    def finish(self) -> Union[bytes, SpooledBody]:
+        """the body, in memory or spooled"""
+
+        if self._file is None:
+            return b"".join(self._chunks)
+
+        self._file.close()
+        return SpooledBody(self.path, delete=self._delete,
+                           use_mmap=self.use_mmap)
+
+    def abort(self) -> None:
+        """discard what was collected"""
+
+        self._chunks = []
+        if self._file is not None:
+            self._file.close()
+            _cleanup(self.path if self._delete else None, None, None)
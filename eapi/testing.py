@@ -0,0 +1,729 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import base64
+import datetime
+import json
+import random
+import re
+import threading
+import time
+import uuid
+import zlib
+
+from typing import Any, Callable, Dict, List, Optional, Pattern, Tuple, \
+    Union
+
+import click
+
+Latency = Callable[[], float]
+
+# handler(device, match, encoding) returns the result of one command, a
+# JSON-able dict, or {"output": str} for the 'text' encoding
+Handler = Callable[["Device", Any, str], dict]
+
+SELECTORS = ("host", "port")
+LOGIN_MODES = ("cookie", "basic", "fail")
+
+
+def fixed(seconds: float) -> Latency:
+    """always ``seconds``"""
+    return lambda: seconds
+
+
+def uniform(low: float, high: float,
+            rng: Optional[random.Random] = None) -> Latency:
+    """uniformly distributed between ``low`` and ``high``"""
+    rng = rng or random.Random()
+    return lambda: rng.uniform(low, high)
+
+
+def normal(mean: float, stddev: float,
+           rng: Optional[random.Random] = None) -> Latency:
+    """normally distributed, never below zero"""
+    rng = rng or random.Random()
+    return lambda: max(0.0, rng.gauss(mean, stddev))
+
+
+def exponential(mean: float, rng: Optional[random.Random] = None) -> Latency:
+    """exponentially distributed with the given mean (long tail)"""
+    rng = rng or random.Random()
+    return lambda: rng.expovariate(1.0 / mean) if mean > 0 else 0.0
+
+
+def _latency(spec: Union[None, float, Latency]) -> Optional[Latency]:
+    if spec is None or callable(spec):
+        return spec
+    return fixed(float(spec))
+
+
+class Device(object):
+    """A virtual device
+
+    :param name: hostname, also the ``Host`` header
+    :param type: str
+    :param port: local port the device answers on (``select="port"``)
+    :param type: int
+    :param username: credentials, ``None`` to accept any request
+    :param type: str
+    :param password: password
+    :param type: str
+    :param login: 'cookie' (default), 'basic' (no /login endpoint, as on
+        older EOS) or 'fail' (/login errors)
+    :param type: str
+    :param latency: added to every request, seconds or a distribution
+    :param type: Latency
+    :param http_error_rate: fraction of requests answered with HTTP 500
+    :param type: float
+    :param max_inflight: requests in flight before answering 503
+    :param type: int
+    """
+
+    def __init__(self, name: str, port: Optional[int] = None,
+                 username: Optional[str] = "admin", password: str = "",
+                 login: str = "cookie",
+                 latency: Union[None, float, Latency] = None,
+                 http_error_rate: float = 0.0,
+                 max_inflight: Optional[int] = None,
+                 model: str = "vEOS", version: str = "4.23.2.1F"):
+
+        if login not in LOGIN_MODES:
+            raise ValueError("login must be one of %s" %
+                             ", ".join(LOGIN_MODES))
+
+        self.name = name
+        self.port = port
+        self.username = username
+        self.password = password
+        self.login = login
+        self.latency = _latency(latency)
+        self.http_error_rate = http_error_rate
+        self.max_inflight = max_inflight
+        self.model = model
+        self.version = version
+
+        self.serial = "EMU%08X" % zlib.crc32(name.encode())
+        self.booted = time.time()
+        self.running_config: List[str] = []
+
+        self.sessions: set = set()
+        self.inflight = 0
+
+        self.requests = 0
+        self.commands = 0
+        self.logins = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def __repr__(self):
+        return "Device(%r)" % self.name
+
+    def authorized(self, basic: Optional[Tuple[str, str]],
+                   cookie: Optional[str]) -> bool:
+        if self.username is None:
+            return True
+        if cookie is not None and cookie in self.sessions:
+            return True
+        return basic == (self.username, self.password)
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "commands": self.commands,
+            "logins": self.logins,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "inflight": self.inflight
+        }
+
+
+class CommandSpec(object):
+    """A command handler with its simulated cost and failure rate"""
+
+    def __init__(self, pattern: Union[str, Pattern], handler: Handler,
+                 latency: Union[None, float, Latency] = None,
+                 error_rate: float = 0.0):
+        if isinstance(pattern, str):
+            pattern = re.compile(pattern)
+        self.pattern = pattern
+        self.handler = handler
+        self.latency = _latency(latency)
+        self.error_rate = error_rate
+
+    def __repr__(self):
+        return "CommandSpec(%r)" % self.pattern.pattern
+
+
+def _show_version(device: Device, match, encoding: str) -> dict:
+    if encoding == "text":
+        return {"output": "Arista %s\nSerial number:       %s\n"
+                          "Software image version: %s\n" %
+                          (device.model, device.serial, device.version)}
+    return {
+        "modelName": device.model,
+        "serialNumber": device.serial,
+        "version": device.version,
+        "bootupTimestamp": device.booted,
+        "uptime": time.time() - device.booted
+    }
+
+
+def _show_hostname(device: Device, match, encoding: str) -> dict:
+    if encoding == "text":
+        return {"output": "Hostname: %s\nFQDN:     %s\n" % (device.name,
+                                                            device.name)}
+    return {"hostname": device.name, "fqdn": device.name}
+
+
+def _show_clock(device: Device, match, encoding: str) -> dict:
+    now = datetime.datetime.utcnow()
+    if encoding == "text":
+        return {"output": now.strftime("%a %b %d %H:%M:%S %Y") +
+                          "\nTimezone: UTC\nClock source: local\n"}
+    return {"utcTime": time.time(), "timezone": "UTC",
+            "clockSource": {"local": True}}
+
+
+def _show_running_config(device: Device, match, encoding: str) -> dict:
+    if encoding == "text":
+        return {"output": "hostname %s\n%s\n" % (
+            device.name, "\n".join(device.running_config))}
+    return {"cmds": {line: None for line in device.running_config}}
+
+
+def _empty(device: Device, match, encoding: str) -> dict:
+    return {"output": ""} if encoding == "text" else {}
+
+
+def _counters(index: int) -> dict:
+    return {
+        "inOctets": index * 1024,
+        "outOctets": index * 2048,
+        "inUcastPkts": index * 8,
+        "outUcastPkts": index * 16,
+        "inDiscards": 0,
+        "outErrors": index % 3
+    }
+
+
+def interfaces(size: int) -> dict:
+    """Interface counters of about ``size`` bytes of JSON
+
+    The result ``sized`` answers with, also handy for benchmarks and tests
+    that decode or diff large results without a device.
+    """
+
+    counters = {}
+    total = len('{"interfaces": {}}')
+    index = 1
+
+    while total < size or not counters:
+        name = "Ethernet%d" % index
+        counters[name] = _counters(index)
+        # the braces stand in for the ", " separator
+        total += len(json.dumps({name: counters[name]}))
+        index += 1
+
+    return {"interfaces": counters}
+
+
+def sized(size: int) -> Handler:
+    """Handler answering with interface counters of about ``size`` bytes
+
+    The result is built once and shared by every device.
+    """
+
+    data = interfaces(size)
+    output = "\n".join("%-12s %12d %12d" % (name, c["inOctets"],
+                                            c["outOctets"])
+                       for name, c in data["interfaces"].items()) + "\n"
+
+    def _handler(device: Device, match, encoding: str) -> dict:
+        return {"output": output} if encoding == "text" else data
+
+    return _handler
+
+
+_PAYLOADS: Dict[int, Handler] = {}
+
+
+def _show_payload(device: Device, match, encoding: str) -> dict:
+    size = int(match.group(1))
+    if size not in _PAYLOADS:
+        if len(_PAYLOADS) > 16:
+            _PAYLOADS.clear()
+        _PAYLOADS[size] = sized(size)
+    return _PAYLOADS[size](device, match, encoding)
+
+
+DEFAULT_COMMANDS = [
+    (r"^show version$", _show_version),
+    (r"^show hostname$", _show_hostname),
+    (r"^show clock$", _show_clock),
+    (r"^show running-config$", _show_running_config),
+    (r"^show interfaces counters$", sized(16 << 10)),
+    # 'show payload <bytes>' answers with a result of about that size
+    (r"^show payload (\d+)$", _show_payload),
+    (r"^enable$", _empty),
+]
+
+
+class _Reply(Exception):
+    """short-circuits a request with an HTTP status"""
+
+    def __init__(self, status: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+def _headers(scope) -> Dict[bytes, bytes]:
+    return {k.lower(): v for k, v in scope.get("headers", [])}
+
+
+def _basic_auth(headers: Dict[bytes, bytes]) -> Optional[Tuple[str, str]]:
+    header = headers.get(b"authorization", b"").decode("latin-1")
+    if not header.startswith("Basic "):
+        return None
+    try:
+        username, _, password = base64.b64decode(
+            header[6:]).decode("utf-8").partition(":")
+    except ValueError:
+        return None
+    return username, password
+
+
+def _cookie(headers: Dict[bytes, bytes]) -> Optional[str]:
+    for item in headers.get(b"cookie", b"").decode("latin-1").split(";"):
+        name, _, value = item.strip().partition("=")
+        if name == "Session":
+            return value
+    return None
+
+
+class Emulator(object):
+    """ASGI application answering eAPI requests for many virtual devices
+
+    Requests are routed to a device by the ``Host`` header or the local
+    port, and commands are answered by handlers registered with
+    :meth:`command`, each with its own latency distribution and error rate.
+
+    >>> emulator = Emulator.fleet(1000, select="port")
+    >>> emulator.command(r"^show interfaces counters$", sized(1 << 20),
+    ...                  latency=normal(0.05, 0.01), error_rate=0.001)
+    >>> with EmulatorServer(emulator, port=9000) as server:
+    ...     targets = server.targets    # http://127.0.0.1:9000 ... :9999
+
+    Without sockets, pass the emulator to an ``httpx`` transport:
+
+    >>> transport = httpx.ASGITransport(app=Emulator.fleet(10))
+    >>> async with AsyncSession(auth=("admin", ""),
+    ...                         transport=transport) as sess:
+    ...     await sess.call("veos1", ["show version"])
+
+    :param devices: the devices to simulate
+    :param type: list
+    :param select: how a request finds its device, by 'host' header
+        (default) or local 'port'
+    :param type: str
+    :param seed: seed for latency and error injection
+    :param type: int
+    """
+
+    def __init__(self, devices: Optional[List[Device]] = None,
+                 select: str = "host", seed: Optional[int] = None):
+
+        if select not in SELECTORS:
+            raise ValueError("select must be one of %s" %
+                             ", ".join(SELECTORS))
+
+        self.select = select
+        self.random = random.Random(seed)
+        self.commands: List[CommandSpec] = []
+        self.devices: Dict[str, Device] = {}
+        self._ports: Dict[int, Device] = {}
+
+        for pattern, handler in DEFAULT_COMMANDS:
+            self.command(pattern, handler)
+
+        for device in devices or []:
+            self.add(device)
+
+    @classmethod
+    def fleet(cls, count: int, prefix: str = "veos", select: str = "host",
+              base_port: Optional[int] = None, seed: Optional[int] = None,
+              **kwargs) -> "Emulator":
+        """Emulator for ``count`` identical devices named prefix1..prefixN
+
+        With ``base_port`` devices get consecutive ports from there on, other
+        arguments are passed to each :class:`Device`.
+        """
+
+        devices = []
+        for index in range(count):
+            port = base_port + index if base_port is not None else None
+            devices.append(Device("%s%d" % (prefix, index + 1), port=port,
+                                  **kwargs))
+        return cls(devices, select=select, seed=seed)
+
+    def add(self, device: Device) -> Device:
+        self.devices[device.name] = device
+        if device.port is not None:
+            self._ports[device.port] = device
+        return device
+
+    def assign_ports(self, ports: List[int]) -> None:
+        """give the devices (in order) the local ports they answer on"""
+        self._ports = {}
+        for device, port in zip(self.devices.values(), ports):
+            device.port = port
+            self._ports[port] = device
+
+    def command(self, pattern: Union[str, Pattern], handler: Handler,
+                latency: Union[None, float, Latency] = None,
+                error_rate: float = 0.0) -> CommandSpec:
+        """Register a command, later registrations take precedence
+
+        :param pattern: regex matched against the whole command
+        :param type: str
+        :param handler: called with (device, match, encoding)
+        :param type: Handler
+        :param latency: seconds or a distribution (see :func:`normal` ...)
+        :param type: Latency
+        :param error_rate: fraction of calls failing with an eAPI error
+        :param type: float
+        """
+
+        spec = CommandSpec(pattern, handler, latency, error_rate)
+        self.commands.insert(0, spec)
+        return spec
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: device.stats() for name, device in self.devices.items()}
+
+    def find(self, scope) -> Tuple[Optional[Device], str]:
+        """returns the device for a request and the path on that device"""
+
+        path = scope.get("path", "/")
+
+        if self.select == "port":
+            server = scope.get("server") or (None, None)
+            return self._ports.get(server[1]), path
+
+        host = _headers(scope).get(b"host", b"").decode("latin-1")
+        return self.devices.get(host.rsplit(":", 1)[0]), path
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            return
+
+        device, path = self.find(scope)
+
+        try:
+            if device is None:
+                raise _Reply(404, "Not Found")
+
+            if device.max_inflight is not None and \
+                    device.inflight >= device.max_inflight:
+                device.rejected += 1
+                raise _Reply(503, "Service Unavailable")
+
+            device.inflight += 1
+            try:
+                device.requests += 1
+                status, headers, body = await self._handle(
+                    device, path, _headers(scope), await self._body(receive))
+            finally:
+                device.inflight -= 1
+        except _Reply as reply:
+            status, headers = reply.status, []
+            body = json.dumps({"error": reply.reason}).encode()
+
+        await send({"type": "http.response.start", "status": status,
+                    "headers": [(b"content-type", b"application/json"),
+                                (b"content-length", b"%d" % len(body))] +
+                    headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _body(receive) -> bytes:
+        body = b""
+        while True:
+            message = await receive()
+            body += message.get("body", b"")
+            if not message.get("more_body"):
+                return body
+
+    async def _handle(self, device: Device, path: str,
+                      headers: Dict[bytes, bytes], body: bytes
+                      ) -> Tuple[int, list, bytes]:
+
+        if device.latency is not None:
+            await asyncio.sleep(device.latency())
+
+        if device.http_error_rate and \
+                self.random.random() < device.http_error_rate:
+            device.errors += 1
+            raise _Reply(500, "Internal Server Error")
+
+        if path.startswith("/login"):
+            return self._login(device, body)
+
+        if path.startswith("/logout"):
+            device.sessions.discard(_cookie(headers))
+            return 200, [], b'{"Logout": true}'
+
+        if not path.startswith("/command-api"):
+            raise _Reply(404, "Not Found")
+
+        if not device.authorized(_basic_auth(headers), _cookie(headers)):
+            raise _Reply(401, "Unauthorized")
+
+        try:
+            request = json.loads(body)
+        except ValueError:
+            return 200, [], json.dumps(_rpc_error(None, -32700,
+                                                  "Parse error")).encode()
+
+        response = await self.run(device, request)
+        return 200, [], json.dumps(response).encode()
+
+    def _login(self, device: Device, body: bytes) -> Tuple[int, list, bytes]:
+        if device.login == "basic":
+            raise _Reply(404, "Not Found")
+        if device.login == "fail":
+            raise _Reply(500, "Internal Server Error")
+
+        try:
+            data = json.loads(body)
+            credentials = (data["username"], data["password"])
+        except (ValueError, KeyError, TypeError):
+            raise _Reply(400, "Bad Request")
+
+        if device.username is not None and \
+                credentials != (device.username, device.password):
+            raise _Reply(401, "Unauthorized")
+
+        device.logins += 1
+        session = uuid.uuid4().hex
+        device.sessions.add(session)
+        cookie = "Session=%s; Path=/; HttpOnly" % session
+        return 200, [(b"set-cookie", cookie.encode())], b'{"Login": true}'
+
+    def _lookup(self, command: str):
+        for spec in self.commands:
+            match = spec.pattern.search(command)
+            if match:
+                return spec, match
+        return None, None
+
+    async def run(self, device: Device, request: dict) -> dict:
+        """Run a JSON-RPC request on a device, returns the response"""
+
+        request_id = request.get("id") if isinstance(request, dict) else None
+
+        try:
+            if request["jsonrpc"] != "2.0" or request["method"] != "runCmds":
+                raise ValueError("invalid request")
+            params = request["params"]
+            encoding = params.get("format", "json")
+            commands = params["cmds"]
+            if encoding not in ("json", "text") or \
+                    not isinstance(commands, list):
+                raise ValueError("invalid params")
+        except (KeyError, TypeError, ValueError) as exc:
+            return _rpc_error(request_id, -32600, "Invalid request: %s" % exc)
+
+        results: List[dict] = []
+        config_mode = False
+
+        for index, command in enumerate(commands):
+            if isinstance(command, dict):
+                command = command.get("cmd", "")
+            command = command.strip()
+            device.commands += 1
+
+            if config_mode:
+                if command == "end":
+                    config_mode = False
+                elif command not in ("commit", "abort"):
+                    device.running_config.append(command)
+                results.append(_empty(device, None, encoding))
+                continue
+
+            if command.startswith("configure"):
+                config_mode = True
+                results.append(_empty(device, None, encoding))
+                continue
+
+            spec, match = self._lookup(command)
+            failed = spec is None
+
+            if spec is not None:
+                if spec.latency is not None:
+                    await asyncio.sleep(spec.latency())
+                failed = bool(spec.error_rate) and \
+                    self.random.random() < spec.error_rate
+
+            if failed:
+                device.errors += 1
+                error = "Invalid input" if spec is None else \
+                    "Simulated failure"
+                results.append(_failed(encoding, error))
+                return _rpc_error(
+                    request_id, 1002,
+                    "CLI command %d of %d '%s' failed: invalid command" %
+                    (index + 1, len(commands), command), results)
+
+            results.append(spec.handler(device, match, encoding))
+
+        return {"jsonrpc": "2.0", "id": request_id, "result": results}
+
+
+def _failed(encoding: str, error: str) -> dict:
+    result: Dict[str, Any] = {"errors": [error]}
+    if encoding == "text":
+        result["output"] = "%% %s\n" % error
+    return result
+
+
+def _rpc_error(request_id, code: int, message: str,
+               data: Optional[list] = None) -> dict:
+    error: Dict[str, Any] = {"code": code, "message": message}
+    if data is not None:
+        error["data"] = data
+    return {"jsonrpc": "2.0", "id": request_id, "error": error}
+
+
+class EmulatorServer(object):
+    """Serve an :class:`Emulator` with uvicorn from a background thread
+
+    With ``select="port"`` one socket is bound per device, on consecutive
+    ports from ``port`` (or ephemeral ports when ``port`` is 0).
+
+    :param emulator: emulator to serve
+    :param type: Emulator
+    :param host: address to bind
+    :param type: str
+    :param port: (first) port to bind
+    :param type: int
+    """
+
+    def __init__(self, emulator: Emulator, host: str = "127.0.0.1",
+                 port: int = 0, **config):
+        self.emulator = emulator
+        self.host = host
+        self.port = port
+        self.ports: List[int] = []
+        self._config = config
+        self._server = None
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> "EmulatorServer":
+        self.start()
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.stop()
+
+    @property
+    def targets(self) -> List[str]:
+        """one target URL per bound port"""
+        return ["http://%s:%d" % (self.host, port) for port in self.ports]
+
+    def _bind(self) -> list:
+        import socket
+
+        count = len(self.emulator.devices) \
+            if self.emulator.select == "port" else 1
+
+        sockets = []
+        try:
+            for index in range(count):
+                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                sock.bind((self.host, self.port + index if self.port else 0))
+                sockets.append(sock)
+        except OSError:
+            for sock in sockets:
+                sock.close()
+            raise
+
+        return sockets
+
+    def start(self) -> None:
+        from uvicorn.config import Config
+        from uvicorn.main import Server
+
+        class _Server(Server):
+            def install_signal_handlers(self) -> None:
+                # only possible in the main thread (older uvicorn)
+                pass
+
+        sockets = self._bind()
+        self.ports = [sock.getsockname()[1] for sock in sockets]
+        if self.emulator.select == "port":
+            self.emulator.assign_ports(self.ports)
+
+        options = dict(lifespan="off", loop="asyncio", log_level="warning",
+                       backlog=4096)
+        options.update(self._config)
+
+        self._server = _Server(Config(app=self.emulator, **options))
+        self._thread = threading.Thread(target=self._server.run,
+                                        kwargs={"sockets": sockets},
+                                        daemon=True)
+        self._thread.start()
+
+        while not self._server.started:
+            if not self._thread.is_alive():
+                raise RuntimeError("emulator failed to start")
+            time.sleep(1e-3)
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.should_exit = True
+            self._thread.join()
+            self._server = None
+
+
+@click.command()
+@click.option("--devices", "-n", type=int, default=1,
+              help="Number of devices (default: 1)")
+@click.option("--host", default="127.0.0.1", help="Address to bind")
+@click.option("--port", "-p", type=int, default=8080,
+              help="First port, one port per device (default: 8080)")
+@click.option("--latency", type=float, default=0.0,
+              help="Mean request latency in seconds (exponential)")
+@click.option("--error-rate", type=float, default=0.0,
+              help="Fraction of commands that fail")
+@click.option("--max-inflight", type=int, default=None,
+              help="Requests in flight per device before answering 503")
+@click.option("--username", "-u", default="admin")
+@click.option("--password", "-P", default="")
+def main(devices, host, port, latency, error_rate, max_inflight, username,
+         password):
+    """Serve emulated devices until interrupted"""
+
+    emulator = Emulator.fleet(
+        devices, select="port", username=username, password=password,
+        max_inflight=max_inflight,
+        latency=exponential(latency) if latency else None)
+
+    for spec in emulator.commands:
+        spec.error_rate = error_rate
+
+    with EmulatorServer(emulator, host, port) as server:
+        click.echo("serving %d devices on %s ports %d-%d" % (
+            devices, host, server.ports[0], server.ports[-1]))
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,11 @@
 # Arista Networks, Inc. Confidential and Proprietary.
 
 from typing import List, Optional, Tuple, Union
-from typing_extensions import TypedDict
+
+try:
+    from typing import TypedDict
+except ImportError:  # python < 3.8
+    from typing_extensions import TypedDict
 
 PromptedCommand = TypedDict('PromptedCommand', {
     'cmd': str,
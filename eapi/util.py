@@ -2,24 +2,17 @@
 # Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
-import os
+import time
 import uuid
 
-from typing import Optional, Union, List
+from typing import Any, AsyncIterator, Awaitable, Callable, Iterable, \
+    Optional, Tuple, Union, List
 
-import eapi.sessions
 from eapi.types import Command, Params, Request
 
 from eapi.environments import EAPI_DEFAULT_ENCODING
 
 
-def clear_screen() -> None:
-    if os.name == 'nt':
-        os.system('cls')
-    else:
-        os.system('clear')
-
-
 def indent(spaces, text: str):
     indented = []
     for line in text.splitlines():
@@ -72,6 +65,130 @@ def prepare_request(commands: List[Command], encoding: Optional[str] = None, str
     return req
 
 
+class Ticker(object):
+    """Fixed-cadence schedule for repeating work
+
+    Ticks are anchored to the start time, so the time spent doing the work does
+    not push later ticks back.  Ticks that have already passed when the work
+    finishes are skipped and counted in ``missed``.
+
+    :param interval: seconds between ticks
+    :param type: float
+    """
+
+    def __init__(self, interval: float, start: Optional[float] = None):
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+
+        self.interval = interval
+        self.start = time.monotonic() if start is None else start
+
+        # ticks run and ticks skipped because the previous work overran
+        self.ticks = 0
+        self.missed = 0
+
+        # how late the most recent tick fired and the worst seen so far
+        self.lateness = 0.0
+        self.max_lateness = 0.0
+
+        # index of the next scheduled tick, its time is start + n * interval
+        self._index = 0
+
+    @property
+    def next_tick(self) -> float:
+        """monotonic time of the next scheduled tick"""
+        return self.start + self.next_offset
+
+    @property
+    def next_offset(self) -> float:
+        """seconds from the start to the next scheduled tick"""
+        return self._index * self.interval
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.start
+
+    def tick(self) -> None:
+        """Record that a tick fired now and schedule the next one"""
+
+        now = time.monotonic()
+        late = now - self.next_tick
+
+        if late >= self.interval:
+            skipped = int(late // self.interval)
+            self.missed += skipped
+            self._index += skipped
+            late = now - self.next_tick
+
+        self.lateness = max(0.0, late)
+        self.max_lateness = max(self.max_lateness, self.lateness)
+        self.ticks += 1
+        self._index += 1
+
+    def delay(self) -> float:
+        """seconds until the next tick"""
+        return max(0.0, self.next_tick - time.monotonic())
+
+
+async def bounded_as_completed(
+        func: Callable[[Any], Awaitable], items: Iterable, concurrency: int
+        ) -> AsyncIterator[Tuple[Any, Any, Optional[BaseException]]]:
+    """Run ``func`` for each item with at most ``concurrency`` in flight
+
+    Items are pulled from ``items`` lazily, so memory is bounded by the
+    concurrency rather than the number of items.  Yields ``(item, result,
+    error)`` as calls complete, where ``error`` is the exception raised by
+    the call (and ``result`` is ``None``).  Closing the generator early
+    (``aclose``) cancels and awaits the calls still in flight.
+
+    :param func: coroutine function called with each item
+    :param type: Callable
+    :param items: items to process
+    :param type: Iterable
+    :param concurrency: max calls in flight
+    :param type: int
+    """
+
+    # imported here to keep asyncio off the import path of sync callers
+    import asyncio
+
+    if concurrency < 1:
+        raise ValueError("concurrency must be >= 1")
+
+    items = iter(items)
+    pending: dict = {}
+
+    def _fill():
+        while len(pending) < concurrency:
+            try:
+                item = next(items)
+            except StopIteration:
+                return
+            pending[asyncio.ensure_future(func(item))] = item
+
+    _fill()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(pending,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                item = pending.pop(task)
+                if task.cancelled():
+                    yield item, None, asyncio.CancelledError()
+                elif task.exception():
+                    yield item, None, task.exception()
+                else:
+                    yield item, task.result(), None
+            _fill()
+    finally:
+        # closed early (break, error or aclose): stop the calls still in
+        # flight and wait for them, so none is left pending
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+
 def zpad(keys, values, default=None):
     """zips two lits and pads the second to match the first in length"""
 
@@ -15,10 +15,13 @@ setup(
     version=version,
     packages=["eapi"],
     install_requires=[
-        'httpx>=0.12.0',
+        'httpx>=0.21.0',
         'typing-extensions>=3.7.4.2',
         'click'
     ],
+    extras_require={
+        'testing': ['uvicorn']
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Environment :: Console',
@@ -0,0 +1,34 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+# Benchmarks are slow and only run when asked for:
+#
+#   EAPI_BENCHMARKS=1 pytest tests/benchmarks
+#
+# see the bench targets in the Makefile for saving and comparing baselines
+
+import os
+
+import pytest
+
+from tests.server import payload
+
+# response payload sizes used by the decoding benchmarks
+SIZES = {"1KB": 1 << 10, "1MB": 1 << 20, "50MB": 50 << 20}
+
+# number of targets in fan-out benchmarks
+FAN_OUT = (1, 10, 100, 1000)
+
+if not os.environ.get("EAPI_BENCHMARKS"):
+    collect_ignore_glob = ["test_*.py"]
+
+
+@pytest.fixture(params=list(SIZES), scope="module")
+def size(request):
+    return SIZES[request.param]
+
+
+@pytest.fixture(scope="module")
+def rpc_response(size):
+    return {"jsonrpc": "2.0", "id": "1", "result": [payload(size)]}
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+
+import pytest
+
+from eapi.messages import PreparedRequest, Response, Target
+from eapi.util import prepare_request
+
+pytest.importorskip("pytest_benchmark")
+
+COMMANDS = ["show version", "show hostname", "show interfaces counters",
+            {"cmd": "enable", "input": "secret"}]
+
+TARGET = Target.from_string("localhost")
+
+
+def test_prepare_request(benchmark):
+    benchmark(lambda: json.dumps(prepare_request(COMMANDS, "json")))
+
+
+def test_prepared_request_body(benchmark):
+    prepared = PreparedRequest(COMMANDS, "json")
+    benchmark(prepared.body)
+
+
+def test_decode(benchmark, rpc_response):
+    body = json.dumps(rpc_response).encode()
+    request = prepare_request(["show payload"], "json")
+
+    def _decode():
+        return Response.from_rpc_response(TARGET, request, json.loads(body))
+
+    response = benchmark.pedantic(_decode, rounds=5, warmup_rounds=1)
+    assert response.code == 0
+
+
+def test_render_json(benchmark, rpc_response):
+    request = prepare_request(["show payload"], "json")
+    response = Response.from_rpc_response(TARGET, request, rpc_response)
+
+    benchmark.pedantic(lambda: response.json, rounds=5, warmup_rounds=1)
+
+
+def test_render_text(benchmark, rpc_response):
+    request = prepare_request(["show payload"], "text")
+    output = "\n".join("%s %s" % item for item in
+                       rpc_response["result"][0]["interfaces"].items())
+    response = Response.from_rpc_response(
+        TARGET, request, {"jsonrpc": "2.0", "id": "1",
+                          "result": [{"output": output}]})
+
+    benchmark.pedantic(lambda: response.pretty, rounds=5, warmup_rounds=1)
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from eapi.messages import PreparedRequest
+from eapi.sessions import AsyncSession, Session
+
+from tests.benchmarks.conftest import FAN_OUT, SIZES
+
+pytest.importorskip("pytest_benchmark")
+
+# the emulator is a single host, so every "target" is the same URL and the
+# fan-out measures the client (pooling, scheduling, decoding) rather than
+# the network
+THREADS = 32
+
+
+@pytest.fixture()
+def target(server):
+    return str(server.url).rstrip("/")
+
+
+@pytest.fixture()
+def session(auth):
+    with Session(auth=auth) as sess:
+        yield sess
+
+
+@pytest.fixture()
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def test_call(benchmark, session, target):
+    request = PreparedRequest(["show version"])
+    benchmark(session.call, target, request)
+
+
+@pytest.mark.parametrize("label", list(SIZES))
+def test_call_payload(benchmark, session, target, label):
+    request = PreparedRequest(["show payload %d" % SIZES[label]])
+    response = benchmark.pedantic(session.call, (target, request),
+                                  rounds=3, warmup_rounds=1)
+    assert response.code == 0
+
+
+@pytest.mark.parametrize("count", FAN_OUT)
+def test_fan_out_sync(benchmark, session, target, count):
+    request = PreparedRequest(["show version"])
+
+    def _run():
+        return [session.call(target, request) for _ in range(count)]
+
+    benchmark.pedantic(_run, rounds=3, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("count", FAN_OUT)
+def test_fan_out_threads(benchmark, session, target, count):
+    request = PreparedRequest(["show version"])
+
+    with ThreadPoolExecutor(max_workers=min(count, THREADS)) as pool:
+        def _run():
+            return list(pool.map(lambda _: session.call(target, request),
+                                 range(count)))
+
+        benchmark.pedantic(_run, rounds=3, warmup_rounds=1)
+
+
+@pytest.mark.parametrize("count", FAN_OUT)
+def test_fan_out_async(benchmark, loop, auth, target, count):
+    request = PreparedRequest(["show version"])
+    session = AsyncSession(auth=auth)
+
+    async def _run():
+        return await asyncio.gather(*[session.call(target, request)
+                                      for _ in range(count)])
+
+    try:
+        benchmark.pedantic(lambda: loop.run_until_complete(_run()),
+                           rounds=3, warmup_rounds=1)
+    finally:
+        loop.run_until_complete(session.close())
+
+
+def test_login_call(benchmark, auth, target):
+    """a new session that logs in before its first call"""
+
+    def _run():
+        with Session(auth=auth) as sess:
+            sess.login(target, auth)
+            return sess.call(target, ["show version"])
+
+    benchmark(_run)
+
+
+def test_basic_auth_call(benchmark, auth, target):
+    """a new session that sends basic auth with its first call"""
+
+    def _run():
+        with Session(auth=auth) as sess:
+            return sess.call(target, ["show version"])
+
+    benchmark(_run)
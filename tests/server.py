@@ -5,6 +5,7 @@
 import asyncio
 import base64
 import datetime
+import functools
 import json
 import uuid
 import re
@@ -20,6 +21,8 @@ from httpx import URL
 
 import pytest
 
+from eapi.testing import interfaces
+
 
 def _bash(encoding, *args):
     cmd = args[0].split()
@@ -116,11 +119,39 @@ def _show_bogus(encoding, *args):
     return responses[encoding]
 
 
+def _configure(encoding, *args):
+    responses = {
+        "text": {"output": ""},
+        "json": {}
+    }
+    return responses[encoding]
+
+
+@functools.lru_cache(maxsize=8)
+def payload(size: int) -> dict:
+    """Interface counters like JSON result of about ``size`` bytes"""
+    return interfaces(size)
+
+
+def _show_payload(encoding, size, *args):
+    data = payload(int(size))
+    if encoding == "text":
+        lines = ["%-12s %12d %12d" % (name, c["inOctets"], c["outOctets"])
+                 for name, c in data["interfaces"].items()]
+        return {"output": "\n".join(lines) + "\n"}
+    return data
+
+
+# configuration commands received, in order
+CONFIG_LOG = []
+
 CMDS = [
     (re.compile(r"show version"), _show_version),
     (re.compile(r"show clock"), _show_clock),
     (re.compile(r"show hostname"), _show_hostname),
-    (re.compile(r"bash timeout \d+ (.*)"), _bash)
+    (re.compile(r"show payload (\d+)"), _show_payload),
+    (re.compile(r"bash timeout \d+ (.*)"), _bash),
+    (re.compile(r"^configure"), _configure)
 ]
 
 
@@ -159,14 +190,26 @@ def build_response(request):
         if not isinstance(cmds, list):
             raise ValueError
 
+        config_mode = False
+
         for cmd in cmds:
 
             if isinstance(cmd, dict):
                 cmd = cmd["cmd"]
 
-            result = _do_cmd(cmd, encoding)
+            if config_mode and cmd == "end":
+                config_mode = False
+                result = _configure(encoding)
+            elif config_mode:
+                # accept any configuration except for lines marked bogus
+                result = None if "bogus" in cmd else _configure(encoding)
+                if result is not None:
+                    CONFIG_LOG.append(cmd)
+            else:
+                result = _do_cmd(cmd, encoding)
+                config_mode = cmd.startswith("configure")
 
-            if not result:
+            if result is None:
                 errored = True
                 results.append(_show_bogus(encoding))
                 break
@@ -89,6 +89,100 @@ async def test_awatch(server, auth):
             eapi.awatch(target, c, callback=_cb, auth=auth, encoding="text", deadline=10)
         )
     
-    await asyncio.wait(tasks)
+    await asyncio.gather(*tasks)
+
+
+def test_watch_session(server, auth):
+    target = str(server.url)
+    responses = []
+
+    with eapi.Session(auth=auth) as sess:
+        ticker = eapi.watch(target, "show clock", callback=lambda r, m: responses.append(r),
+                            interval=0.1, deadline=0.5, session=sess)
+
+    # the ticker may skip ticks when the loop is slow
+    assert 1 <= ticker.ticks <= 5
+    assert len(responses) == ticker.ticks
+
+
+def test_watch_condition(server, auth):
+    target = str(server.url)
+    matches = []
+
+    ticker = eapi.watch(target, "show hostname", callback=lambda r, m: matches.append(m),
+                        auth=auth, interval=0.1, condition="localhost")
+    assert ticker.ticks == 1
+    assert matches == [True]
+
+    ticker = eapi.watch(target, "show hostname", callback=lambda r, m: matches.append(m),
+                        auth=auth, interval=0.1, condition="localhost", exclude=True,
+                        deadline=0.3)
+    assert 1 <= ticker.ticks <= 3
+
+
+@pytest.mark.asyncio
+async def test_awatch_concurrent(server, auth):
+    target = str(server.url)
+    counts = {}
+
+    async def _cb(r, match: bool):
+        counts[r[0].command] = counts.get(r[0].command, 0) + 1
+
+    async with eapi.AsyncSession(auth=auth) as sess:
+        tickers = await asyncio.gather(*[
+            eapi.awatch(target, "show clock %d" % i, callback=_cb, interval=0.1,
+                        deadline=0.5, session=sess)
+            for i in range(20)
+        ])
+
+    # sleeps must not block the loop, so every watch keeps ticking
+    assert all(1 <= t.ticks <= 5 for t in tickers)
+    assert sum(counts.values()) == sum(t.ticks for t in tickers)
     
 
+
+
+def test_watch_changes_only(server, auth):
+    target = str(server.url)
+    responses = []
+
+    ticker = eapi.watch(target, "show hostname", callback=lambda r, m: responses.append(r),
+                        auth=auth, interval=0.05, deadline=0.5, changes_only=True)
+    # tick counts depend on the clock, only unchanged responses are certain
+    assert 2 <= ticker.ticks <= 10
+    assert len(responses) == 1
+
+    # show clock changes on every poll
+    responses = []
+    ticker = eapi.watch(target, "show clock", callback=lambda r, m: responses.append(r),
+                        auth=auth, encoding="text", interval=0.1, deadline=0.5,
+                        changes_only=True)
+    assert 1 <= ticker.ticks <= 5
+    assert len(responses) == ticker.ticks
+
+
+def test_watch_heartbeat(server, auth):
+    target = str(server.url)
+    responses = []
+
+    ticker = eapi.watch(target, "show hostname",
+                        callback=lambda r, m: responses.append(r),
+                        auth=auth, interval=0.05, deadline=0.5,
+                        changes_only=True, heartbeat=0.12)
+    # first poll plus at most one heartbeat every 0.12s
+    assert 2 <= len(responses) <= 1 + 0.5 // 0.12
+    assert len(responses) < ticker.ticks
+
+
+@pytest.mark.asyncio
+async def test_awatch_changes_only(server, auth):
+    target = str(server.url)
+    responses = []
+
+    async def _cb(r, match: bool):
+        responses.append(r)
+
+    ticker = await eapi.awatch(target, "show hostname", callback=_cb, auth=auth,
+                               interval=0.05, deadline=0.3, changes_only=True)
+    assert 2 <= ticker.ticks <= 6
+    assert len(responses) == 1
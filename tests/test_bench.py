@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import pytest
+
+from eapi.bench import abench, bench, percentile
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile([3.0], 90) == 3.0
+    assert percentile([], 50) == 0.0
+
+
+def test_bench(server, auth):
+    result = bench(str(server.url), ["show hostname", "show version"],
+                   workers=4, requests=40, auth=auth)
+
+    assert result.requests == 40
+    assert len(result.latencies) == 40
+    assert result.errors == {}
+    assert 1 <= result.connections <= 4
+    assert result.throughput > 0
+
+    latency = result.latency
+    assert latency["min"] <= latency["p50"] <= latency["p90"] <= \
+        latency["p99"] <= latency["max"]
+
+    data = result.to_dict()
+    assert data["requests"] == 40 and data["mode"] == "sync"
+    assert "p99" in str(result)
+
+
+def test_bench_duration(server, auth):
+    result = bench(str(server.url), ["show bogus"], workers=2, duration=0.2,
+                   auth=auth)
+
+    assert 0.2 <= result.elapsed < 1
+    assert result.requests > 0
+    assert result.error_count == result.requests
+
+    with pytest.raises(ValueError):
+        bench(str(server.url), ["show version"])
+
+    with pytest.raises(ValueError):
+        bench(str(server.url), [], requests=1)
+
+
+def _boom(response):
+    raise KeyError("boom")
+
+
+def test_bench_failure(server, auth):
+    # not an eAPI error: the workers stop and it is raised to the caller
+    with pytest.raises(KeyError):
+        bench(str(server.url), ["show version"], workers=2, duration=5,
+              auth=auth, postprocess=_boom)
+
+
+def test_bench_unreachable():
+    result = bench("localhost:1", ["show version"], requests=3)
+    assert result.requests == result.error_count == 3
+    assert result.latencies == []
+
+
+@pytest.mark.asyncio
+async def test_abench(server, auth):
+    result = await abench(str(server.url), ["show version"], workers=8,
+                          requests=80, auth=auth)
+
+    assert result.requests == 80
+    assert result.mode == "async"
+    assert 1 <= result.connections <= 8
@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import pytest
+
+import eapi
+from eapi.bulk import apush, apush_many, chunk_commands, push, push_many
+from eapi.exceptions import EapiResponseError
+
+from tests import server as emulator
+
+
+@pytest.fixture()
+def acl():
+    commands = ["ip access-list standard BIG"]
+    commands += ["   %d permit host 10.0.%d.%d" % (i * 10, i // 256, i % 256)
+                 for i in range(1, 251)]
+    commands += ["interface Ethernet1", "   description uplink"]
+    return commands
+
+
+def test_chunk_commands(acl):
+    chunks = chunk_commands(acl, 100)
+    assert len(chunks) == 3
+    assert all(len(c) <= 100 for c in chunks)
+
+    # the parent block is re-entered in each chunk
+    assert chunks[1][0] == "ip access-list standard BIG"
+    assert chunks[2][0] == "ip access-list standard BIG"
+    assert chunks[2][-2:] == ["interface Ethernet1", "   description uplink"]
+
+    # every command is sent exactly once (besides repeated parents)
+    flat = [c for chunk in chunks for c in chunk
+            if c != "ip access-list standard BIG"]
+    assert flat == acl[1:]
+
+    assert chunk_commands(["a", "b", "c"], 2) == [["a", "b"], ["c"]]
+
+    with pytest.raises(ValueError):
+        chunk_commands(["a", " b", "  c"], 2)
+
+    with pytest.raises(ValueError):
+        chunk_commands(acl, 0)
+
+
+def test_push(server, auth, acl):
+    target = str(server.url)
+    progress = []
+
+    del emulator.CONFIG_LOG[:]
+    result = push(target, acl, chunk_size=100, auth=auth,
+                  progress=lambda t, done, total: progress.append((done, total)))
+
+    assert result.ok
+    assert result.chunks == 3
+    assert result.pushed == result.total == len(acl)
+    assert result.throughput > 0
+    assert progress[-1] == (len(acl), len(acl))
+    assert [p[0] for p in progress] == sorted(p[0] for p in progress)
+
+    assert [c for c in emulator.CONFIG_LOG if "permit" in c] == acl[1:251]
+    result.to_dict()
+
+
+def test_push_session(server, auth, acl):
+    target = str(server.url)
+
+    del emulator.CONFIG_LOG[:]
+    with eapi.Session(auth=auth) as sess:
+        result = push(target, acl, chunk_size=100, session_name="bulk1",
+                      session=sess)
+
+    assert result.ok
+    assert emulator.CONFIG_LOG[-1] == "commit"
+    assert emulator.CONFIG_LOG.count("commit") == 1
+
+    with pytest.raises(ValueError):
+        push(target, acl, session_name="two words")
+
+
+def test_push_error(server, auth, acl):
+    target = str(server.url)
+    acl.insert(150, "   bogus command")
+
+    del emulator.CONFIG_LOG[:]
+    result = push(target, acl, chunk_size=100, session_name="bulk2", auth=auth)
+
+    assert not result.ok
+    assert isinstance(result.error, EapiResponseError)
+    assert result.chunks == 1
+    assert emulator.CONFIG_LOG[-1] == "abort"
+    assert "commit" not in emulator.CONFIG_LOG
+
+
+@pytest.mark.asyncio
+async def test_apush(server, auth, acl):
+    target = str(server.url)
+    result = await apush(target, acl, chunk_size=64, auth=auth)
+    assert result.ok
+    assert result.chunks == 4
+
+
+@pytest.mark.asyncio
+async def test_apush_many(server, auth, acl):
+    targets = [str(server.url), "localhost:1"]
+
+    results = await apush_many(targets, acl, concurrency=2, chunk_size=100,
+                               auth=auth)
+
+    assert len(results) == 2
+    ok = [r for r in results.values() if r.ok]
+    failed = [r for r in results.values() if not r.ok]
+    assert len(ok) == 1 and ok[0].pushed == len(acl)
+    assert len(failed) == 1 and failed[0].pushed == 0
+
+
+def test_push_many(server, auth, acl):
+    results = push_many([str(server.url)], acl, chunk_size=100, auth=auth)
+    assert all(r.ok for r in results.values())
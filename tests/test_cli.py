@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import json
+
+import pytest
+
+from click.testing import CliRunner
+
+from eapi.cli import _watch_many, load_targets, main
+
+
+@pytest.fixture()
+def runner():
+    return CliRunner()
+
+
+def test_load_targets(tmp_path):
+    inventory = tmp_path / "hosts.txt"
+    inventory.write_text("# spines\nspine1\nspine2  # lab\n\nleaf1\n")
+
+    assert load_targets("veos1") == ["veos1"]
+    assert load_targets("veos1, veos2,") == ["veos1", "veos2"]
+    assert load_targets("veos1,@%s" % inventory) == \
+        ["veos1", "spine1", "spine2", "leaf1"]
+
+
+def test_execute(runner, server, auth):
+    target = str(server.url)
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1], target,
+                                  "execute", "show hostname"])
+    assert result.exit_code == 0
+    assert "FQDN" in result.output
+
+
+def test_execute_many(runner, server, auth):
+    target = str(server.url).rstrip("/")
+    targets = ",".join([target] * 3 + ["localhost:1"])
+
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1],
+                                  "-e", "json", "-C", "2", targets,
+                                  "execute", "show hostname"])
+    assert result.exit_code == 0
+
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert len(records) == 4
+    errors = [r for r in records if "error" in r]
+    assert len(errors) == 1 and errors[0]["target"] == "http://localhost:1"
+    for record in records:
+        if "error" not in record:
+            assert record["target"] == target
+            assert record["responses"][0]["result"]["hostname"] == "localhost"
+
+
+def test_execute_stdin(runner, server, auth):
+    target = str(server.url).rstrip("/")
+
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1], "-",
+                                  "execute", "--ndjson", "show hostname"],
+                           input="%s\n%s\n" % (target, target))
+    assert result.exit_code == 0
+    assert len(result.output.splitlines()) == 2
+
+
+def test_watch_many(runner, server, auth):
+    target = str(server.url).rstrip("/")
+    targets = "%s,localhost:1" % target
+
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1], targets,
+                                  "watch", "-i", "1", "-d", "0.5",
+                                  "show hostname"])
+    assert result.exit_code == 0
+    assert "Watching 'show hostname' on 2 targets" in result.output
+    assert "FQDN" in result.output
+    assert "── http://localhost:1 (error)" in result.output
+
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1],
+                                  "%s,%s" % (target, target.replace(
+                                      "127.0.0.1", "localhost")),
+                                  "watch", "--layout", "table",
+                                  "-c", "FQDN", "show hostname"])
+    assert result.exit_code == 0
+    assert "TARGET" in result.output
+    assert result.output.count("matched") >= 2
+
+
+def test_watch_many_changes_only(server, auth, capsys):
+    target = str(server.url).rstrip("/")
+    targets = [target, target.replace("127.0.0.1", "localhost")]
+
+    # json output needs no screen
+    asyncio.run(_watch_many(None, targets, "show hostname", "json", 0.05,
+                            0.3, None, False, "panes", changes_only=True,
+                            auth=auth))
+
+    # polled several times, but each target is shown once
+    lines = capsys.readouterr().out.splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 2
+    assert len({r["target"] for r in records}) == 2
+
+
+def test_shell(runner, server, auth):
+    target = str(server.url)
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1], target,
+                                  "shell"],
+                           input="show hostname\n.encoding json\n"
+                                 "show hostname\n")
+    assert result.exit_code == 0
+    assert "FQDN" in result.output
+    assert '"hostname": "localhost"' in result.output
+
+
+def test_bench(runner, server, auth):
+    target = str(server.url)
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1], target,
+                                  "bench", "-n", "2", "-r", "10", "--json",
+                                  "show hostname"])
+    assert result.exit_code == 0
+    record = json.loads(result.output)
+    assert record["requests"] == 10 and record["errors"] == 0
+
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1], target,
+                                  "bench", "--async", "-d", "0.1"])
+    assert result.exit_code == 0
+    assert "throughput:" in result.output
+
+
+def test_collect(runner, server, auth, tmp_path):
+    target = str(server.url)
+    output = str(tmp_path / "evidence.tar.gz")
+    result = runner.invoke(main, ["-u", auth[0], "-p", auth[1], target,
+                                  "collect", "-o", output, "show hostname",
+                                  "show version"])
+    assert result.exit_code == 0
+    assert "from 1 targets" in result.output
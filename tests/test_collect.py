@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+import tarfile
+
+import httpx
+import pytest
+
+import eapi.collect
+from eapi.sessions import AsyncSession
+from eapi.testing import Device, Emulator
+
+
+def _read(path, mode="r:gz"):
+    with tarfile.open(path, mode) as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+
+
+def test_collect(server, auth, tmp_path):
+    port = server.url.port
+    targets = ["localhost:%d" % port, "127.0.0.1:%d" % port, "localhost:1"]
+    path = str(tmp_path / "evidence.tar.gz")
+
+    results = eapi.collect.collect(
+        targets, ["show hostname", "show version", "show bogus"], path,
+        buffer=1, auth=auth)
+
+    assert set(results) == {"http://localhost:%d" % port,
+                            "http://127.0.0.1:%d" % port,
+                            "http://localhost:1"}
+
+    members = _read(path)
+    assert list(members)[-1] == "manifest.json"
+    assert b"Hostname: localhost" in \
+        members["localhost_%d/show-hostname.txt" % port]
+    assert "127.0.0.1_%d/show-version.txt" % port in members
+
+    manifest = json.loads(members["manifest.json"])
+    assert manifest["commands"] == ["show hostname", "show version",
+                                    "show bogus"]
+    assert manifest["errors"] == 3
+
+    devices = {d["target"]: d for d in manifest["devices"]}
+    local = devices["http://localhost:%d" % port]
+    assert [f["error"] for f in local["files"]][:2] == [None, None]
+    assert local["files"][2]["error"]
+    assert local["elapsed"] > 0
+
+    down = devices["http://localhost:1"]
+    assert down["error"] and down["files"] == []
+
+
+@pytest.mark.asyncio
+async def test_collect_error(tmp_path, monkeypatch):
+    import asyncio
+
+    emulator = Emulator([Device("veos1")] +
+                        [Device("veos%d" % n, latency=5) for n in (2, 3)])
+    path = str(tmp_path / "evidence.tgz")
+
+    def _render(response, encoding):
+        raise KeyError(encoding)
+
+    monkeypatch.setattr(eapi.collect, "_render", _render)
+
+    async with AsyncSession(auth=("admin", ""),
+                            transport=httpx.ASGITransport(app=emulator)) \
+            as sess:
+        with pytest.raises(KeyError):
+            await eapi.collect.acollect(["veos1", "veos2", "veos3"],
+                                        ["show hostname"], path,
+                                        session=sess)
+
+        # the slow collectors were stopped, not left pending
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    assert tarfile.is_tarfile(path)
+
+
+def test_collect_json(server, auth, tmp_path):
+    target = str(server.url)
+    path = str(tmp_path / "evidence.tgz")
+
+    results = eapi.collect.collect([target], ["show hostname"], path,
+                                   encoding="json", auth=auth)
+    assert all(e.ok for e in results.values())
+
+    members = _read(path)
+    name = [n for n in members if n.endswith("show-hostname.json")][0]
+    assert json.loads(members[name])["hostname"] == "localhost"
+
+
+def test_collect_zstd(server, auth, tmp_path):
+    zstandard = pytest.importorskip("zstandard")
+
+    path = str(tmp_path / "evidence.tar.zst")
+    eapi.collect.collect([str(server.url)], ["show hostname"], path,
+                         auth=auth)
+
+    with open(path, "rb") as fh:
+        reader = zstandard.ZstdDecompressor().stream_reader(fh)
+        with tarfile.open(fileobj=reader, mode="r|") as tar:
+            assert "manifest.json" in [m.name for m in tar]
+
+
+def test_compression():
+    with pytest.raises(ValueError):
+        eapi.collect.Archive("out.tar.bz2", compression="bz2")
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import re
+
+import pytest
+
+import eapi
+from eapi.conditions import Condition, Path, Predicate, Regex, \
+    compile_condition, resolve, split_path, where
+from eapi.messages import Response
+
+
+@pytest.fixture()
+def peers():
+    return {
+        "vrfs": {
+            "default": {
+                "peers": {
+                    "10.0.0.1": {"peerState": "Established", "prefixReceived": 10},
+                    "10.0.0.2": {"peerState": "Idle", "prefixReceived": 0}
+                }
+            }
+        },
+        "asns": [65000, 65001]
+    }
+
+
+def test_split_path():
+    assert split_path("a.b.*.c") == ["a", "b", "*", "c"]
+    assert split_path('peers."10.0.0.1".state') == ["peers", "10.0.0.1", "state"]
+    assert split_path("peers.'10.0.0.1'") == ["peers", "10.0.0.1"]
+
+
+def test_resolve(peers):
+    assert resolve(peers, split_path("asns.1")) == [65001]
+    assert resolve(peers, split_path("asns.*")) == [65000, 65001]
+    assert resolve(peers, split_path("asns.5")) == []
+    assert sorted(resolve(peers, split_path("vrfs.*.peers.*.peerState"))) == \
+        ["Established", "Idle"]
+    assert resolve(peers, split_path("bogus.path")) == []
+
+
+def test_where(peers):
+    assert not where('vrfs.default.peers.*.peerState == "Established"').evaluate(peers)
+    assert where('vrfs.default.peers.*.peerState == "Established"',
+                 quantifier="any").evaluate(peers)
+    assert where('vrfs.default.peers."10.0.0.1".prefixReceived > 5').evaluate(peers)
+    assert where("vrfs.default.peers.*.peerState =~ ^(Idle|Estab)").evaluate(peers)
+    assert where("vrfs.default.peers.*.peerState != Active").evaluate(peers)
+    assert where("asns.0 <= 65000").evaluate(peers)
+    assert where("vrfs.default").evaluate(peers)
+    assert not where("vrfs.mgmt").evaluate(peers)
+
+    # incomparable types never match
+    assert not where("vrfs.default.peers.*.peerState > 1").evaluate(peers)
+
+    with pytest.raises(ValueError):
+        Path("a", "~~", 1)
+
+    with pytest.raises(ValueError):
+        Path("a", "==", 1, quantifier="some")
+
+
+def test_compile_condition(json_response):
+    resp = Response.from_rpc_response(*json_response)
+
+    cond = compile_condition("rbf153")
+    assert isinstance(cond, Regex)
+    assert cond(resp)
+
+    assert isinstance(compile_condition(re.compile("nomatch")), Regex)
+    assert not compile_condition(re.compile("nomatch"))(resp)
+
+    cond = compile_condition(lambda r: r.get("hostname") == "rbf153")
+    assert isinstance(cond, Predicate)
+    assert cond(resp)
+
+    cond = where("memTotal > 1000")
+    assert compile_condition(cond) is cond
+    assert cond(resp)
+
+    with pytest.raises(TypeError):
+        compile_condition(42)
+
+    # subclasses must implement matches()
+    with pytest.raises(TypeError):
+        Condition()
+
+
+def test_watch_where(server, auth):
+    target = str(server.url)
+    matches = []
+
+    ticker = eapi.watch(target, "show hostname",
+                        callback=lambda r, m: matches.append(m),
+                        auth=auth, interval=0.1,
+                        condition=where('hostname == "localhost"'))
+    assert ticker.ticks == 1
+    assert matches == [True]
@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import copy
+
+import pytest
+
+from eapi.diff import ADDED, CHANGED, REMOVED, Change, Differ, diff, \
+    digest, fingerprint, hash_tree
+from eapi.messages import JsonResult, Response
+
+
+@pytest.fixture()
+def peers():
+    return {
+        "vrfs": {
+            "default": {
+                "peers": {
+                    "10.0.0.1": {"state": "Established", "prefixes": 10},
+                    "10.0.0.2": {"state": "Idle", "prefixes": 0}
+                }
+            }
+        },
+        "asn": [65000, 65001]
+    }
+
+
+def test_digest(peers):
+    assert digest(peers) == digest(copy.deepcopy(peers))
+    other = copy.deepcopy(peers)
+    other["asn"].append(65002)
+    assert digest(peers) != digest(other)
+
+    # types are part of the digest
+    assert digest(1) != digest(1.0)
+    assert digest(-1) != digest(-2)
+
+
+def test_fingerprint(peers):
+    assert fingerprint(peers) == fingerprint(copy.deepcopy(peers))
+    other = copy.deepcopy(peers)
+    other["vrfs"]["default"]["peers"]["10.0.0.2"]["state"] = "Active"
+    assert fingerprint(peers) != fingerprint(other)
+
+    # results hash like the data they wrap
+    assert fingerprint([JsonResult(peers)]) == fingerprint([peers])
+
+
+def test_hash_tree(peers):
+    tree = hash_tree(peers)
+    assert set(tree.children) == {"vrfs", "asn"}
+    assert len(tree.children["asn"].children) == 2
+    assert tree.children["asn"].children[0].children is None
+
+
+def test_diff_equal(peers):
+    assert diff(peers, copy.deepcopy(peers)) == []
+
+
+def test_diff(peers):
+    new = copy.deepcopy(peers)
+    dpeers = new["vrfs"]["default"]["peers"]
+    dpeers["10.0.0.2"]["state"] = "Established"
+    del dpeers["10.0.0.1"]
+    dpeers["10.0.0.3"] = {"state": "Active", "prefixes": 0}
+    new["asn"].pop()
+
+    changes = diff(peers, new)
+    base = ("vrfs", "default", "peers")
+
+    assert Change(REMOVED, base + ("10.0.0.1",),
+                  old={"state": "Established", "prefixes": 10}) in changes
+    assert Change(CHANGED, base + ("10.0.0.2", "state"),
+                  old="Idle", new="Established") in changes
+    assert Change(ADDED, base + ("10.0.0.3",),
+                  new={"state": "Active", "prefixes": 0}) in changes
+    assert Change(REMOVED, ("asn", 1), old=65001) in changes
+    assert len(changes) == 4
+
+    for change in changes:
+        str(change)
+        change.to_dict()
+
+
+def test_json_result_diff(peers):
+    new = copy.deepcopy(peers)
+    new["asn"][0] = 1
+    changes = JsonResult(new).diff(JsonResult(peers))
+    assert changes == [Change(CHANGED, ("asn", 0), old=65000, new=1)]
+
+
+def test_response_diff(json_response, text_response):
+    target, request, response = json_response
+    old = Response.from_rpc_response(target, request, response)
+
+    response = copy.deepcopy(response)
+    response["result"][1]["memFree"] = 1
+    new = Response.from_rpc_response(target, request, response)
+
+    changes = new.diff(old)
+    assert len(changes) == 1
+    assert changes[0].path == (1, "memFree")
+
+    target, request, response = text_response
+    old = Response.from_rpc_response(target, request, response)
+    response = copy.deepcopy(response)
+    response["result"][0]["output"] = "Hostname: other\n"
+    new = Response.from_rpc_response(target, request, response)
+
+    changes = new.diff(old)
+    assert [c.path for c in changes] == [(0,)]
+
+
+def test_differ(peers):
+    differ = Differ()
+    assert differ.digest is None
+    assert differ.update(peers) == []
+
+    assert differ.update(copy.deepcopy(peers)) == []
+
+    new = copy.deepcopy(peers)
+    new["vrfs"]["default"]["peers"]["10.0.0.2"]["state"] = "Connect"
+    changes = differ.update(new)
+    assert len(changes) == 1
+    assert changes[0].new == "Connect"
+
+    assert differ.digest == digest(new)
+
+    differ.reset()
+    assert differ.update(peers) == []
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+
+import httpx
+import pytest
+
+import eapi
+from eapi.fleet import Fleet, Host
+from eapi.testing import Device, Emulator, fixed
+
+INVENTORY = """
+# lab
+[spines]
+spine1
+spine2 username=ops password=secret
+
+[leaves]
+leaf1
+leaf2 transport=https port=8443
+spine1   # also a leaf
+"""
+
+
+def _emulator():
+    emulator = Emulator([Device("spine1"), Device("spine2", username="ops",
+                                                  password="secret"),
+                         Device("leaf1", latency=fixed(0.05)),
+                         Device("leaf2")])
+    return httpx.ASGITransport(app=emulator)
+
+
+def test_load_text(tmp_path):
+    path = tmp_path / "inventory.txt"
+    path.write_text(INVENTORY)
+
+    fleet = Fleet.load(str(path))
+
+    assert sorted(fleet.hosts) == ["leaf1", "leaf2", "spine1", "spine2"]
+    assert fleet.groups["spines"] == ["spine1", "spine2"]
+    assert sorted(fleet.groups["leaves"]) == ["leaf1", "leaf2", "spine1"]
+    assert fleet.hosts["spine2"].auth == ("ops", "secret")
+    assert fleet.hosts["spine1"].auth is None
+    assert fleet.hosts["leaf2"].target.url == "https://leaf2:8443"
+
+    assert [h.name for h in fleet.select("spines")] == ["spine1", "spine2"]
+    assert [h.name for h in fleet.select("leaf*", "spine2")] == \
+        ["leaf1", "leaf2", "spine2"]
+    assert len(fleet.select()) == 4
+    assert [h.name for h in fleet.select(
+        "leaves", where=lambda h: "spines" not in h.groups)] == \
+        ["leaf1", "leaf2"]
+
+    with pytest.raises(KeyError):
+        fleet.select("borders")
+
+    path.write_text("[spines]\nspine1 user=ops\n")
+    with pytest.raises(ValueError, match="inventory.txt:2"):
+        Fleet.load(str(path))
+
+
+def test_load_json(tmp_path):
+    path = tmp_path / "inventory.json"
+    path.write_text(json.dumps({
+        "defaults": {"transport": "https"},
+        "groups": {"spines": ["spine1", "spine2"], "borders": ["border1"]},
+        "hosts": {"spine2": {"port": 8443, "username": "ops"},
+                  "oob1": {"transport": "http"}}
+    }))
+
+    fleet = Fleet.load(str(path))
+
+    assert sorted(fleet.hosts) == ["border1", "oob1", "spine1", "spine2"]
+    assert fleet.hosts["spine1"].target.url == "https://spine1"
+    assert fleet.hosts["spine2"].target.url == "https://spine2:8443"
+    assert fleet.hosts["oob1"].target.url == "http://oob1"
+    assert fleet.hosts["oob1"].groups == []
+    assert fleet.groups["borders"] == ["border1"]
+
+
+def test_run():
+    hosts = [Host("spine1", ["spines"]),
+             Host("spine2", ["spines"], username="ops", password="secret"),
+             Host("leaf1", ["leaves"]), Host("leaf2", ["leaves"]),
+             Host("border1", ["borders"])]
+
+    with Fleet(hosts, auth=("admin", ""), transport=_emulator()) as fleet:
+        results = fleet.run(["show hostname"], "spines", "leaves")
+
+        assert len(results) == 4 and results.ok
+        assert results["spine2"].response[0].result["hostname"] == "spine2"
+        assert results["http://leaf1"].host.name == "leaf1"
+        # leaf1 is slowest, so it completes last
+        assert [r.host.name for r in results][-1] == "leaf1"
+
+        names = [r.host.name for r in fleet.stream(["show version"],
+                                                   "leaves")]
+        assert sorted(names) == ["leaf1", "leaf2"]
+
+        # stopping early cancels the rest, the fleet is still usable
+        for result in fleet.stream(["show version"], buffer=1):
+            break
+        assert len(fleet.run(["show version"], "leaves")) == 2
+
+        with pytest.raises(ValueError):
+            next(fleet.stream(["show version"], buffer=0))
+
+        # border1 is not emulated
+        results = fleet.run(["show version"], "borders")
+        assert not results.ok
+        assert results["border1"].error is not None
+        assert "error" in results.to_dict()["border1"]
+
+
+@pytest.mark.asyncio
+async def test_arun():
+    hosts = [Host("spine1", ["spines"]), Host("leaf1", ["leaves"])]
+
+    async with Fleet(hosts, auth=("admin", ""), concurrency=1,
+                     transport=_emulator()) as fleet:
+        results = await fleet.arun(["show hostname"], encoding="text")
+        assert "Hostname: spine1" in str(results["spine1"].response[0])
+
+        seen = [r.host.name async for r in fleet.astream(["show version"],
+                                                         "leaves")]
+        assert seen == ["leaf1"]
+
+
+def test_export():
+    assert eapi.Fleet is Fleet
@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import os
+import re
+import subprocess
+import sys
+
+import pytest
+
+import eapi
+
+# cumulative import time budgets in microseconds, override for slow machines
+EAPI_IMPORT_BUDGET = int(os.environ.get("EAPI_IMPORT_BUDGET", 20000))
+EAPI_CLI_IMPORT_BUDGET = int(os.environ.get("EAPI_CLI_IMPORT_BUDGET", 80000))
+
+
+def _python(code: str, *args) -> subprocess.CompletedProcess:
+    return subprocess.run([sys.executable, *args, "-c", code],
+                          stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+
+def _import_time(module: str) -> int:
+    """best cumulative import time of a few runs in microseconds"""
+
+    times = []
+    for _ in range(3):
+        proc = _python("import %s" % module, "-X", "importtime")
+        match = re.search(r"\|\s+(\d+) \| %s$" % re.escape(module),
+                          proc.stderr, re.M)
+        times.append(int(match.group(1)))
+
+    return min(times)
+
+
+@pytest.mark.parametrize("module", ["eapi", "eapi.cli"])
+def test_lazy_imports(module):
+    proc = _python("import sys, %s; print(' '.join(sorted(m for m in "
+                   "('httpx', 'asyncio', 'eapi.sessions', 'eapi.api') "
+                   "if m in sys.modules)))" % module)
+    assert proc.stdout.strip() == ""
+
+
+def test_import_time():
+    assert _import_time("eapi") < EAPI_IMPORT_BUDGET
+    assert _import_time("eapi.cli") < EAPI_CLI_IMPORT_BUDGET
+
+
+def test_exports():
+    import eapi.sessions
+    import eapi.api
+
+    assert eapi.Session is eapi.sessions.Session
+    assert eapi.execute is eapi.api.execute
+    assert "Poller" in dir(eapi)
+    assert eapi.environments.EAPI_DEFAULT_ENCODING
+
+    with pytest.raises(AttributeError):
+        eapi.bogus
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import httpx
+import pytest
+
+from eapi.fleet import Fleet, Host
+from eapi.mapreduce import Count, GroupBy, Reducer, Sum, TopK, \
+    amapreduce, mapreduce
+from eapi.sessions import AsyncSession
+from eapi.testing import Device, Emulator
+
+
+def test_reducers():
+    count = Count()
+    total = Sum()
+    for value in (3, 1, 2):
+        count.add(value)
+        total.add(value)
+    assert count.result == 3 and total.result == 6
+
+    groups = GroupBy(Sum)
+    for pair in (("et", 1), ("po", 2), ("et", 3)):
+        groups.add(pair)
+    assert groups.result == {"et": 4, "po": 2}
+
+    top = TopK(2, key=lambda pair: pair[1])
+    for pair in (("a", 1), ("b", 5), ("c", 3), ("d", 5)):
+        top.add(pair)
+    assert top.result == [("d", 5), ("b", 5)]
+
+    with pytest.raises(ValueError):
+        TopK(0)
+
+    with pytest.raises(TypeError):
+        Reducer()
+
+
+def _fleet():
+    devices = [Device("veos%d" % i,
+                      version="4.24.1F" if i % 4 == 0 else "4.23.2F")
+               for i in range(1, 21)]
+    return Emulator(devices)
+
+
+def _uptime(response):
+    yield response.target.hostname, response[0].result["uptime"]
+
+
+@pytest.mark.asyncio
+async def test_amapreduce():
+    emulator = _fleet()
+    targets = list(emulator.devices) + ["unknown"]
+
+    async with AsyncSession(auth=("admin", ""),
+                            transport=httpx.ASGITransport(app=emulator)) \
+            as sess:
+        reduction = await amapreduce(
+            targets, ["show version"],
+            lambda r: (r[0].result["version"], None), GroupBy(Count),
+            concurrency=5, session=sess)
+
+        assert reduction.result == {"4.23.2F": 15, "4.24.1F": 5}
+        assert reduction.responses == 20
+        assert reduction.error_count == 1
+
+        top = await amapreduce(targets[:20], ["show version"], _uptime,
+                               TopK(3, key=lambda pair: pair[1]),
+                               session=sess)
+        assert len(top.result) == 3
+
+        # responses with an error code are counted, not mapped
+        skipped = await amapreduce(targets[:3], ["show bogus"],
+                                   lambda r: 1, Sum(), session=sess)
+        assert skipped.result == 0 and skipped.error_count == 3
+        assert skipped.to_dict()["errors"] == 3
+
+
+@pytest.mark.asyncio
+async def test_amapreduce_raises():
+    # a body that cannot be decoded is not a device error
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b"<html>oops</html>"))
+
+    async with AsyncSession(transport=transport) as sess:
+        with pytest.raises(ValueError):
+            await amapreduce(["veos1", "veos2"], ["show version"],
+                             lambda r: 1, Sum(), session=sess)
+
+
+def test_mapreduce(server, auth):
+    reduction = mapreduce([str(server.url)] * 5, ["show hostname"],
+                          lambda r: None, Count(), auth=auth)
+    assert reduction.result == 0 and reduction.responses == 5
+
+
+def test_fleet_mapreduce():
+    emulator = _fleet()
+    hosts = [Host(name, ["odd" if int(name[4:]) % 2 else "even"])
+             for name in emulator.devices]
+
+    with Fleet(hosts, auth=("admin", ""),
+               transport=httpx.ASGITransport(app=emulator)) as fleet:
+        reduction = fleet.mapreduce(["show version"], lambda r: 1, Sum(),
+                                    "even")
+
+    assert reduction.result == 10
@@ -2,9 +2,13 @@
 # Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+import copy
+import json
+
 import pytest
 
-from eapi.messages import Response, ResponseElem, Target, TextResult, JsonResult
+from eapi.messages import PreparedRequest, Response, ResponseElem, Target, \
+    TextResult, JsonResult
 
 def test_text_result(text_response):
     r = TextResult(text_response[-1]["result"][1]["output"])
@@ -99,3 +103,34 @@ def test_target(target, starget):
     with pytest.raises(ValueError):
         Target("host", transport="http", port=600000)
 
+
+def test_prepared_request():
+    prepared = PreparedRequest(["show hostname", {"cmd": "enable", "input": ""}],
+                               encoding="text")
+
+    assert prepared.encoding == "text"
+    assert prepared.commands[0] == {"cmd": "show hostname", "input": ""}
+    assert "id" not in prepared.request
+
+    first = json.loads(prepared.body())
+    second = json.loads(prepared.body())
+    assert first["id"] != second["id"]
+    assert first["params"] == second["params"] == prepared.request["params"]
+    assert first["method"] == "runCmds"
+
+    assert json.loads(prepared.body("abc"))["id"] == "abc"
+
+
+def test_digest(json_response, text_response):
+    resp = Response.from_rpc_response(*json_response)
+    again = Response.from_rpc_response(*json_response)
+    assert resp.digest == again.digest
+    assert resp[0].digest != resp[1].digest
+
+    target, request, response = json_response
+    response = copy.deepcopy(response)
+    response["result"][1]["memFree"] = 1
+    assert Response.from_rpc_response(target, request, response).digest != resp.digest
+
+    text = Response.from_rpc_response(*text_response)
+    assert text.digest != resp.digest
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import httpx
+import pytest
+
+import eapi
+from eapi.exceptions import EapiError
+from eapi.metrics import Histogram, Registry, Timings
+
+
+def test_histogram():
+    hist = Histogram([0.1, 1.0])
+    for value in (0.05, 0.5, 0.7, 5.0):
+        hist.observe(value)
+
+    assert hist.count == 4
+    assert hist.sum == pytest.approx(6.25)
+    assert hist.cumulative() == [(0.1, 1), (1.0, 3), (float("inf"), 4)]
+
+
+def test_timings_trace():
+    timings = Timings()
+    for name in ("connection.connect_tcp.started",
+                 "connection.connect_tcp.complete",
+                 "http11.send_request_headers.started",
+                 "http11.send_request_headers.complete",
+                 "http11.receive_response_headers.started",
+                 "http11.receive_response_headers.complete",
+                 "http11.response_closed.started"):
+        timings.trace(name, {})
+    timings.finish()
+
+    assert timings.connected
+    assert set(timings.to_dict()) == {"queue", "connect", "send", "wait",
+                                      "total"}
+    assert timings["tls"] == 0.0
+
+
+def test_session_timings(server, auth):
+    target = str(server.url)
+    registry = Registry()
+    traced = []
+
+    with eapi.Session(auth=auth, metrics=registry) as sess:
+        first = sess.call(target, ["show version"])
+        second = sess.call(target, ["show bogus"], extensions={
+            "trace": lambda name, info: traced.append(name)})
+
+        with pytest.raises(EapiError):
+            sess.call("localhost:1", ["show version"])
+
+    # the connection is reused for the second request
+    assert first.timings.connected and not second.timings.connected
+    for phase in ("queue", "connect", "send", "wait", "receive", "decode"):
+        assert first.timings[phase] > 0
+    assert first.timings.total >= sum(first.timings.phases.values())
+
+    # a caller supplied trace callback still gets the events
+    assert "http11.receive_response_headers.complete" in traced
+
+    stats = registry.to_dict()
+    assert stats[target.rstrip("/")]["requests"] == 2
+    assert stats[target.rstrip("/")]["errors"] == 1
+    assert stats[target.rstrip("/")]["connections"] == 1
+    assert stats["http://localhost:1"]["errors"] == 1
+
+
+def test_decode_error_metrics():
+    registry = Registry()
+    transport = httpx.MockTransport(
+        lambda request: httpx.Response(200, content=b"<html>oops</html>"))
+
+    with eapi.Session(metrics=registry, transport=transport) as sess:
+        with pytest.raises(ValueError):
+            sess.call("veos1", ["show version"])
+
+    assert registry.to_dict()["http://veos1"]["errors"] == 1
+
+
+@pytest.mark.asyncio
+async def test_async_session_timings(server, auth):
+    target = str(server.url)
+    registry = Registry()
+
+    async with eapi.AsyncSession(auth=auth, metrics=registry) as sess:
+        response = await sess.call(target, ["show version"])
+
+    assert response.timings.connected
+    assert response.timings["wait"] > 0
+    assert registry.to_dict()[target.rstrip("/")]["requests"] == 1
+
+
+def test_export(server, auth):
+    registry = Registry(buckets=[0.5, 30.0])
+
+    with eapi.Session(auth=auth, metrics=registry) as sess:
+        sess.call(str(server.url), ["show version"])
+
+    text = registry.export()
+    key = str(server.url).rstrip("/")
+
+    assert '# TYPE eapi_requests_total counter' in text
+    assert 'eapi_requests_total{target="%s"} 1' % key in text
+    assert 'eapi_request_duration_seconds_bucket{le="30.0",target="%s"} 1' \
+        % key in text
+    assert 'eapi_request_duration_seconds_bucket{le="+Inf",target="%s"} 1' \
+        % key in text
+    assert 'eapi_request_phase_duration_seconds_count{target="%s",' \
+        'phase="decode"} 1' % key in text
+
+    registry.reset()
+    assert "eapi_requests_total{" not in registry.export()
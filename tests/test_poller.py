@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+
+import pytest
+
+import eapi
+from eapi.poller import Job, PollResult
+
+
+@pytest.mark.asyncio
+async def test_poller_callback(server, auth):
+    target = str(server.url)
+    results = []
+
+    poller = eapi.Poller(auth=auth, callback=results.append, jitter=0.5)
+    clock = poller.add([target] * 3, ["show clock"], interval=0.1)
+    hostname = poller.add([target], ["show hostname"], interval=0.2,
+                          encoding="text")
+
+    await poller.run(duration=0.55)
+
+    assert all(isinstance(r, PollResult) for r in results)
+    assert all(r.error is None for r in results)
+    assert clock.runs >= 9
+    assert hostname.runs >= 2
+    # polls cancelled by stop() are counted but not delivered
+    assert 0 < len(results) <= clock.runs + hostname.runs
+
+    stats = poller.stats()
+    assert stats[0]["name"] == "show clock"
+    assert stats[0]["targets"] == 3
+
+
+@pytest.mark.asyncio
+async def test_poller_iter(server, auth):
+    target = str(server.url)
+
+    async with eapi.AsyncSession(auth=auth) as sess:
+        poller = eapi.Poller(session=sess, jitter=0)
+        poller.add([target], ["show hostname"], interval=0.05)
+
+        count = 0
+        async with poller:
+            async for result in poller:
+                assert result.response[0].result["hostname"] == "localhost"
+                count += 1
+                if count == 3:
+                    break
+
+        assert not poller._running
+
+
+@pytest.mark.asyncio
+async def test_poller_backpressure(server, auth):
+    target = str(server.url)
+
+    poller = eapi.Poller(auth=auth, jitter=0, max_pending=1)
+    job = poller.add([target], ["show clock"], interval=0.05)
+
+    async with poller:
+        async for result in poller:
+            # a slow consumer holds polling back, cycles are skipped not queued
+            await asyncio.sleep(0.3)
+            if job.runs >= 5:
+                break
+
+    assert job.skipped > 0
+
+
+@pytest.mark.asyncio
+async def test_poller_errors(auth):
+    results = []
+
+    async def _cb(result):
+        results.append(result)
+
+    poller = eapi.Poller(auth=auth, callback=_cb, jitter=0)
+    job = poller.add(["localhost:1"], ["show clock"], interval=0.1)
+    await poller.run(duration=0.15)
+
+    assert job.errors == len(results) > 0
+    assert isinstance(results[0].error, eapi.exceptions.EapiError)
+
+
+@pytest.mark.asyncio
+async def test_poller_callback_error(server, auth):
+    target = str(server.url)
+    results = []
+
+    def _cb(result):
+        results.append(result)
+        if len(results) == 2:
+            raise RuntimeError("callback failed")
+
+    poller = eapi.Poller(auth=auth, callback=_cb, jitter=0)
+    poller.add([target] * 2, ["show clock"], interval=0.05)
+
+    # no duration, the failure must end the run rather than hang it
+    with pytest.raises(RuntimeError, match="callback failed"):
+        await asyncio.wait_for(poller.run(), timeout=5)
+
+    assert not poller._running
+    assert poller._tasks == []
+
+
+def test_job():
+    job = Job(["veos1", "veos2"], ["show clock", "show version"], 10)
+    assert job.name == "show clock, show version"
+    assert job.mean_lateness == 0.0
+
+    with pytest.raises(ValueError):
+        eapi.Poller().add(["veos1"], ["show clock"], interval=0)
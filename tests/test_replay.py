@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import gzip
+import json
+import time
+
+import httpx
+import pytest
+
+import eapi
+from eapi.exceptions import EapiError
+from eapi.replay import RecordingTransport, ReplayTransport, Store, \
+    normalize
+
+
+def test_normalize():
+    assert normalize(["show  version "]) == normalize(["show version"])
+    assert normalize([{"cmd": "enable", "input": "x"}]) == \
+        normalize([{"input": "x", "cmd": " enable"}])
+    assert normalize(["show version"]) != normalize(["show clock"])
+
+
+@pytest.fixture
+def recording(server, auth, tmp_path):
+    path = str(tmp_path / "recording.ndjson.gz")
+    target = str(server.url).rstrip("/")
+
+    transport = RecordingTransport(path)
+    with eapi.Session(auth=auth, transport=transport) as sess:
+        sess.login(target, auth)
+        sess.call(target, ["show hostname", "show version"])
+        sess.call(target, ["show version"], encoding="text")
+        sess.call(target, ["show clock"], encoding="text")
+        sess.call(target, ["show clock"], encoding="text")
+
+    return path, target
+
+
+def test_record(recording):
+    path, target = recording
+
+    with gzip.open(path, "rt") as fh:
+        entries = [json.loads(line) for line in fh]
+
+    # logins are not recorded
+    assert len(entries) == 4
+    assert entries[0]["target"] == target.split("//")[1]
+    assert entries[1]["format"] == "text"
+    assert all(e["status"] == 200 and e["elapsed"] > 0 for e in entries)
+
+    assert len(Store(path)) == 4
+
+
+def test_replay(recording):
+    path, target = recording
+
+    transport = ReplayTransport(path)
+    with eapi.Session(auth=("nobody", ""), transport=transport) as sess:
+        sess.login(target, ("nobody", ""))
+        assert sess.logged_in(target)
+
+        response = sess.call(target, ["show  hostname", "show version"])
+        assert response.code == 0
+        assert response[0].result["hostname"] == "localhost"
+
+        prepared = eapi.PreparedRequest(["show version"], "text")
+        assert "Arista" in str(sess.call(target, prepared)[0])
+
+        # repeated recordings replay in order, then start over
+        clocks = [str(sess.call(target, ["show clock"], "text")[0])
+                  for _ in range(3)]
+        assert clocks[0] == clocks[2]
+
+        with pytest.raises(EapiError, match="no recording"):
+            sess.call(target, ["show version"], encoding="json")
+
+
+def test_replay_id(recording):
+    path, target = recording
+
+    transport = ReplayTransport(path)
+    request = eapi.PreparedRequest(["show version"], "text")
+    body = request.body("replayed-1")
+
+    with httpx.Client(transport=transport) as client:
+        resp = client.post(target + "/command-api", content=body)
+
+    assert resp.json()["id"] == "replayed-1"
+
+
+def test_replay_int_id(recording):
+    path, target = recording
+
+    # an int id also appears in "2.0" and in results, only the id changes
+    store = Store()
+    for entries in Store(path).entries.values():
+        for entry in entries:
+            message = json.loads(entry["body"])
+            message["id"] = 2
+            message["result"] = [{"value": 2}]
+            store.add(dict(entry, id=2, body=json.dumps(message)))
+
+    request = eapi.PreparedRequest(["show version"], "text")
+    with httpx.Client(transport=ReplayTransport(store)) as client:
+        resp = client.post(target + "/command-api", content=request.body(7))
+
+    assert resp.json() == {"jsonrpc": "2.0", "id": 7,
+                           "result": [{"value": 2}]}
+
+
+def test_replay_layout(recording):
+    path, target = recording
+
+    request = eapi.PreparedRequest(["show version"], "text")
+    bodies = [
+        # patched in place, escapes and ids in results are left alone
+        ('{"jsonrpc": "2.0", "id": "a\\"1", "result": [{"id": 1}]}',
+         '{"jsonrpc": "2.0", "id": 7, "result": [{"id": 1}]}'),
+        # other layouts are decoded instead
+        ('{"result": [{"id": 1}], "jsonrpc": "2.0", "id": 3}',
+         '{"result": [{"id": 1}], "jsonrpc": "2.0", "id": 7}')
+    ]
+
+    for recorded, replayed in bodies:
+        store = Store()
+        for entries in Store(path).entries.values():
+            for entry in entries:
+                store.add(dict(entry, body=recorded))
+
+        with httpx.Client(transport=ReplayTransport(store)) as client:
+            resp = client.post(target + "/command-api",
+                               content=request.body(7))
+
+        assert resp.text == replayed
+
+
+@pytest.mark.asyncio
+async def test_replay_async(recording):
+    path, target = recording
+
+    store = Store(path)
+    elapsed = sum(e["elapsed"] for entries in store.entries.values()
+                  for e in entries if "clock" in e["commands"])
+
+    transport = ReplayTransport(store, speed=0.5)
+    async with eapi.AsyncSession(transport=transport) as sess:
+        start = time.perf_counter()
+        await sess.call(target, ["show clock"], encoding="text")
+        await sess.call(target, ["show clock"], encoding="text")
+        assert time.perf_counter() - start >= elapsed * 2
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import pytest
+
+from eapi.conditions import where
+from eapi.rollout import Rollout, plan_waves, rollout
+
+
+def test_plan_waves():
+    assert [len(w) for w in plan_waves(range(100), (1, 0.1, 0.5))] == \
+        [1, 9, 40, 50]
+    assert [len(w) for w in plan_waves(range(100))] == [1, 9, 40, 50]
+    assert [len(w) for w in plan_waves(range(3), (1, 0.1, 5))] == [1, 2]
+    assert plan_waves([], (1, 0.5)) == []
+
+    with pytest.raises(ValueError):
+        plan_waves(range(10), (0,))
+
+    with pytest.raises(ValueError):
+        plan_waves(range(10), (1.5,))
+
+
+@pytest.mark.asyncio
+async def test_rollout(server, auth):
+    targets = [str(server.url)] * 6
+    seen = []
+
+    result = await Rollout(targets, ["ntp server 10.0.0.1"], waves=(1, 0.5),
+                           verify_command="show hostname",
+                           condition=where('hostname == "localhost"'),
+                           on_wave=seen.append, auth=auth).run()
+
+    assert result.ok
+    assert [len(w.targets) for w in result.waves] == [1, 2, 3]
+    assert all(len(w.succeeded) == len(w.targets) for w in result.waves)
+    assert all(w.throughput > 0 for w in result.waves)
+    assert len(seen) == 3
+    result.to_dict()
+
+
+@pytest.mark.asyncio
+async def test_rollout_halt(server, auth):
+    good = str(server.url)
+    targets = [good, "localhost:1", good, good, good]
+
+    result = await Rollout(targets, ["ntp server 10.0.0.1"], waves=(1, 2),
+                           auth=auth).run()
+
+    assert result.halted
+    assert len(result.waves) == 2
+    assert [str(t) for t, _ in result.waves[1].failed] == \
+        ["http://localhost:1"]
+    assert len(result.pending) == 2
+
+    # tolerate failures up to half of a wave
+    result = await Rollout(targets, ["ntp server 10.0.0.1"], waves=(1, 2),
+                           max_failures=0.5, auth=auth).run()
+    assert result.ok
+
+
+def test_rollout_verify_failed(server, auth):
+    targets = [str(server.url)] * 4
+
+    result = rollout(targets, ["ntp server 10.0.0.1"],
+                     verify_command="show hostname",
+                     condition=where('hostname == "other"'), auth=auth)
+    assert result.halted
+    assert len(result.waves) == 1
+    assert [r for _, r in result.waves[0].failed] == \
+        ["verification failed"]
+
+    result = rollout(targets, ["bogus command"], auth=auth)
+    assert result.halted
+    assert "configure failed" in result.waves[0].failed[0][1]
+
+    # every entry of a repeated target counts against max_failures
+    result = rollout(targets, ["bogus command"], waves=(4,), max_failures=3,
+                     auth=auth)
+    assert result.halted
+    assert len(result.waves[0].failed) == 4
+    assert result.to_dict()["waves"][0]["failed"][0]["reason"].startswith(
+        "configure failed")
+
+    result = rollout(targets, ["ntp server 10.0.0.1"], auth=auth,
+                     on_wave=lambda w: False)
+    assert result.reason == "wave 0: halted by on_wave"
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from eapi.scheduler import AsyncScheduler, Scheduler
+from eapi.sessions import AsyncSession, Session
+from eapi.testing import Device, Emulator
+
+
+async def _serve(scheduler, priority, order):
+    await scheduler.acquire(priority)
+    order.append(priority)
+    scheduler.release()
+
+
+@pytest.mark.asyncio
+async def test_priority_order():
+    scheduler = AsyncScheduler(limit=1, aging=0)
+    order = []
+
+    await scheduler.acquire("normal")
+    tasks = [asyncio.ensure_future(_serve(scheduler, p, order))
+             for p in ("bulk", "bulk", "normal", "interactive")]
+    await asyncio.sleep(0)
+    assert scheduler.waiting == 4
+
+    scheduler.release()
+    await asyncio.gather(*tasks)
+
+    assert order == ["interactive", "normal", "bulk", "bulk"]
+    assert scheduler.inflight == 0
+
+    stats = scheduler.stats()
+    assert stats["bulk"]["requests"] == 2 and stats["bulk"]["queued"] == 2
+    assert stats["normal"]["requests"] == 2 and stats["normal"]["queued"] == 1
+    assert stats["interactive"]["max_wait"] >= 0.0
+
+    with pytest.raises(ValueError):
+        await scheduler.acquire("urgent")
+
+
+@pytest.mark.asyncio
+async def test_aging():
+    scheduler = AsyncScheduler(limit=1, aging=0.05)
+    order = []
+
+    await scheduler.acquire("bulk")
+    bulk = asyncio.ensure_future(_serve(scheduler, "bulk", order))
+    await asyncio.sleep(0.2)
+    interactive = asyncio.ensure_future(_serve(scheduler, "interactive",
+                                               order))
+    await asyncio.sleep(0)
+
+    # waited long enough to overtake the newer interactive request
+    scheduler.release()
+    await asyncio.gather(bulk, interactive)
+    assert order == ["bulk", "interactive"]
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter():
+    scheduler = AsyncScheduler(limit=1)
+    order = []
+
+    await scheduler.acquire()
+    cancelled = asyncio.ensure_future(_serve(scheduler, "interactive", order))
+    waiting = asyncio.ensure_future(_serve(scheduler, "bulk", order))
+    await asyncio.sleep(0)
+
+    cancelled.cancel()
+    scheduler.release()
+    await waiting
+
+    assert order == ["bulk"]
+    assert scheduler.inflight == 0 and scheduler.waiting == 0
+
+
+def test_threads():
+    scheduler = Scheduler(limit=2)
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def _work(priority):
+        scheduler.acquire(priority)
+        with lock:
+            active.append(priority)
+            peak.append(len(active))
+        time.sleep(0.01)
+        with lock:
+            active.remove(priority)
+        scheduler.release()
+
+    threads = [threading.Thread(target=_work,
+                                args=(("interactive", "bulk")[i % 2],))
+               for i in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) <= 2
+    assert scheduler.inflight == 0
+    stats = scheduler.stats()
+    assert stats["interactive"]["requests"] == 5
+    assert stats["bulk"]["requests"] == 5
+
+
+@pytest.mark.asyncio
+async def test_async_session_priority():
+    emulator = Emulator([Device("veos1", latency=0.01)])
+    scheduler = AsyncScheduler(limit=2)
+
+    async with AsyncSession(auth=("admin", ""), scheduler=scheduler,
+                            transport=httpx.ASGITransport(app=emulator)) \
+            as sess:
+        bulk = [sess.call("veos1", ["show version"], priority="bulk")
+                for _ in range(10)]
+        responses = await asyncio.gather(
+            *bulk, sess.call("veos1", ["show version"],
+                             priority="interactive"))
+
+    assert all(r.code == 0 for r in responses)
+    stats = scheduler.stats()
+    assert stats["bulk"]["requests"] == 10
+    assert stats["interactive"]["requests"] == 1
+    assert stats["bulk"]["queued"] >= 8
+    # queued behind at most the two requests already in flight
+    assert stats["interactive"]["max_wait"] <= stats["bulk"]["max_wait"]
+    assert scheduler.inflight == 0
+
+
+def test_session_priority(server, auth):
+    scheduler = Scheduler(limit=1)
+
+    with Session(auth=auth, scheduler=scheduler) as sess:
+        response = sess.call(str(server.url), ["show version"],
+                             priority="interactive")
+
+    assert response.code == 0
+    assert scheduler.stats()["interactive"]["requests"] == 1
+    assert scheduler.inflight == 0
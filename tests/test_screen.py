@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import io
+
+from eapi.screen import CLEAR, Screen, fit, panes, table
+
+
+def test_fit():
+    assert fit("abc", 5) == "abc  "
+    assert fit("abcdef", 3) == "abc"
+    assert fit("a", 3, "-") == "a--"
+
+
+def test_screen_redraws_changed_lines(monkeypatch):
+    monkeypatch.setenv("COLUMNS", "80")
+    monkeypatch.setenv("LINES", "24")
+
+    stream = io.StringIO()
+    view = Screen(stream)
+
+    assert view.draw(["header", "", "10:00:00", "Timezone: UTC"]) == 4
+    assert CLEAR in stream.getvalue()
+
+    stream.truncate(0)
+    stream.seek(0)
+    assert view.draw(["header", "", "10:00:02", "Timezone: UTC"]) == 1
+    output = stream.getvalue()
+    assert CLEAR not in output
+    assert "10:00:02" in output and "header" not in output
+
+    # a shorter frame clears what is left below it
+    stream.truncate(0)
+    stream.seek(0)
+    assert view.draw(["header"]) == 0
+    assert "\x1b[J" in stream.getvalue()
+
+    view.close()
+    assert stream.getvalue().endswith("\x1b[?25h")
+
+
+def test_screen_clips_to_terminal(monkeypatch):
+    monkeypatch.setenv("COLUMNS", "10")
+    monkeypatch.setenv("LINES", "3")
+
+    stream = io.StringIO()
+    Screen(stream).draw(["x" * 20, "second", "third"])
+
+    output = stream.getvalue()
+    assert "x" * 10 in output and "x" * 11 not in output
+    assert "third" not in output
+
+
+def test_panes():
+    lines = panes([("veos1", ["a", "b"]), ("veos2", ["c"]),
+                   ("veos3", ["d"])], width=100, columns=2)
+
+    assert lines[0].startswith("── veos1 ─")
+    assert "│ ── veos2 ─" in lines[0]
+    assert lines[1].startswith("a ") and lines[1].endswith("│ c")
+    assert lines[2] == "b"
+    assert lines[3] == ""
+    assert lines[4].startswith("── veos3 ─")
+    assert all(len(line) <= 100 for line in lines)
+
+    # panes stack when the terminal is narrow
+    assert len(panes([("a", []), ("b", [])], width=60)) == 3
+
+
+def test_table():
+    lines = table(["TARGET", "STATUS", "OUTPUT"],
+                  [("veos1", "3ms", "line 1\nline 2"),
+                   ("veos22", "error", "% refused")], width=40)
+
+    assert lines == [
+        "TARGET  STATUS  OUTPUT",
+        "veos1   3ms     line 1",
+        "                line 2",
+        "veos22  error   % refused",
+    ]
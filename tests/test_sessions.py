@@ -1,5 +1,8 @@
 import asyncio
 import json
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
 
 from sys import version
 
@@ -35,6 +38,17 @@ def test_call(session, server, auth):
     session.call(target, ["show hostname"])
 
 
+def test_call_prepared(session, server):
+    target = str(server.url)
+    prepared = eapi.PreparedRequest(["show hostname", "show version"],
+                                    encoding="text")
+
+    for _ in range(2):
+        resp = session.call(target, prepared)
+        assert resp.code == 0
+        assert "FQDN" in resp
+
+
 def test_http_error(session, server):
     target = str(server.url)
     t = Target.from_string(target)
@@ -124,3 +138,136 @@ async def test_async(server, auth):
         responses = await asyncio.gather(*tasks)
 
         assert len(responses) == 36
+
+
+@pytest.mark.asyncio
+async def test_async_prepared(server, auth):
+    target = str(server.url)
+    prepared = eapi.PreparedRequest(["show hostname"])
+
+    async with AsyncSession(auth=auth) as sess:
+        responses = await asyncio.gather(
+            *[sess.call(target, prepared) for _ in range(8)])
+
+    for resp in responses:
+        assert resp[0].result["hostname"] == "localhost"
+
+
+def _only_first(response):
+    # module level, so it can be pickled to a worker process
+    response.elements = response.elements[:1]
+    return response
+
+
+@pytest.mark.asyncio
+async def test_async_offload(server, auth):
+    target = str(server.url)
+    threads = []
+
+    def _record_thread(response):
+        threads.append(threading.get_ident())
+        return response
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        async with AsyncSession(auth=auth, offload_threshold=4096,
+                                executor=executor) as sess:
+            small = await sess.call(target, ["show hostname"],
+                                    postprocess=_record_thread)
+            large = await sess.call(target, ["show payload 65536"],
+                                    postprocess=_record_thread)
+
+    assert small[0].result["hostname"] == "localhost"
+    assert len(large[0].result["interfaces"]) > 0
+    assert "decode" in large.timings.phases
+    assert threads[0] == threading.get_ident()
+    assert threads[1] != threading.get_ident()
+
+    # the session's own process pool
+    async with AsyncSession(auth=auth, offload_threshold=0) as sess:
+        resp = await sess.call(target, ["show hostname", "show version"],
+                               postprocess=_only_first)
+
+    assert len(resp) == 1
+    assert resp[0].result["hostname"] == "localhost"
+
+
+class RecordingTracer(eapi.sessions.Tracer):
+    def __init__(self):
+        self.spans = []
+        self.depth = 0
+
+    def start_span(self, name, attributes):
+        span = {"name": name, "depth": self.depth, "start": dict(attributes)}
+        self.depth += 1
+        return span
+
+    def end_span(self, span, attributes, error=None):
+        self.depth -= 1
+        span["end"] = dict(attributes)
+        span["error"] = error
+        self.spans.append(span)
+
+
+def test_tracer(server, auth):
+    target = str(server.url)
+    tracer = RecordingTracer()
+
+    with Session(auth=auth, tracer=tracer) as sess:
+        sess.login(target, auth=auth)
+        sess.call(target, ["show hostname", "show bogus"])
+
+        with pytest.raises(eapi.exceptions.EapiError):
+            sess.call("localhost:1", ["show hostname"])
+
+    names = [(s["name"], s["depth"]) for s in tracer.spans]
+    assert names == [("eapi.http", 1), ("eapi.login", 0),
+                     ("eapi.http", 1), ("eapi.decode", 1), ("eapi.call", 0),
+                     ("eapi.http", 1), ("eapi.call", 0)]
+
+    http, decode, call = tracer.spans[2:5]
+    assert call["start"] == {"eapi.target": target.rstrip("/"),
+                             "eapi.command_count": 2,
+                             "eapi.encoding": "json"}
+    assert call["end"] == {"eapi.error_code": 1002}
+    assert http["start"]["http.request_content_length"] > 0
+    assert http["end"]["http.status_code"] == 200
+    assert http["end"]["http.response_content_length"] == \
+        decode["start"]["http.response_content_length"]
+
+    failed = tracer.spans[-1]
+    assert isinstance(failed["error"], eapi.exceptions.EapiError)
+
+
+@pytest.mark.asyncio
+async def test_async_tracer(server, auth):
+    tracer = RecordingTracer()
+
+    async with AsyncSession(auth=auth, tracer=tracer) as sess:
+        await sess.login(str(server.url), auth=auth)
+        await sess.call(str(server.url), ["show hostname"])
+
+    assert [s["name"] for s in tracer.spans] == [
+        "eapi.http", "eapi.login", "eapi.http", "eapi.decode", "eapi.call"]
+
+
+def test_opentelemetry_tracer(server, auth):
+    pytest.importorskip("opentelemetry.sdk")
+
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import SimpleSpanProcessor
+    from opentelemetry.sdk.trace.export.in_memory_span_exporter import \
+        InMemorySpanExporter
+
+    exporter = InMemorySpanExporter()
+    provider = TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracer = eapi.sessions.OpenTelemetryTracer(provider.get_tracer("test"))
+
+    with Session(auth=auth, tracer=tracer) as sess:
+        sess.call(str(server.url), ["show hostname"])
+
+    spans = {s.name: s for s in exporter.get_finished_spans()}
+    assert set(spans) == {"eapi.call", "eapi.http", "eapi.decode"}
+    assert spans["eapi.http"].parent.span_id == \
+        spans["eapi.call"].context.span_id
+    assert spans["eapi.call"].attributes["eapi.error_code"] == 0
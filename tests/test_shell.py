@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import io
+import json
+
+import pytest
+
+import eapi
+from eapi.shell import Shell
+
+from tests import server as emulator
+
+
+def _run(target, session, script, **kwargs):
+    stdout = io.StringIO()
+    shell = Shell(target, session, stdin=io.StringIO(script), stdout=stdout,
+                  history_file=None, **kwargs)
+    shell.cmdloop(intro="")
+    return shell, stdout.getvalue()
+
+
+def test_shell(server, auth):
+    target = str(server.url)
+
+    with eapi.Session(auth=auth) as sess:
+        sess.login(target, auth)
+        shell, output = _run(target, sess,
+                             "show hostname\n\n.encoding\nshow hostname\n")
+
+    assert shell.encoding == "json"
+    assert "FQDN:" in output
+    assert json.loads(output[output.index("{"):output.rindex("}") + 1]) == \
+        {"hostname": "localhost", "fqdn": "localhost.localdomain"}
+    assert output.count(" ms]") == 2
+
+
+def test_shell_configure(server, auth):
+    target = str(server.url)
+    script = ("configure\n"
+              "interface Ethernet1\n"
+              "   description uplink\n"
+              "end\n"
+              "conf t\n"
+              "hostname discarded\n"
+              ".cancel\n"
+              ".timing off\n"
+              "show bogus\n")
+
+    del emulator.CONFIG_LOG[:]
+    with eapi.Session(auth=auth) as sess:
+        shell, output = _run(target, sess, script)
+
+    assert emulator.CONFIG_LOG == ["interface Ethernet1",
+                                   "   description uplink"]
+    assert output.count(" ms]") == 1
+    assert "% Invalid input (at token 1: 'bogus')" in output
+    assert "% CLI command" in output
+    assert "(config)#" in output
+
+
+def test_shell_meta(server, auth):
+    with eapi.Session(auth=auth) as sess:
+        shell, output = _run(str(server.url), sess,
+                             ".encoding yaml\n.encoding json\n.bogus\n"
+                             ".quit\nshow hostname\n")
+
+    assert shell.encoding == "json"
+    assert "% encoding must be" in output
+    assert "% unknown shell command: .bogus" in output
+    assert "FQDN" not in output
+
+    with pytest.raises(ValueError):
+        Shell(str(server.url), sess, encoding="yaml")
+
+
+def test_shell_unreachable():
+    with eapi.Session() as sess:
+        _, output = _run("localhost:1", sess, "show hostname\n")
+    assert "localhost# % " in output
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from eapi.exceptions import EapiError
+from eapi.messages import Response, Target
+from eapi.poller import Job, PollResult
+from eapi.sink import SqliteSink
+from eapi.util import prepare_request
+
+
+def _response(hostname, version="4.23.2F"):
+    request = prepare_request(["show version", "show hostname"])
+    return Response.from_rpc_response(
+        Target.from_string(hostname), request,
+        {"result": [{"version": version, "interfaces": {"a": 1, "b": 2}},
+                    {"hostname": hostname}]})
+
+
+def _rows(path, query="SELECT * FROM responses ORDER BY id"):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        return [dict(row) for row in conn.execute(query)]
+    finally:
+        conn.close()
+
+
+def test_sink(tmp_path):
+    path = str(tmp_path / "polls.db")
+
+    with SqliteSink(path, batch_size=7, flush_interval=5,
+                    fields={"version": "version",
+                            "counts": "interfaces.*"}) as sink:
+        for i in range(50):
+            sink.write(_response("veos%d" % i), timestamp=1000.0 + i)
+
+        job = Job(["veos99"], ["show version"], 5)
+        sink(PollResult(job, Target.from_string("veos99"),
+                        error=EapiError("timed out")))
+
+        sink.flush()
+        assert sink.written == 101
+        # 51 responses, in full batches of 7 and the rest on flush()
+        assert sink.batches == 8
+
+    rows = _rows(path)
+    assert len(rows) == 101
+
+    first = rows[0]
+    assert first["target"] == "http://veos0"
+    assert first["command"] == "show version"
+    assert first["timestamp"] == 1000.0 and first["code"] == 0
+    assert first["version"] == "4.23.2F"
+    assert json.loads(first["counts"]) == [1, 2]
+    assert json.loads(first["result"])["version"] == "4.23.2F"
+    assert rows[1]["version"] is None
+
+    assert rows[-1]["error"] == "timed out"
+    assert rows[-1]["command"] is None
+
+
+def test_flush_interval(tmp_path):
+    path = str(tmp_path / "polls.db")
+
+    with SqliteSink(path, flush_interval=0.3) as sink:
+        for i in range(3):
+            sink.write(_response("veos%d" % i))
+            time.sleep(0.01)
+
+        # a light trickle of rows still goes in one transaction
+        time.sleep(0.6)
+        assert sink.written == 6
+        assert sink.batches == 1
+
+
+def test_backpressure(tmp_path):
+    path = str(tmp_path / "polls.db")
+    sink = SqliteSink(path, max_pending=2, batch_size=1,
+                      store_result=False)
+
+    # hold the database so the writer stalls on its first batch
+    lock = sqlite3.connect(path, timeout=0)
+    lock.execute("BEGIN EXCLUSIVE")
+
+    done = threading.Event()
+
+    def _produce():
+        for i in range(10):
+            sink.write(_response("veos%d" % i))
+        done.set()
+
+    thread = threading.Thread(target=_produce, daemon=True)
+    thread.start()
+
+    assert not done.wait(0.3)
+    assert sink.pending == 2
+
+    lock.rollback()
+    lock.close()
+    thread.join(5)
+    sink.close()
+
+    rows = _rows(path)
+    assert len(rows) == 20
+    assert all(row["result"] is None for row in rows)
+
+
+@pytest.mark.asyncio
+async def test_awrite(tmp_path):
+    path = str(tmp_path / "polls.db")
+
+    with SqliteSink(path, table="polls", max_pending=1) as sink:
+        for i in range(20):
+            await sink.awrite(_response("veos%d" % i))
+
+    assert len(_rows(path, "SELECT * FROM polls")) == 40
+
+
+def test_invalid(tmp_path):
+    with pytest.raises(ValueError):
+        SqliteSink(str(tmp_path / "x.db"), fields={"bad name": "version"})
+    with pytest.raises(ValueError):
+        SqliteSink(str(tmp_path / "x.db"), fields={"target": "version"})
+    with pytest.raises(sqlite3.Error):
+        SqliteSink(str(tmp_path / "missing" / "x.db"))
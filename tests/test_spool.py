@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import json
+import os
+
+import pytest
+
+from eapi.messages import Target
+from eapi.sessions import AsyncSession, Session
+from eapi.spool import SpooledBody, SpooledJsonResult, SpooledResponse, \
+    Spooler
+from eapi.util import prepare_request
+
+
+def test_spooler(tmp_path):
+    spooler = Spooler(threshold=10, directory=str(tmp_path))
+    spooler.write(b"12345")
+    assert spooler.finish() == b"12345"
+
+    spooler = Spooler(threshold=10, directory=str(tmp_path))
+    for chunk in (b"12345", b"67890", b"abc"):
+        spooler.write(chunk)
+    body = spooler.finish()
+    assert isinstance(body, SpooledBody)
+    assert body.size == 13 and body.read() == b"1234567890abc"
+
+    body.close()
+    assert body.closed
+    assert not os.listdir(str(tmp_path))
+
+    # a known length over the threshold goes straight to the file
+    spooler = Spooler(threshold=10, directory=str(tmp_path), length=100)
+    spooler.write(b"x")
+    assert os.listdir(str(tmp_path))
+    spooler.abort()
+    assert not os.listdir(str(tmp_path))
+
+
+def test_from_spooled(tmp_path):
+    path = str(tmp_path / "body.json")
+    target = Target.from_string("localhost")
+
+    request = prepare_request(["show hostname", "show clock"], "text")
+    with open(path, "w") as fh:
+        json.dump({"jsonrpc": "2.0", "id": request["id"], "result": [
+            {"output": "Hostname: veos1\n"}, {"output": "now\n"}]}, fh)
+
+    body = SpooledBody(path, use_mmap=True)
+    loads = []
+    load = body.load
+    body.load = lambda: loads.append(1) or load()
+
+    with SpooledResponse.from_spooled(target, request, body) as resp:
+        assert resp.code == 0
+        assert str(resp[0]) == "Hostname: veos1"
+        assert str(resp[1]) == "now"
+        assert resp.body.view()[:1] == b"{"
+        # each result is decoded on its own, never the whole body
+        assert loads == []
+
+        resp.release()
+        assert str(resp[1]) == "now"
+
+    # not deleted, it was not a temporary file
+    assert os.path.exists(path)
+
+    request = prepare_request(["show bogus"], "json")
+    with open(path, "w") as fh:
+        json.dump({"jsonrpc": "2.0", "id": request["id"], "error": {
+            "code": 1002, "message": "invalid command",
+            "data": [{"errors": ["Invalid input"]}]}}, fh)
+
+    resp = SpooledResponse.from_spooled(target, request, SpooledBody(path))
+    assert resp.code == 1002
+    assert resp[0].result["errors"] == ["Invalid input"]
+
+
+@pytest.mark.parametrize("use_mmap", [False, True])
+def test_result_spans(tmp_path, use_mmap):
+    path = str(tmp_path / "body.json")
+    results = [{"a": [1, {"b": "x]},\"{"}], "c": None}, [], "s,]", 42,
+               {"output": "line\n"}]
+
+    with open(path, "w") as fh:
+        fh.write('{"jsonrpc": "2.0", "id": 7, "result": %s}' %
+                 json.dumps(results, indent=1))
+
+    body = SpooledBody(path, use_mmap=use_mmap)
+    assert len(body.spans()) == len(results)
+    assert [body.result(i) for i in range(len(results))] == results
+
+    with open(path, "w") as fh:
+        fh.write('{"jsonrpc": "2.0", "id": 7, "result": []}')
+    assert SpooledBody(path).spans() == []
+
+
+def test_session_spool(server, auth, tmp_path):
+    target = str(server.url)
+
+    with Session(auth=auth, spool_threshold=64 << 10,
+                 spool_dir=str(tmp_path)) as sess:
+        small = sess.call(target, ["show hostname"])
+        assert not isinstance(small, SpooledResponse)
+
+        resp = sess.call(target, ["show payload 262144"])
+        assert isinstance(resp, SpooledResponse)
+        assert resp.body.size >= 262144
+        assert len(os.listdir(str(tmp_path))) == 1
+        assert isinstance(resp[0].result, SpooledJsonResult)
+        assert len(resp[0].result["interfaces"]) > 0
+        resp.close()
+        assert not os.listdir(str(tmp_path))
+
+    path = str(tmp_path / "hostname.json")
+    with Session(auth=auth) as sess:
+        resp = sess.call(target, ["show hostname"], encoding="text",
+                         spool=path)
+
+    assert "Hostname" in str(resp[0])
+    resp.close()
+    assert os.path.exists(path)
+
+
+@pytest.mark.asyncio
+async def test_async_spool(server, auth, tmp_path):
+    target = str(server.url)
+
+    async with AsyncSession(auth=auth, spool_threshold=0,
+                            spool_dir=str(tmp_path), spool_mmap=True) as sess:
+        resp = await sess.call(target, ["show payload 65536"],
+                               encoding="text")
+
+    with resp:
+        assert isinstance(resp, SpooledResponse)
+        assert str(resp[0]).startswith("Ethernet")
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
+# Arista Networks, Inc. Confidential and Proprietary.
+
+import asyncio
+import json
+import time
+
+import httpx
+import pytest
+
+import eapi
+from eapi.exceptions import EapiAuthenticationFailure, EapiError
+from eapi.testing import Device, Emulator, EmulatorServer, fixed, normal, \
+    sized
+
+
+def _session(emulator, **kwargs):
+    kwargs.setdefault("auth", ("admin", ""))
+    return eapi.AsyncSession(transport=httpx.ASGITransport(app=emulator),
+                             **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_host_selection():
+    emulator = Emulator.fleet(50)
+
+    async with _session(emulator) as sess:
+        responses = await asyncio.gather(*[
+            sess.call("veos%d" % i, ["show hostname", "show version"])
+            for i in range(1, 51)])
+
+    for index, response in enumerate(responses, 1):
+        assert response.code == 0
+        assert response[0].result["hostname"] == "veos%d" % index
+        assert response[1].result["serialNumber"].startswith("EMU")
+
+    assert emulator.devices["veos7"].requests == 1
+
+    async with _session(emulator) as sess:
+        with pytest.raises(EapiError):
+            await sess.call("unknown", ["show version"])
+
+
+@pytest.mark.asyncio
+async def test_commands_and_errors():
+    emulator = Emulator.fleet(2, seed=1)
+    emulator.command(r"^show flaky$", sized(100), error_rate=1.0)
+    emulator.command(r"^show big$", sized(1 << 20))
+
+    async with _session(emulator) as sess:
+        big = await sess.call("veos1", ["show big"])
+        assert len(json.dumps(big[0].result._data)) >= 1 << 20
+
+        flaky = await sess.call("veos1", ["show version", "show flaky",
+                                          "show version"])
+        assert flaky.code == 1002
+        assert "command 2 of 3 'show flaky'" in flaky.message
+        assert len(flaky) == 3
+
+        text = await sess.call("veos1", ["show bogus"], encoding="text")
+        assert text.code == 1002
+        assert "Invalid input" in str(text[0])
+
+        await sess.call("veos2", ["configure", "hostname spine1", "end"])
+        config = await sess.call("veos2", ["show running-config"],
+                                 encoding="text")
+        assert "hostname spine1" in str(config[0])
+
+    assert emulator.devices["veos1"].errors == 2
+
+
+@pytest.mark.asyncio
+async def test_latency():
+    emulator = Emulator.fleet(1, latency=fixed(0.05))
+    emulator.command(r"^show slow$", sized(10), latency=normal(0.1, 0.0))
+
+    async with _session(emulator) as sess:
+        start = time.monotonic()
+        await sess.call("veos1", ["show slow", "show slow"])
+        assert time.monotonic() - start >= 0.25
+
+
+@pytest.mark.asyncio
+async def test_login():
+    emulator = Emulator([Device("cookie", password="secret"),
+                         Device("basic", password="secret", login="basic"),
+                         Device("open", username=None)])
+
+    async with _session(emulator, auth=("admin", "secret")) as sess:
+        await sess.login("cookie", ("admin", "secret"))
+        assert sess.logged_in("cookie")
+        assert (await sess.call("cookie", ["show version"])).code == 0
+
+        # no /login endpoint, falls back to basic auth with each call
+        await sess.login("basic", ("admin", "secret"))
+        assert not sess.logged_in("basic")
+        assert (await sess.call("basic", ["show version"])).code == 0
+
+    async with _session(emulator, auth=("admin", "wrong")) as sess:
+        with pytest.raises(EapiAuthenticationFailure):
+            await sess.call("cookie", ["show version"])
+        assert (await sess.call("open", ["show version"])).code == 0
+
+    assert emulator.devices["cookie"].logins == 1
+
+
+@pytest.mark.asyncio
+async def test_max_inflight():
+    emulator = Emulator.fleet(1, latency=0.1, max_inflight=2)
+
+    async with _session(emulator) as sess:
+        results = await asyncio.gather(
+            *[sess.call("veos1", ["show version"]) for _ in range(5)],
+            return_exceptions=True)
+
+    assert sum(1 for r in results if isinstance(r, Exception)) == 3
+    assert emulator.devices["veos1"].rejected == 3
+    assert emulator.stats()["veos1"]["inflight"] == 0
+
+
+def test_server_ports():
+    pytest.importorskip("uvicorn")
+
+    emulator = Emulator.fleet(5, select="port")
+
+    with EmulatorServer(emulator) as server:
+        assert len(set(server.ports)) == 5
+        with eapi.Session(auth=("admin", "")) as sess:
+            names = [sess.call(t, ["show hostname"])[0].result["hostname"]
+                     for t in server.targets]
+
+    assert names == ["veos%d" % i for i in range(1, 6)]
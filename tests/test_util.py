@@ -3,11 +3,14 @@
 # Copyright (c) 2020 Arista Networks, Inc.  All rights reserved.
 # Arista Networks, Inc. Confidential and Proprietary.
 
+import time
+
 from typing import Tuple, Optional
 import pytest
 
 import eapi.sessions
-from eapi.util import indent, prepare_cmd, prepare_request, zpad
+from eapi.util import Ticker, bounded_as_completed, indent, prepare_cmd, \
+    prepare_request, zpad
 
 
 @pytest.mark.parametrize("text", [
@@ -55,3 +58,81 @@ def test_zpad():
 
     with pytest.raises(ValueError):
         zpad(z[:], a[:], None)
+
+
+def test_ticker():
+    ticker = Ticker(0.05)
+    start = ticker.start
+
+    ticker.tick()
+    assert ticker.ticks == 1
+    assert ticker.next_tick == pytest.approx(start + 0.05)
+    assert 0 < ticker.delay() <= 0.05
+
+    # overrun by a few intervals
+    time.sleep(0.18)
+    ticker.tick()
+    assert ticker.ticks == 2
+    assert ticker.missed == 2
+    assert ticker.lateness < 0.05
+    assert ticker.next_tick == pytest.approx(start + 0.2)
+
+    with pytest.raises(ValueError):
+        Ticker(0)
+
+
+@pytest.mark.asyncio
+async def test_bounded_as_completed():
+    import asyncio
+
+    running = []
+    peak = []
+
+    async def _work(n):
+        running.append(n)
+        peak.append(len(running))
+        await asyncio.sleep(0.01 * (n % 3))
+        running.remove(n)
+        if n == 5:
+            raise ValueError(n)
+        return n * 2
+
+    results = {}
+    errors = {}
+    async for item, result, error in bounded_as_completed(_work, range(10), 3):
+        if error:
+            errors[item] = error
+        else:
+            results[item] = result
+
+    assert max(peak) == 3
+    assert results == {n: n * 2 for n in range(10) if n != 5}
+    assert isinstance(errors[5], ValueError)
+
+    with pytest.raises(ValueError):
+        async for _ in bounded_as_completed(_work, range(1), 0):
+            pass
+
+
+@pytest.mark.asyncio
+async def test_bounded_as_completed_close():
+    import asyncio
+
+    cancelled = []
+
+    async def _work(n):
+        try:
+            await asyncio.sleep(0 if n == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(n)
+            raise
+        return n
+
+    completed = bounded_as_completed(_work, range(10), 3)
+    async for item, result, error in completed:
+        assert item == 0
+        break
+    await completed.aclose()
+
+    # the two calls in flight were cancelled and awaited, the rest never ran
+    assert sorted(cancelled) == [1, 2]